@@ -86,6 +86,9 @@ RESOURCE_DEPOSITS = {
 # Combined lookup
 POI_INDICES = {**NATURAL_MODIFIERS, **RESOURCE_DEPOSITS}
 
+# Reverse lookup: POI index -> feature name
+POI_NAMES = {idx: name for name, idx in POI_INDICES.items()}
+
 
 class FeatureMapper:
     """Maps natural features and resources to hex grid based on real geography."""
@@ -268,11 +271,9 @@ class FeatureMapper:
         """Get statistics about features by type."""
         stats = {}
         for col, row, poi_index in self.features:
-            # Find feature name
-            for name, idx in POI_INDICES.items():
-                if idx == poi_index:
-                    stats[name] = stats.get(name, 0) + 1
-                    break
+            name = POI_NAMES.get(poi_index)
+            if name is not None:
+                stats[name] = stats.get(name, 0) + 1
         return stats
 
 
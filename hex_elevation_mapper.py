@@ -34,7 +34,7 @@ Ocean Depth Logic:
 """
 
 from pathlib import Path
-from typing import Dict, Tuple, Optional, Set
+from typing import Dict, Tuple, Optional, Set, Union
 import numpy as np
 
 from data_fetchers.srtm_elevation import SRTMElevationFetcher
@@ -73,6 +73,12 @@ SEA_OF_AZOV_BOUNDS = {
     'max_lat': 47.5,
 }
 
+# Odd-r neighbor offsets (dc, dr), indexed by row & 1
+_NEIGHBOR_OFFSETS = (
+    ((-1, -1), (0, -1), (-1, 0), (1, 0), (-1, 1), (0, 1)),   # Even rows
+    ((0, -1), (1, -1), (-1, 0), (1, 0), (0, 1), (1, 1)),     # Odd rows
+)
+
 
 class HexElevationMapper:
     """
@@ -103,32 +109,48 @@ class HexElevationMapper:
 
         # Cache for elevation data
         self._hex_elevations: Optional[Dict[Tuple[int, int], int]] = None
+        self._hex_elevations_arr: Optional[np.ndarray] = None
         self._raw_elevations: Optional[Dict[Tuple[int, int], float]] = None
         self._distance_from_land: Optional[Dict[Tuple[int, int], int]] = None
 
     def _get_hex_neighbors(self, col: int, row: int) -> list:
         """Get all 6 neighbors of a hex."""
-        neighbors = []
-        if row % 2 == 0:  # Even row
-            offsets = [(-1, -1), (0, -1), (-1, 0), (1, 0), (-1, 1), (0, 1)]
-        else:  # Odd row
-            offsets = [(0, -1), (1, -1), (-1, 0), (1, 0), (0, 1), (1, 1)]
-
-        for dc, dr in offsets:
-            nc, nr = col + dc, row + dr
-            if 0 <= nc < self.width and 0 <= nr < self.height:
-                neighbors.append((nc, nr))
-        return neighbors
+        width, height = self.width, self.height
+        return [(col + dc, row + dr) for dc, dr in _NEIGHBOR_OFFSETS[row & 1]
+                if 0 <= col + dc < width and 0 <= row + dr < height]
+
+    def _land_mask_to_array(
+        self,
+        land_mask: Union[Dict[Tuple[int, int], bool], np.ndarray]
+    ) -> np.ndarray:
+        """
+        Normalize a land mask to a (height, width) bool array.
+
+        Args:
+            land_mask: Bool array indexed [row, col], or legacy dict of
+                       (col, row) -> is_land
+
+        Returns:
+            Bool array of shape (height, width)
+        """
+        if isinstance(land_mask, np.ndarray):
+            return land_mask.astype(bool, copy=False)
+
+        arr = np.zeros((self.height, self.width), dtype=bool)
+        for (col, row), is_land in land_mask.items():
+            if is_land:
+                arr[row, col] = True
+        return arr
 
     def _calculate_distance_from_land(
         self,
-        land_mask: Dict[Tuple[int, int], bool]
+        land_mask: np.ndarray
     ) -> Dict[Tuple[int, int], int]:
         """
         Calculate distance from land for each ocean hex using BFS.
 
         Args:
-            land_mask: Dict mapping (col, row) -> is_land
+            land_mask: Bool array (height, width), True for land
 
         Returns:
             Dict mapping (col, row) -> distance from nearest land (0 for land)
@@ -145,7 +167,7 @@ class HexElevationMapper:
         for row in range(self.height):
             for col in range(self.width):
                 pos = (col, row)
-                if land_mask.get(pos, False):
+                if land_mask[row, col]:
                     distance[pos] = 0
                     queue.append(pos)
                 else:
@@ -171,7 +193,7 @@ class HexElevationMapper:
         self,
         col: int,
         row: int,
-        land_mask: Dict[Tuple[int, int], bool],
+        land_mask: np.ndarray,
         raw_elevations: Dict[Tuple[int, int], float]
     ) -> float:
         """
@@ -182,9 +204,8 @@ class HexElevationMapper:
         """
         max_elev = 0.0
         for nc, nr in self._get_hex_neighbors(col, row):
-            neighbor_pos = (nc, nr)
-            if land_mask.get(neighbor_pos, False):
-                elev = raw_elevations.get(neighbor_pos, 0)
+            if land_mask[nr, nc]:
+                elev = raw_elevations.get((nc, nr), 0)
                 if elev > max_elev:
                     max_elev = elev
         return max_elev
@@ -198,7 +219,7 @@ class HexElevationMapper:
         self,
         col: int,
         row: int,
-        land_mask: Dict[Tuple[int, int], bool],
+        land_mask: np.ndarray,
         raw_elevations: Dict[Tuple[int, int], float],
         distance_from_land: Dict[Tuple[int, int], int]
     ) -> int:
@@ -268,15 +289,16 @@ class HexElevationMapper:
         return self.ocean_default_level
 
     def get_hex_elevations(self,
-                           ukraine_mask: Optional[Dict[Tuple[int, int], bool]] = None
+                           ukraine_mask: Optional[Union[Dict[Tuple[int, int], bool], np.ndarray]] = None
                            ) -> Dict[Tuple[int, int], int]:
         """
         Get quantized elevation level for each hex.
 
         Args:
-            ukraine_mask: Optional dict of (col, row) -> bool indicating
-                          if hex is land (True) or ocean (False).
-                          Used to assign ocean levels to water hexes.
+            ukraine_mask: Optional (height, width) bool array (or legacy dict of
+                          (col, row) -> bool) indicating if hex is land (True)
+                          or ocean (False). Used to assign ocean levels to
+                          water hexes.
 
         Returns:
             Dictionary mapping (col, row) -> elevation_level (-3 to 12)
@@ -300,6 +322,7 @@ class HexElevationMapper:
 
         # Calculate distance from land if we have a mask
         if ukraine_mask is not None:
+            ukraine_mask = self._land_mask_to_array(ukraine_mask)
             self._distance_from_land = self._calculate_distance_from_land(ukraine_mask)
 
         # Second pass: assign elevation levels
@@ -312,8 +335,7 @@ class HexElevationMapper:
 
                 # If we have a ukraine mask and this is ocean, use sophisticated depth assignment
                 if ukraine_mask is not None:
-                    is_land = ukraine_mask.get(pos, False)
-                    if not is_land:
+                    if not ukraine_mask[row, col]:
                         # Use sophisticated depth assignment
                         depth_level = self._assign_ocean_depth(
                             col, row, ukraine_mask, self._raw_elevations,
@@ -337,6 +359,26 @@ class HexElevationMapper:
 
         return self._hex_elevations
 
+    def get_hex_elevations_arr(self,
+                               ukraine_mask: Optional[Union[Dict[Tuple[int, int], bool], np.ndarray]] = None
+                               ) -> np.ndarray:
+        """
+        Get quantized elevation levels as a (height, width) int8 array.
+
+        Same levels as get_hex_elevations() (which it calls with ukraine_mask
+        on first use); levels -3 to 12 fit in int8, so vectorized passes over
+        the grid move a quarter of the bytes of an int32 array.
+        """
+        if self._hex_elevations_arr is None:
+            hex_elevations = self.get_hex_elevations(ukraine_mask)
+            arr = np.full((self.height, self.width), self.ocean_default_level, dtype=np.int8)
+            if hex_elevations:
+                cols, rows = np.array(list(hex_elevations.keys()), dtype=np.intp).T
+                levels = np.fromiter(hex_elevations.values(), dtype=np.int16, count=len(hex_elevations))
+                arr[rows, cols] = np.clip(levels, -3, 12)
+            self._hex_elevations_arr = arr
+        return self._hex_elevations_arr
+
     def get_raw_elevations(self) -> Dict[Tuple[int, int], float]:
         """Get raw elevation values in meters for each hex."""
         if self._raw_elevations is None:
@@ -372,14 +414,7 @@ class HexElevationMapper:
         Returns:
             Array of shape (height, width) with values -3 to 12
         """
-        if self._hex_elevations is None:
-            self.get_hex_elevations()
-
-        arr = np.zeros((self.height, self.width), dtype=np.int8)
-        for (col, row), level in self._hex_elevations.items():
-            arr[row, col] = level
-
-        return arr
+        return self.get_hex_elevations_arr().copy()
 
     def validate_known_points(self) -> dict:
         """
@@ -17,10 +17,16 @@ Steps:
 
 import zipfile
 import base64
+import codecs
+import hashlib
 import io
+import itertools
+import os
 import re
 import shutil
 import json
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 from PIL import Image
@@ -28,14 +34,75 @@ import numpy as np
 import geopandas as gpd
 from shapely.geometry import Point
 import yaml
+import matplotlib
+matplotlib.use("Agg")  # figures are only saved, never shown
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
 from matplotlib.patches import RegularPolygon
-from matplotlib.collections import PatchCollection
+from matplotlib.collections import PatchCollection, PathCollection
+from matplotlib.markers import MarkerStyle
 from matplotlib.lines import Line2D
 
+from data_fetchers.srtm_elevation import SRTMElevationFetcher
+from data_fetchers.landcover_fetcher_copernicus import CopernicusLandCoverFetcher
+from hex_elevation_mapper import HexElevationMapper
+from river_mapper import RiverMapper
+from terrain_mapper import TerrainMapper, TERRAIN_TYPES, NO_OVERRIDE, calculate_mountain_chain_flags
+from feature_mapper import FeatureMapper, POI_INDICES, POI_NAMES
+from natural_wonder_mapper import UKRAINE_WONDERS, NATURAL_WONDER_NAMES
+
+try:
+    import fpnge
+    FPNGE_AVAILABLE = True
+except ImportError:
+    FPNGE_AVAILABLE = False
+
+# Save.hms patterns used on every build
+_TERRAIN_NAMES_RE = re.compile(rb'<TerrainTypeNames[^>]*>(.*?)</TerrainTypeNames>', re.DOTALL)
+_STRING_RE = re.compile(rb'<String>([^<]+)</String>')
+# Opening, closing or self-closing SpawnPoints tag (the element nests: each
+# spawn <Item> has its own <SpawnPoints> child)
+_SPAWN_POINTS_TAG_RE = re.compile(rb'<(/?)SpawnPoints\b[^>]*?(/?)>')
+_TEXTURE_BYTES_RE = re.compile(rb'<(\w+Texture)\.Bytes Length="(\d+)">([^<]*)</\1\.Bytes>')
+
+# One EntitiesProvider spawn point (formatted with col, file_row, flags)
+_SPAWN_ITEM_TMPL = (
+    "            <Item>\n"
+    "                <SpawnPoints>\n"
+    "                    <Column>{col}</Column>\n"
+    "                    <Row>{file_row}</Row>\n"
+    "                </SpawnPoints>\n"
+    "                <Flags>{flags}</Flags>\n"
+    "            </Item>"
+)
+
 
 VERSION_FILE = Path(__file__).parent / "output" / ".build_version.json"
+CACHE_DIR = Path(__file__).parent / "output" / ".cache"
+
+# Files (relative to this module) hashed into a step's build cache key on top
+# of the key of the step before it (which covers this module and data_fetchers/)
+_STEP_CACHE_DEPS = {
+    'step5_elevation': ('hex_elevation_mapper.py',),
+    'step6_rivers': ('river_mapper.py',),
+    'step7_terrain': ('hex_elevation_mapper.py', 'terrain_mapper.py'),
+    'step8_features': ('feature_mapper.py', 'data/humankind_ukraine_terrain_modifiers.md'),
+    'step9_natural_wonders': ('natural_wonder_mapper.py',),
+}
+# External data a step reads (files or directories, relative to this module
+# unless absolute); their path, size and mtime go into the step's cache key.
+# SRTM tiles come from srtm-py's download cache.
+_SRTM_DATA = ('data/srtm_cache', Path.home() / '.cache' / 'srtm')
+_STEP_CACHE_DATA = {
+    'step5_elevation': _SRTM_DATA,
+    'step6_rivers': _SRTM_DATA + ('data/osm_waterways', 'data/rivers'),
+    'step7_terrain': _SRTM_DATA + ('data/landcover_cache',),
+}
+# Builder attributes that steps set for later steps; pickled with each cached step
+_STEP_STATE = (
+    'hex_to_territory', 'labels', 'land_mask', 'snake_island_idx',
+    'raion_biomes', 'river_classification', 'river_elevation_grid',
+)
 
 
 def get_next_version() -> dict:
@@ -56,6 +123,102 @@ def get_next_version() -> dict:
     return data
 
 
+def _encode_png_fast(arr: np.ndarray) -> bytes:
+    """Encode a (height, width, 4) uint8 array as PNG bytes, favouring speed.
+
+    The PNG is immediately base64'd into Save.hms, so encode speed matters
+    more than file size: uses fpnge when installed, otherwise Pillow with
+    the lowest zlib compression level.
+    """
+    arr = np.ascontiguousarray(arr, dtype=np.uint8)
+    if FPNGE_AVAILABLE:
+        return fpnge.fromNP(arr)
+    buffer = io.BytesIO()
+    Image.fromarray(arr).save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def _png_array_b64(arr: np.ndarray) -> bytes:
+    """Base64 of _encode_png_fast(arr)."""
+    return base64.b64encode(_encode_png_fast(arr))
+
+
+def _png_b64(img: Image.Image) -> bytes:
+    """PNG-encode a PIL image and base64 it straight from the BytesIO buffer."""
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    with buffer.getbuffer() as png_view:
+        return base64.b64encode(png_view)
+
+
+class _MaskView:
+    """Read-only {(col, row): is_land} view over a (height, width) bool array.
+
+    Lets mappers that still call land_mask.get((col, row), False) consume the
+    cached ndarray without materializing a dict.
+    """
+
+    __slots__ = ('arr',)
+
+    def __init__(self, arr: np.ndarray):
+        self.arr = arr
+
+    def get(self, pos: tuple[int, int], default: bool = False) -> bool:
+        col, row = pos
+        if 0 <= row < self.arr.shape[0] and 0 <= col < self.arr.shape[1]:
+            return bool(self.arr[row, col])
+        return default
+
+    def __len__(self) -> int:
+        return self.arr.size
+
+
+class _SaveSegments:
+    """Save.hms content split once around its <*Texture.Bytes> base64 blobs.
+
+    texts holds the plain XML between blobs (one more entry than names) and
+    blobs maps texture name -> base64 payload (lengths -> its Length
+    attribute), so swapping a texture is a dict write instead of a regex
+    pass over the whole multi-MB save.
+    """
+
+    __slots__ = ('texts', 'names', 'blobs', 'lengths')
+
+    def __init__(self, content: bytes):
+        self.texts = []
+        self.names = []
+        self.blobs = {}
+        self.lengths = {}
+        pos = 0
+        for match in _TEXTURE_BYTES_RE.finditer(content):
+            name = match.group(1).decode('ascii')
+            self.texts.append(content[pos:match.start()])
+            self.names.append(name)
+            self.lengths[name] = match.group(2)
+            self.blobs[name] = match.group(3)
+            pos = match.end()
+        self.texts.append(content[pos:])
+
+    def set_texture(self, name: str, new_base64: bytes):
+        """Replace a texture's base64 bytes (no-op for textures not in the save)."""
+        if name in self.blobs:
+            self.blobs[name] = new_base64
+            self.lengths[name] = str(len(new_base64)).encode('ascii')
+
+    def chunks(self):
+        """Yield the save content piece by piece, re-wrapping each blob in its tags."""
+        for text, name in zip(self.texts, self.names):
+            tag = name.encode('ascii')
+            yield text
+            yield b'<%s.Bytes Length="%s">' % (tag, self.lengths[name])
+            yield self.blobs[name]
+            yield b'</%s.Bytes>' % tag
+        yield self.texts[-1]
+
+    def join(self) -> bytes:
+        return b''.join(self.chunks())
+
+
 def get_version_string(version: dict) -> str:
     """Format version as string."""
     return f"v{version['major']}.{version['minor']}.{version['build']}"
@@ -64,9 +227,24 @@ def get_version_string(version: dict) -> str:
 class IncrementalMapBuilder:
     """Build Ukraine maps incrementally from a template."""
 
-    def __init__(self, template_path: Path):
-        """Load template and config."""
+    def __init__(self, template_path: Path, skip_visualizations: bool = False):
+        """Load template and config.
+
+        Args:
+            template_path: Template .hmap to build on
+            skip_visualizations: Don't render the per-step PNG visualizations
+        """
         self.template_path = template_path
+        self.skip_visualizations = skip_visualizations
+        # Visualizations render on a single background thread (pyplot is not
+        # thread-safe) so the next step overlaps PNG writing; joined in finalize()
+        self._viz_pool = None
+        self._viz_futures = []
+        # Texture-only steps encode + write their .hmap on a single I/O thread
+        # (so jobs stay in step order) while the next step fetches its data;
+        # anything touching the save content first waits via _flush_pending_io()
+        self._io_pool = None
+        self._io_futures = []
         print(f"Loading template: {template_path}")
 
         # Load config
@@ -74,14 +252,15 @@ class IncrementalMapBuilder:
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
 
-        # Load template files
+        # Load template files as raw UTF-8 bytes (BOM stripped once, re-added on save)
+        self._bom = codecs.BOM_UTF8
         with zipfile.ZipFile(template_path, 'r') as zf:
-            self.descriptor_content = zf.read('Descriptor.hmd').decode('utf-8-sig')
-            self.save_content = zf.read('Save.hms').decode('utf-8-sig')
+            self.descriptor_content = self._strip_bom(zf.read('Descriptor.hmd'))
+            self.save_content = self._strip_bom(zf.read('Save.hms'))
 
         # Parse dimensions from template
-        width_match = re.search(r'<Width>(\d+)</Width>', self.save_content)
-        height_match = re.search(r'<Height>(\d+)</Height>', self.save_content)
+        width_match = re.search(rb'<Width>(\d+)</Width>', self.save_content)
+        height_match = re.search(rb'<Height>(\d+)</Height>', self.save_content)
         self.width = int(width_match.group(1))
         self.height = int(height_match.group(1))
         print(f"Template dimensions: {self.width}x{self.height}")
@@ -103,26 +282,62 @@ class IncrementalMapBuilder:
         # Output directory
         self.output_dir = Path(__file__).parent / "output" / "incremental"
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self._viz_dir = Path(__file__).parent / "output" / "visualizations"
+        self._viz_dir.mkdir(parents=True, exist_ok=True)
 
-        # Store intermediate results
+        # Store intermediate results (current_save_content is segmented, see _SaveSegments)
         self.current_save_content = self.save_content
         self.current_descriptor_content = self.descriptor_content
         self.hex_to_territory = None
+        self.labels = None  # (H, W) raion index array, set in step3
+        self.land_mask = None  # (H, W) bool array, set in step3
 
         # Enable procedural mountain chains for proper mountain rendering
         self._enable_procedural_mountains()
 
+    @property
+    def current_save_content(self) -> bytes:
+        """Whole current Save.hms, joined from the segments on demand and cached."""
+        self._flush_pending_io()
+        if self._save_joined is None:
+            self._save_joined = self._save_segments.join()
+        return self._save_joined
+
+    @current_save_content.setter
+    def current_save_content(self, content: bytes):
+        self._flush_pending_io()
+        self._save_segments = _SaveSegments(content)
+        self._save_joined = content
+
+    def _set_texture(self, texture_name: str, new_base64: bytes):
+        """Swap one texture in the current save content without re-scanning it."""
+        self._flush_pending_io()
+        self._save_segments.set_texture(texture_name, new_base64)
+        self._save_joined = None
+
     def _enable_procedural_mountains(self):
         """Enable UseProceduralMountainChains flag for proper mountain rendering."""
         # Update in both template and current content
-        old_value = '<UseProceduralMountainChains>false</UseProceduralMountainChains>'
-        new_value = '<UseProceduralMountainChains>true</UseProceduralMountainChains>'
+        old_value = b'<UseProceduralMountainChains>false</UseProceduralMountainChains>'
+        new_value = b'<UseProceduralMountainChains>true</UseProceduralMountainChains>'
 
         if old_value in self.save_content:
             self.save_content = self.save_content.replace(old_value, new_value)
             self.current_save_content = self.current_save_content.replace(old_value, new_value)
             print("Enabled UseProceduralMountainChains=true")
 
+    def _get_raion_idx_arr(self) -> np.ndarray | None:
+        """Get the (H, W) raion index array (0 = ocean, 1-based raions), or None before step3."""
+        return self.labels
+
+    def _get_ukraine_mask_arr(self) -> np.ndarray | None:
+        """Get the (H, W) bool Ukraine land mask (land = raion > 0), or None before step3."""
+        if self.land_mask is None:
+            labels = self._get_raion_idx_arr()
+            if labels is not None:
+                self.land_mask = labels > 0
+        return self.land_mask
+
     def _pixel_to_geo(self, col: int, row: int) -> tuple[float, float]:
         """Convert pixel coordinates to geographic coordinates."""
         lon = self.min_lon + (col / self.width) * (self.max_lon - self.min_lon)
@@ -138,11 +353,38 @@ class IncrementalMapBuilder:
         row = max(0, min(self.height - 1, row))
         return col, row
 
-    def _save_hmap(self, save_content: str, descriptor_content: str, output_path: Path):
-        """Save as .hmap file (ZIP archive)."""
+    def _geo_to_pixels(self, lons, lats) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized _geo_to_pixel: (cols, rows) int32 arrays for arrays of lon/lat."""
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        cols = ((lons - self.min_lon) / (self.max_lon - self.min_lon) * self.width).astype(np.int32)
+        rows = ((self.max_lat - lats) / (self.max_lat - self.min_lat) * self.height).astype(np.int32)
+        return np.clip(cols, 0, self.width - 1), np.clip(rows, 0, self.height - 1)
+
+    def _strip_bom(self, data: bytes) -> bytes:
+        """Drop a leading UTF-8 BOM from raw file content."""
+        if data.startswith(self._bom):
+            return data[len(self._bom):]
+        return data
+
+    def _save_hmap(self, save_content, descriptor_content: bytes, output_path: Path):
+        """Save as .hmap file (ZIP archive) with UTF-8 BOM-prefixed members.
+
+        save_content is bytes or a _SaveSegments, which is streamed into the
+        archive without joining it first.
+        """
+        if isinstance(save_content, _SaveSegments):
+            save_chunks = save_content.chunks()
+        else:
+            save_chunks = (save_content,)
+        # Unlink first so a game-folder hardlink to a previous build keeps its bytes
+        output_path.unlink(missing_ok=True)
         with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            zf.writestr('Save.hms', save_content.encode('utf-8-sig'))
-            zf.writestr('Descriptor.hmd', descriptor_content.encode('utf-8-sig'))
+            for name, chunks in (('Save.hms', save_chunks), ('Descriptor.hmd', (descriptor_content,))):
+                with zf.open(name, 'w') as f:
+                    f.write(self._bom)
+                    for chunk in chunks:
+                        f.write(chunk)
         print(f"  Saved: {output_path.name}")
 
     # ==================== TERRAIN VALIDATION HELPERS ====================
@@ -175,9 +417,9 @@ class IncrementalMapBuilder:
         14: 'WoodLand',
     }
 
-    def _extract_elevation_texture(self, content: str) -> np.ndarray:
+    def _extract_elevation_texture(self, content: bytes) -> np.ndarray:
         """Extract elevation texture as numpy array (height, width, 4) RGBA."""
-        pattern = r'<ElevationTexture\.Bytes Length="\d+">([^<]+)</ElevationTexture\.Bytes>'
+        pattern = rb'<ElevationTexture\.Bytes Length="\d+">([^<]+)</ElevationTexture\.Bytes>'
         match = re.search(pattern, content)
         if not match:
             raise ValueError("Could not find ElevationTexture.Bytes in content")
@@ -374,12 +616,40 @@ class IncrementalMapBuilder:
 
         return None
 
-    def _update_texture_bytes(self, content: str, texture_name: str, new_base64: str) -> str:
+    # TerritoryDatabase item templates (territory 0 is always the ocean)
+    OCEAN_TERRITORY_ITEM = """            <Item>
+                <ContinentIndex>0</ContinentIndex>
+                <Biome>0</Biome>
+                <IsOcean>true</IsOcean>
+            </Item>"""
+    LAND_TERRITORY_ITEM = """            <Item>
+                <ContinentIndex>1</ContinentIndex>
+                <Biome>{biome}</Biome>
+                <IsOcean>false</IsOcean>
+            </Item>"""
+
+    def _build_territory_db_xml(self, land_biomes) -> str:
+        """Build the TerritoryDatabase XML: ocean territory + one land item per biome.
+
+        Each distinct biome item is formatted once and reused, so a run of
+        identical territories is just repeated references to the same string.
+        """
+        item_by_biome = {b: self.LAND_TERRITORY_ITEM.format(biome=b) for b in set(land_biomes)}
+        items = [self.OCEAN_TERRITORY_ITEM] + [item_by_biome[b] for b in land_biomes]
+        body = "\n".join(items)
+        return f"""<TerritoryDatabase>
+            <Territories Length="{len(items)}">
+{body}
+            </Territories>
+        </TerritoryDatabase>"""
+
+    def _update_texture_bytes(self, content: bytes, texture_name: str, new_base64: bytes) -> bytes:
         """Update a texture's base64 bytes in the save content."""
-        pattern = rf'(<{texture_name}\.Bytes Length=")(\d+)(">)([^<]*)(</)'
+        pattern = rb'(<' + re.escape(texture_name.encode('ascii')) + rb'\.Bytes Length=")(\d+)(">)([^<]*)(</)'
+        length = str(len(new_base64)).encode('ascii')
 
         def replacer(match):
-            return f'{match.group(1)}{len(new_base64)}{match.group(3)}{new_base64}{match.group(5)}'
+            return match.group(1) + length + match.group(3) + new_base64 + match.group(5)
 
         result = re.sub(pattern, replacer, content)
         return result
@@ -403,8 +673,8 @@ class IncrementalMapBuilder:
         print("=" * 60)
         print("  Change: ZonesTexture.Bytes + TerritoryDatabase (2 territories: ocean + land)")
 
-        # Build Ukraine mask
-        self.hex_to_territory = {}
+        # Build Ukraine mask: territory[row, col] = 0 (ocean) or 1 (land)
+        territory = np.zeros((self.height, self.width), dtype=np.uint8)
         print("  Building Ukraine land mask...")
 
         total_pixels = self.height * self.width
@@ -417,30 +687,27 @@ class IncrementalMapBuilder:
                 point = Point(lon, lat)
 
                 # Check if point is in any raion (= land)
-                is_land = False
                 for idx, raion in self.raions_gdf.iterrows():
                     if raion.geometry.contains(point):
-                        is_land = True
+                        territory[row, col] = 1
                         break
 
-                # 0 = ocean, 1 = land
-                self.hex_to_territory[(col, row)] = 1 if is_land else 0
+        self.hex_to_territory = territory
 
         # Statistics
-        land_pixels = sum(1 for t in self.hex_to_territory.values() if t == 1)
-        ocean_pixels = sum(1 for t in self.hex_to_territory.values() if t == 0)
+        counts = np.bincount(territory.ravel(), minlength=2)
+        ocean_pixels = int(counts[0])
+        land_pixels = int(counts[1:].sum())
         print(f"  Land pixels: {land_pixels} ({land_pixels / (self.width * self.height) * 100:.1f}%)")
         print(f"  Ocean pixels: {ocean_pixels}")
 
         # Create zones texture PNG (0=ocean, 1=land)
-        img = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 255))
-        pixels = img.load()
-        for (col, row), territory_idx in self.hex_to_territory.items():
-            pixels[col, row] = (territory_idx, 0, 0, 255)
+        rgba = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        rgba[:, :, 0] = territory
+        rgba[:, :, 3] = 255
+        img = Image.fromarray(rgba, mode='RGBA')
 
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        zones_b64 = base64.b64encode(buffer.getvalue()).decode('ascii')
+        zones_b64 = _png_b64(img)
 
         # Create territory database: 0=ocean, 1=land (Temperate biome like template)
         territory_db_xml = """        <TerritoryDatabase>
@@ -461,8 +728,8 @@ class IncrementalMapBuilder:
         # Update save content
         content = self._update_texture_bytes(self.save_content, 'ZonesTexture', zones_b64)
         content = re.sub(
-            r'<TerritoryDatabase>.*?</TerritoryDatabase>',
-            territory_db_xml.strip(),
+            rb'<TerritoryDatabase>.*?</TerritoryDatabase>',
+            territory_db_xml.strip().encode('utf-8'),
             content,
             flags=re.DOTALL
         )
@@ -486,8 +753,8 @@ class IncrementalMapBuilder:
         print("=" * 60)
         print("  Change: ZonesTexture.Bytes + TerritoryDatabase")
 
-        # Assign each pixel to a raion
-        hex_to_raion = {}
+        # Assign each pixel to a raion (labels[row, col] = territory index)
+        labels = np.zeros((self.height, self.width), dtype=np.int16)
         print("  Assigning pixels to raions...")
 
         total_pixels = self.height * self.width
@@ -499,24 +766,19 @@ class IncrementalMapBuilder:
                 lon, lat = self._pixel_to_geo(col, row)
                 point = Point(lon, lat)
 
-                # Find containing raion
-                found = False
+                # Find containing raion (unmatched pixels stay 0 = ocean)
                 for idx, raion in self.raions_gdf.iterrows():
                     if raion.geometry.contains(point):
                         # Territory index = raion index + 1 (0 is ocean)
-                        hex_to_raion[(col, row)] = idx + 1
-                        found = True
+                        labels[row, col] = idx + 1
                         break
 
-                if not found:
-                    hex_to_raion[(col, row)] = 0  # Ocean
-
         # Add Snake Island (Zmiinyi) - 45.255°N, 30.204°E
         # Use territory index = len(raions) + 1 (after all raions)
         snake_island_idx = len(self.raions_gdf) + 1
         snake_island_col, snake_island_row = self._geo_to_pixel(30.204, 45.255)
         if 0 <= snake_island_col < self.width and 0 <= snake_island_row < self.height:
-            hex_to_raion[(snake_island_col, snake_island_row)] = snake_island_idx
+            labels[snake_island_row, snake_island_col] = snake_island_idx
             print(f"  Added Snake Island at ({snake_island_col}, {snake_island_row}) as territory {snake_island_idx}")
         else:
             print(f"  WARNING: Snake Island coordinates outside map bounds")
@@ -526,7 +788,8 @@ class IncrementalMapBuilder:
         # strait between mainland Ukraine and Crimea to fill in completely.
         # If coastal territory extension is needed, it should exclude narrow straits.
 
-        self.hex_to_raion = hex_to_raion
+        self.labels = labels
+        self.land_mask = labels > 0
         self.snake_island_idx = snake_island_idx
 
         # Statistics
@@ -535,64 +798,36 @@ class IncrementalMapBuilder:
         if snake_island_idx is not None:
             num_territories += 1  # +1 for Snake Island
 
-        counts = {}
-        for t in hex_to_raion.values():
-            counts[t] = counts.get(t, 0) + 1
-        land_pixels = sum(c for t, c in counts.items() if t > 0)
+        counts = np.bincount(labels.ravel(), minlength=num_territories)
+        land_pixels = int(counts[1:].sum())
         print(f"  Total territories: {num_territories} (including ocean and Snake Island)")
         print(f"  Land/coastal pixels: {land_pixels} ({land_pixels / (self.width * self.height) * 100:.1f}%)")
-        print(f"  Deep ocean pixels: {counts.get(0, 0)}")
+        print(f"  Deep ocean pixels: {counts[0]}")
         if snake_island_idx:
-            print(f"  Snake Island pixels: {counts.get(snake_island_idx, 0)}")
+            print(f"  Snake Island pixels: {counts[snake_island_idx]}")
 
-        # Create zones texture PNG
-        img = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 255))
-        pixels = img.load()
-        for (col, row), territory_idx in hex_to_raion.items():
-            pixels[col, row] = (territory_idx, 0, 0, 255)
+        # Create zones texture PNG (R = territory index, A = 255)
+        rgba = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        rgba[:, :, 0] = labels
+        rgba[:, :, 3] = 255
+        img = Image.fromarray(rgba, mode='RGBA')
 
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        zones_b64 = base64.b64encode(buffer.getvalue()).decode('ascii')
+        zones_b64 = _png_b64(img)
         print(f"  Zones texture: {len(zones_b64)} chars")
 
         # Create territory database XML
-        territory_items = []
-        # Territory 0 = ocean
-        territory_items.append("""            <Item>
-                <ContinentIndex>0</ContinentIndex>
-                <Biome>0</Biome>
-                <IsOcean>true</IsOcean>
-            </Item>""")
-        # Territories 1-140 = raions (all with Temperate biome 7)
-        for i in range(len(self.raions_gdf)):
-            territory_items.append(f"""            <Item>
-                <ContinentIndex>1</ContinentIndex>
-                <Biome>7</Biome>
-                <IsOcean>false</IsOcean>
-            </Item>""")
-        # Territory 141 = Snake Island (if added)
-        if snake_island_idx is not None:
-            territory_items.append(f"""            <Item>
-                <ContinentIndex>1</ContinentIndex>
-                <Biome>7</Biome>
-                <IsOcean>false</IsOcean>
-            </Item>""")
-
-        territory_db_xml = f"""        <TerritoryDatabase>
-            <Territories Length="{num_territories}">
-{chr(10).join(territory_items)}
-            </Territories>
-        </TerritoryDatabase>"""
+        # Territory 0 = ocean, 1-139 = raions, 140 = Snake Island (if added);
+        # all land territories use Temperate biome 7 until step4
+        territory_db_xml = self._build_territory_db_xml([7] * (num_territories - 1))
 
         # Update save content from step2 (land/ocean)
-        content = self._update_texture_bytes(self.current_save_content, 'ZonesTexture', zones_b64)
+        self._set_texture('ZonesTexture', zones_b64)
 
         # Replace territory database
         content = re.sub(
-            r'<TerritoryDatabase>.*?</TerritoryDatabase>',
-            territory_db_xml.strip(),
-            content,
+            rb'<TerritoryDatabase>.*?</TerritoryDatabase>',
+            territory_db_xml.strip().encode('utf-8'),
+            self.current_save_content,
             flags=re.DOTALL
         )
 
@@ -656,45 +891,29 @@ class IncrementalMapBuilder:
 
         # Get biome for each raion based on oblast
         # Store as instance variable for use in step7
-        self.raion_biomes = []
-        for idx, raion in self.raions_gdf.iterrows():
-            oblast = raion.get('adm1_name', '')
-            biome = oblast_biomes.get(oblast, 7)  # Default to Temperate
-            self.raion_biomes.append(biome)
+        self.raion_biomes = (
+            self.raions_gdf['adm1_name']
+            .map(oblast_biomes)
+            .fillna(7)  # Default to Temperate
+            .astype(int)
+            .to_numpy()
+        )
 
         # Count biomes
-        biome_counts = {}
-        for b in self.raion_biomes:
-            biome_counts[b] = biome_counts.get(b, 0) + 1
+        biome_counts = {
+            biome: int(count)
+            for biome, count in enumerate(np.bincount(self.raion_biomes))
+            if count
+        }
         print(f"  Biome distribution: {biome_counts}")
 
-        # Create updated territory database
-        territory_items = []
-        # Territory 0 = ocean (Arctic biome = 0)
-        territory_items.append("""            <Item>
-                <ContinentIndex>0</ContinentIndex>
-                <Biome>0</Biome>
-                <IsOcean>true</IsOcean>
-            </Item>""")
-        # Territories 1-139 = raions with biomes
-        for i, biome in enumerate(self.raion_biomes):
-            territory_items.append(f"""            <Item>
-                <ContinentIndex>1</ContinentIndex>
-                <Biome>{biome}</Biome>
-                <IsOcean>false</IsOcean>
-            </Item>""")
-
-        num_territories = len(self.raions_gdf) + 1
-        territory_db_xml = f"""        <TerritoryDatabase>
-            <Territories Length="{num_territories}">
-{chr(10).join(territory_items)}
-            </Territories>
-        </TerritoryDatabase>"""
+        # Create updated territory database (0 = ocean, 1-139 = raions with biomes)
+        territory_db_xml = self._build_territory_db_xml(self.raion_biomes.tolist())
 
         # Update content
         content = re.sub(
-            r'<TerritoryDatabase>.*?</TerritoryDatabase>',
-            territory_db_xml.strip(),
+            rb'<TerritoryDatabase>.*?</TerritoryDatabase>',
+            territory_db_xml.strip().encode('utf-8'),
             self.current_save_content,
             flags=re.DOTALL
         )
@@ -713,9 +932,6 @@ class IncrementalMapBuilder:
         print("=" * 60)
         print("  Change: ElevationTexture.Bytes from real SRTM data")
 
-        from data_fetchers.srtm_elevation import SRTMElevationFetcher
-        from hex_elevation_mapper import HexElevationMapper
-
         # Build bounds dict
         bounds = {
             'min_lon': self.min_lon,
@@ -732,14 +948,13 @@ class IncrementalMapBuilder:
         # Create mapper
         mapper = HexElevationMapper(fetcher, self.width, self.height, bounds)
 
-        # Build ukraine mask from hex_to_raion (land = raion > 0)
-        ukraine_mask = None
-        if hasattr(self, 'hex_to_raion') and self.hex_to_raion:
-            ukraine_mask = {k: v > 0 for k, v in self.hex_to_raion.items()}
-            print(f"  Using Ukraine land mask ({sum(ukraine_mask.values())} land hexes)")
+        # Ukraine land mask from step3 (land = raion > 0)
+        land_mask = self._get_ukraine_mask_arr()
+        if land_mask is not None:
+            print(f"  Using Ukraine land mask ({int(land_mask.sum())} land hexes)")
 
         # Get quantized elevations
-        hex_elevations = mapper.get_hex_elevations(ukraine_mask)
+        hex_elevations = mapper.get_hex_elevations(land_mask)
 
         # Print statistics
         stats = mapper.get_elevation_stats()
@@ -769,51 +984,76 @@ class IncrementalMapBuilder:
         # - G channel: 119 for water, 120 for land
         # - B channel: 0
         # - A channel: 0 (not 255!)
-        img = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
-        pixels = img.load()
-
-        for (col, row), level in hex_elevations.items():
-            # Convert level (-3 to 12) to pixel values
-            # Ocean (level < 0): R=1, G=119
-            # Land (level >= 0): R=level+4 (so level 0 -> R=4, level 1 -> R=5, etc.), G=120
-            if level < 0:
-                # Water - use R=1 for ocean depth variation could be 1-3
-                r_value = max(1, 4 + level)  # level -3 -> 1, level -1 -> 3
-                g_value = 119
-            else:
-                # Land - R increases with elevation
-                r_value = min(15, 4 + level)  # level 0 -> 4, level 1 -> 5, etc.
-                g_value = 120
-            pixels[col, row] = (r_value, g_value, 0, 0)
+        # Convert level (-3 to 12) to pixel values
+        # Ocean (level < 0): R=level+4 clamped to >= 1 (level -3 -> 1), G=119
+        # Land (level >= 0): R=level+4 clamped to <= 15 (level 0 -> 4), G=120
+        level = mapper.get_hex_elevations_arr()
+        rgba = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        rgba[:, :, 0] = self._elevation_r_channel(level)
+        rgba[:, :, 1] = np.where(level < 0, 119, 120)
+        img = Image.fromarray(rgba, mode='RGBA')
+
+        # Encode as base64, update save content and save in the background
+        output_path = self.output_dir / "step5_elevation.hmap"
+        self._submit_texture('ElevationTexture', 'Elevation texture', _png_b64, img, output_path)
 
-        # Encode as base64
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        elevation_b64 = base64.b64encode(buffer.getvalue()).decode('ascii')
-        print(f"\n  Elevation texture: {len(elevation_b64)} chars")
+        # Save elevation visualization
+        self._submit_visualization(self._save_elevation_visualization, hex_elevations)
 
-        # Update save content
-        content = self._update_texture_bytes(
-            self.current_save_content, 'ElevationTexture', elevation_b64
-        )
+        return output_path
 
-        self.current_save_content = content
+    def _submit_visualization(self, render, *args):
+        """Queue a _save_*_visualization call on the visualization thread."""
+        if self.skip_visualizations:
+            return
+        if self._viz_pool is None:
+            self._viz_pool = ThreadPoolExecutor(max_workers=1)
+        self._viz_futures.append(self._viz_pool.submit(render, *args))
 
-        output_path = self.output_dir / "step5_elevation.hmap"
-        self._save_hmap(content, self.descriptor_content, output_path)
+    def _submit_texture(self, texture_name: str, label: str, encode, image, output_path: Path):
+        """Queue encode(image) -> base64 texture swap -> .hmap write on the I/O thread.
 
-        # Save elevation visualization
-        self._save_elevation_visualization(hex_elevations)
+        The .hmap is on disk once the next save-content access (or
+        finalize()) has flushed the queue.
+        """
+        if self._io_pool is None:
+            self._io_pool = ThreadPoolExecutor(max_workers=1)
+        self._io_futures.append(
+            self._io_pool.submit(self._finalize_texture, texture_name, label, encode, image, output_path)
+        )
 
-        return output_path
+    def _finalize_texture(self, texture_name: str, label: str, encode, image, output_path: Path):
+        """I/O-thread half of _submit_texture (runs with earlier jobs already applied)."""
+        new_base64 = encode(image)
+        print(f"\n  {label}: {len(new_base64)} chars")
+        self._save_segments.set_texture(texture_name, new_base64)
+        self._save_joined = None
+        self._save_hmap(self._save_segments, self.descriptor_content, output_path)
+
+    def _flush_pending_io(self):
+        """Wait for queued texture saves, re-raising any encode or write error."""
+        futures, self._io_futures = self._io_futures, []
+        for future in futures:
+            future.result()
+
+    def finalize(self):
+        """Wait for queued texture saves and visualizations, re-raising any error."""
+        futures = self._io_futures + self._viz_futures
+        self._io_futures, self._viz_futures = [], []
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            for pool in (self._io_pool, self._viz_pool):
+                if pool is not None:
+                    pool.shutdown()
+            self._io_pool = self._viz_pool = None
 
     def _save_elevation_visualization(self, hex_elevations: dict):
         """Save a visualization of the elevation data with hex grid overlay."""
 
         # Create elevation array
-        elev_array = np.zeros((self.height, self.width), dtype=np.float32)
-        for (col, row), level in hex_elevations.items():
-            elev_array[row, col] = level
+        elev_array = self._dict_to_grid(hex_elevations, 0, np.float32)
 
         # Custom colormap: blue (ocean) -> green (low) -> brown (mid) -> white (high)
         colors = [
@@ -838,11 +1078,10 @@ class IncrementalMapBuilder:
         bounds_cmap = list(range(-3, 14))
         norm = mcolors.BoundaryNorm(bounds_cmap, cmap.N)
 
-        viz_dir = Path(__file__).parent / "output" / "visualizations"
-        viz_dir.mkdir(parents=True, exist_ok=True)
+        viz_dir = self._viz_dir
 
         # === Figure 1: Simple elevation raster ===
-        _fig, ax = plt.subplots(figsize=(16, 9))
+        fig, ax = plt.subplots(figsize=(16, 9))
         im = ax.imshow(elev_array, cmap=cmap, norm=norm, aspect='auto')
         ax.set_title('Ukraine SRTM Elevation (Quantized to Game Levels)', fontsize=14)
         ax.set_xlabel('Column')
@@ -850,21 +1089,25 @@ class IncrementalMapBuilder:
         cbar = plt.colorbar(im, ax=ax, ticks=range(-3, 13))
         cbar.set_label('Elevation Level')
         viz_path = viz_dir / "ukraine_srtm_elevation.png"
-        plt.savefig(viz_path, dpi=150, bbox_inches='tight')
+        fig.tight_layout()
+        plt.savefig(viz_path, dpi=150, pil_kwargs={"compress_level": 1})
         plt.close()
         print(f"  Saved elevation visualization: {viz_path}")
 
         # === Figure 2: Hex grid visualization ===
-        _fig, ax = plt.subplots(figsize=(20, 12))
+        fig, ax = plt.subplots(figsize=(20, 12))
 
-        # Create hexagons for each cell
+        # Create hexagons for each cell (row-major over a level grid; hexes
+        # missing from hex_elevations draw as level -2)
         hex_size = 0.5  # Radius of hexagon
         patches = []
         patch_colors = []
+        level_grid = self._dict_to_grid(hex_elevations, -2, np.int8).tolist()
 
         for row in range(self.height):
+            row_levels = level_grid[row]
             for col in range(self.width):
-                level = hex_elevations.get((col, row), -2)
+                level = row_levels[col]
 
                 # Offset coordinates for hex grid (odd rows shifted)
                 x = col + (0.5 if row % 2 == 1 else 0)
@@ -904,7 +1147,8 @@ class IncrementalMapBuilder:
         cbar.set_label('Elevation Level')
 
         hex_viz_path = viz_dir / "ukraine_elevation_hexmap.png"
-        plt.savefig(hex_viz_path, dpi=150, bbox_inches='tight')
+        fig.tight_layout()
+        plt.savefig(hex_viz_path, dpi=150, pil_kwargs={"compress_level": 1})
         plt.close()
         print(f"  Saved hex map visualization: {hex_viz_path}")
 
@@ -924,9 +1168,6 @@ class IncrementalMapBuilder:
         print("  Change: RiverTexture.Bytes from Natural Earth data")
         print("  Classification: regular rivers, reservoirs, porohy")
 
-        from river_mapper import RiverMapper
-        from data_fetchers.srtm_elevation import SRTMElevationFetcher
-
         # Build bounds dict
         bounds = {
             'min_lon': self.min_lon,
@@ -938,11 +1179,10 @@ class IncrementalMapBuilder:
         # Create river mapper
         mapper = RiverMapper(bounds, self.width, self.height)
 
-        # Build ukraine mask from hex_to_raion (land = raion > 0)
-        ukraine_mask = None
-        if hasattr(self, 'hex_to_raion') and self.hex_to_raion:
-            ukraine_mask = {k: v > 0 for k, v in self.hex_to_raion.items()}
-            print(f"  Using Ukraine land mask ({sum(ukraine_mask.values())} land hexes)")
+        # Ukraine land mask from step3 (land = raion > 0)
+        land_mask = self._get_ukraine_mask_arr()
+        if land_mask is not None:
+            print(f"  Using Ukraine land mask ({int(land_mask.sum())} land hexes)")
 
         # Get elevation data for porohy detection
         print("  Loading elevation data for porohy detection...")
@@ -953,10 +1193,11 @@ class IncrementalMapBuilder:
         print("  Classifying rivers...")
         classification = mapper.classify_rivers(
             elevation_grid=elevation_grid,
-            land_mask=ukraine_mask
+            land_mask=land_mask
         )
 
-        # Store classification, elevation_grid, and mapper for step7
+        # Store classification, elevation_grid, and mapper for step7 (the
+        # mapper is not cached; step7 rebuilds a grid-only one if needed)
         self.river_classification = classification
         self.river_elevation_grid = elevation_grid
         self.river_mapper = mapper
@@ -969,17 +1210,14 @@ class IncrementalMapBuilder:
         lake_terrain_total = len(classification.dnipro) + len(classification.lakes)
         print(f"    Total Lake terrain: {lake_terrain_total} hexes")
 
-        # Convert elevation grid to dict for flow direction calculation
-        elevation_map = {}
-        for row in range(self.height):
-            for col in range(self.width):
-                elevation_map[(col, row)] = int(elevation_grid[row, col])
+        # Integer elevation array (indexed [row, col]) for flow direction calculation
+        elevation_map = self._elevation_array_from_grid(elevation_grid)
 
         # Create river texture ONLY for regular rivers
         # Reservoirs and porohy will be handled as Lake terrain in step7
         # Pass elevation_map for proper downstream flow direction encoding
         river_texture = mapper.create_river_texture(
-            ukraine_mask=ukraine_mask,
+            ukraine_mask=land_mask,
             river_hexes=classification.regular_rivers,
             elevation_map=elevation_map
         )
@@ -988,81 +1226,77 @@ class IncrementalMapBuilder:
         river_count = np.sum(river_texture[:, :, 0] < 255)
         print(f"  River hexes in texture: {river_count}")
 
-        # Convert to PIL Image and encode
-        img = Image.fromarray(river_texture, mode='RGBA')
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        river_b64 = base64.b64encode(buffer.getvalue()).decode('ascii')
-        print(f"  River texture: {len(river_b64)} chars")
-
-        # Update save content
-        content = self._update_texture_bytes(
-            self.current_save_content, 'RiverTexture', river_b64
-        )
-
-        self.current_save_content = content
-
+        # Encode as PNG + base64, update save content and save in the background
         output_path = self.output_dir / "step6_rivers.hmap"
-        self._save_hmap(content, self.descriptor_content, output_path)
+        self._submit_texture('RiverTexture', 'River texture', _png_array_b64, river_texture, output_path)
 
         # Save river visualization with classification
-        self._save_river_visualization_classified(classification, ukraine_mask)
+        self._submit_visualization(self._save_river_visualization_classified, classification, land_mask)
 
         return output_path
 
+    @staticmethod
+    def _elevation_array_from_grid(elevation_grid: np.ndarray) -> np.ndarray:
+        """Cast an SRTM elevation grid (meters) to an int32 array, truncating like int()."""
+        return np.asarray(elevation_grid).astype(np.int32, copy=False)
+
+    @staticmethod
+    def _mark_hexes(arr: np.ndarray, hexes, code: int, land_mask: np.ndarray = None):
+        """Set arr[row, col] = code for each (col, row) in hexes (set or (N, 2) array), optionally only on land."""
+        if len(hexes) == 0:
+            return
+        if isinstance(hexes, np.ndarray):
+            pts = hexes
+        else:
+            pts = np.fromiter(
+                itertools.chain.from_iterable(hexes), dtype=np.intp, count=2 * len(hexes)
+            ).reshape(-1, 2)
+        cols, rows = pts[:, 0], pts[:, 1]
+        if land_mask is not None:
+            on_land = land_mask[rows, cols]
+            cols, rows = cols[on_land], rows[on_land]
+        arr[rows, cols] = code
+
     def _save_river_visualization(self, river_hexes: set, ukraine_mask: dict = None):
         """Save a visualization of rivers."""
 
         # Create array: 0=ocean, 1=land, 2=river
         arr = np.zeros((self.height, self.width), dtype=np.uint8)
 
-        if ukraine_mask:
-            for (col, row), is_land in ukraine_mask.items():
-                if is_land:
-                    arr[row, col] = 1
+        land_mask = None
+        if ukraine_mask is not None:
+            land_mask = self._dict_to_grid(ukraine_mask, False, bool)
+            arr[land_mask] = 1
 
-        for col, row in river_hexes:
-            if ukraine_mask is None or ukraine_mask.get((col, row), False):
-                arr[row, col] = 2
+        self._mark_hexes(arr, river_hexes, 2, land_mask)
 
-        _fig, ax = plt.subplots(figsize=(16, 9))
+        fig, ax = plt.subplots(figsize=(16, 9))
         cmap = plt.cm.colors.ListedColormap(['#4169E1', '#90EE90', '#0000CD'])
         ax.imshow(arr, cmap=cmap, aspect='auto')
         ax.set_title('Ukraine Rivers (Natural Earth)', fontsize=14)
         ax.set_xlabel('Column')
         ax.set_ylabel('Row')
 
-        viz_dir = Path(__file__).parent / "output" / "visualizations"
-        viz_dir.mkdir(parents=True, exist_ok=True)
-        viz_path = viz_dir / "ukraine_rivers.png"
-        plt.savefig(viz_path, dpi=150, bbox_inches='tight')
+        viz_path = self._viz_dir / "ukraine_rivers.png"
+        fig.tight_layout()
+        plt.savefig(viz_path, dpi=150, pil_kwargs={"compress_level": 1})
         plt.close()
         print(f"  Saved river visualization: {viz_path}")
 
-    def _save_river_visualization_classified(self, classification, ukraine_mask: dict = None):
+    def _save_river_visualization_classified(self, classification, land_mask: np.ndarray = None):
         """Save a visualization of classified rivers (regular, reservoir, porohy, lakes)."""
 
         # Create array: 0=ocean, 1=land, 2=regular river, 3=reservoir, 4=porohy, 5=lake
         arr = np.zeros((self.height, self.width), dtype=np.uint8)
 
-        if ukraine_mask:
-            for (col, row), is_land in ukraine_mask.items():
-                if is_land:
-                    arr[row, col] = 1
+        if land_mask is not None:
+            arr[land_mask] = 1
 
-        for col, row in classification.regular_rivers:
-            if ukraine_mask is None or ukraine_mask.get((col, row), False):
-                arr[row, col] = 2
+        self._mark_hexes(arr, classification.regular_rivers, 2, land_mask)
+        self._mark_hexes(arr, classification.lakes, 3, land_mask)
+        self._mark_hexes(arr, classification.dnipro, 4, land_mask)
 
-        for col, row in classification.lakes:
-            if ukraine_mask is None or ukraine_mask.get((col, row), False):
-                arr[row, col] = 3
-
-        for col, row in classification.dnipro:
-            if ukraine_mask is None or ukraine_mask.get((col, row), False):
-                arr[row, col] = 4
-
-        _fig, ax = plt.subplots(figsize=(16, 9))
+        fig, ax = plt.subplots(figsize=(16, 9))
         # 0=ocean, 1=land, 2=river, 3=lake/reservoir, 4=dnipro
         cmap = plt.cm.colors.ListedColormap([
             '#4169E1',  # 0: Ocean - royal blue
@@ -1086,24 +1320,59 @@ class IncrementalMapBuilder:
         ]
         ax.legend(handles=legend_elements, loc='upper right', fontsize=9)
 
-        viz_dir = Path(__file__).parent / "output" / "visualizations"
-        viz_dir.mkdir(parents=True, exist_ok=True)
-        viz_path = viz_dir / "ukraine_rivers_classified.png"
-        plt.savefig(viz_path, dpi=150, bbox_inches='tight')
+        viz_path = self._viz_dir / "ukraine_rivers_classified.png"
+        fig.tight_layout()
+        plt.savefig(viz_path, dpi=150, pil_kwargs={"compress_level": 1})
         plt.close()
         print(f"  Saved classified river visualization: {viz_path}")
 
+    def _dict_to_grid(self, values: dict, default=0, dtype=np.int16, out: np.ndarray = None) -> np.ndarray:
+        """Scatter a {(col, row): value} dict into a (height, width) array.
+
+        If out is given, values are written into it in place (cells not in
+        the dict keep their current value); otherwise a new array filled
+        with default is returned.
+        """
+        if out is None:
+            out = np.full((self.height, self.width), default, dtype=dtype)
+        if values:
+            cols, rows = np.array(list(values.keys()), dtype=np.intp).T
+            out[rows, cols] = np.fromiter(values.values(), dtype=out.dtype, count=len(values))
+        return out
+
+    @staticmethod
+    def _elevation_r_channel(level: np.ndarray) -> np.ndarray:
+        """R channel from elevation levels: level + 4, clamped to 1..3 for water, 4..15 for land."""
+        return (np.clip(level, -3, 11) + 4).astype(np.uint8)
+
+    @staticmethod
+    def _find_spawn_points_span(content: bytes) -> tuple[int, int] | None:
+        """Find the (start, end) byte span of the top-level SpawnPoints element, or None."""
+        start = content.find(b'<SpawnPoints')
+        if start == -1:
+            return None
+        depth = 0
+        for tag in _SPAWN_POINTS_TAG_RE.finditer(content, start):
+            if tag.group(1):
+                depth -= 1
+            elif not tag.group(2):
+                depth += 1
+            if depth == 0:
+                return start, tag.end()
+        return None
+
     def _get_terrain_names_order(self) -> list:
-        """Parse terrain names order from current Save.hms TerrainTypeNames."""
-        match = re.search(
-            r'<TerrainTypeNames[^>]*>(.*?)</TerrainTypeNames>',
-            self.current_save_content,
-            re.DOTALL
-        )
-        if match:
-            terrain_xml = match.group(1)
-            names = re.findall(r'<String>([^<]+)</String>', terrain_xml)
-            return names
+        """Parse terrain names order from current Save.hms TerrainTypeNames.
+
+        Only the XML between texture blobs is searched, which queued texture
+        saves never modify, so this does not wait for them.
+        """
+        for text in self._save_segments.texts:
+            match = _TERRAIN_NAMES_RE.search(text)
+            if match:
+                terrain_xml = match.group(1)
+                names = _STRING_RE.findall(terrain_xml)
+                return [name.decode('utf-8') for name in names]
         return None
 
     def step7_terrain(self) -> Path:
@@ -1113,12 +1382,6 @@ class IncrementalMapBuilder:
         print("=" * 60)
         print("  Change: ElevationTexture G channel with terrain encoding")
 
-        from terrain_mapper import TerrainMapper
-        from data_fetchers.srtm_elevation import SRTMElevationFetcher
-        from data_fetchers.landcover_fetcher_copernicus import CopernicusLandCoverFetcher
-        from hex_elevation_mapper import HexElevationMapper
-        from river_mapper import RiverMapper
-
         bounds = {
             'min_lon': self.min_lon,
             'max_lon': self.max_lon,
@@ -1138,11 +1401,10 @@ class IncrementalMapBuilder:
         fetcher = SRTMElevationFetcher(bounds)
         elev_mapper = HexElevationMapper(fetcher, self.width, self.height, bounds)
 
-        # Build land mask
-        ukraine_mask = None
-        if hasattr(self, 'hex_to_raion') and self.hex_to_raion:
-            ukraine_mask = {k: v > 0 for k, v in self.hex_to_raion.items()}
-            print(f"  Using Ukraine land mask ({sum(ukraine_mask.values())} land hexes)")
+        # Ukraine land mask from step3 (land = raion > 0)
+        ukraine_mask = self._get_ukraine_mask_arr()
+        if ukraine_mask is not None:
+            print(f"  Using Ukraine land mask ({int(ukraine_mask.sum())} land hexes)")
 
         hex_elevations = elev_mapper.get_hex_elevations(ukraine_mask)
 
@@ -1156,85 +1418,89 @@ class IncrementalMapBuilder:
         # These are: Dnipro (consecutive lake chain) and natural lakes ONLY
         # Regular rivers are NOT rendered as lakes anymore
         print("  Getting lake terrain hexes from step6 classification...")
-        lake_terrain_hexes = set()
+        lake_terrain_hexes = np.empty((0, 2), dtype=np.int32)
         dnipro_elevations = {}  # Special elevation overrides for Dnipro
         lake_elevations = {}    # Elevation overrides for natural lakes
         if hasattr(self, 'river_classification') and self.river_classification:
-            lake_terrain_hexes = (
-                self.river_classification.dnipro |
+            lake_terrain_hexes = np.concatenate([
+                self.river_classification.dnipro,
                 self.river_classification.lakes
-            )
+            ])
             print(f"  Lake terrain hexes: {len(lake_terrain_hexes)}")
             print(f"    Dnipro: {len(self.river_classification.dnipro)}")
             print(f"    Lakes + Reservoirs: {len(self.river_classification.lakes)}")
 
             # Calculate Dnipro bank elevations (one level lower than minimum bank)
             # Use hex_elevations (game levels) not raw SRTM meters
-            if hasattr(self, 'river_mapper') and self.river_mapper:
-                print("  Calculating Dnipro bank elevations...")
-                dnipro_elevations = self.river_mapper.get_dnipro_bank_elevations(
-                    self.river_classification.dnipro,
-                    hex_elevations,
-                    ukraine_mask
-                )
-                print(f"  Dnipro elevation overrides: {len(dnipro_elevations)}")
-
-                # Show elevation distribution for debugging
-                if dnipro_elevations:
-                    elev_counts = {}
-                    for level in dnipro_elevations.values():
-                        elev_counts[level] = elev_counts.get(level, 0) + 1
-                    print(f"  Dnipro elevation distribution: {dict(sorted(elev_counts.items()))}")
-
-                # Calculate lake bank elevations (one level lower than minimum bank)
-                print("  Calculating natural lake bank elevations...")
-                lake_elevations = self.river_mapper.get_dnipro_bank_elevations(
-                    self.river_classification.lakes,
-                    hex_elevations,
-                    ukraine_mask
-                )
-                print(f"  Lake elevation overrides: {len(lake_elevations)}")
+            # After a cached step6 only the classification is restored; bank
+            # elevations need the grid geometry, not the river shapefiles
+            river_mapper = getattr(self, 'river_mapper', None)
+            if river_mapper is None:
+                bounds = {
+                    'min_lon': self.min_lon,
+                    'max_lon': self.max_lon,
+                    'min_lat': self.min_lat,
+                    'max_lat': self.max_lat
+                }
+                river_mapper = RiverMapper(bounds, self.width, self.height, load_rivers=False)
+            print("  Calculating Dnipro bank elevations...")
+            dnipro_elevations = river_mapper.get_dnipro_bank_elevations(
+                self.river_classification.as_set('dnipro'),
+                hex_elevations,
+                ukraine_mask
+            )
+            print(f"  Dnipro elevation overrides: {len(dnipro_elevations)}")
+
+            # Show elevation distribution for debugging
+            if dnipro_elevations:
+                elev_counts = {}
+                for level in dnipro_elevations.values():
+                    elev_counts[level] = elev_counts.get(level, 0) + 1
+                print(f"  Dnipro elevation distribution: {dict(sorted(elev_counts.items()))}")
+
+            # Calculate lake bank elevations (one level lower than minimum bank)
+            print("  Calculating natural lake bank elevations...")
+            lake_elevations = river_mapper.get_dnipro_bank_elevations(
+                self.river_classification.as_set('lakes'),
+                hex_elevations,
+                ukraine_mask
+            )
+            print(f"  Lake elevation overrides: {len(lake_elevations)}")
         else:
             # Fallback: no lake terrain if no classification
             print("  WARNING: No classification from step6, no lake terrain applied")
-            lake_terrain_hexes = set()
 
         # Create terrain mapper with terrain names order from Save.hms
         terrain_mapper = TerrainMapper(bounds, self.width, self.height, terrain_names)
 
-        # Create land mask dict for terrain mapper
-        land_mask = {}
-        for row in range(self.height):
-            for col in range(self.width):
-                pos = (col, row)
-                if ukraine_mask:
-                    land_mask[pos] = ukraine_mask.get(pos, False)
-                else:
-                    land_mask[pos] = hex_elevations.get(pos, -3) >= 0
+        # Land mask for terrain mapper: Ukraine mask, or elevation >= 0 without one
+        elev_arr = elev_mapper.get_hex_elevations_arr()
+        if ukraine_mask is not None:
+            land_mask_arr = ukraine_mask
+        else:
+            land_mask_arr = elev_arr >= 0
 
-        # Create hex_biome_map from hex_to_raion and raion_biomes
+        # Create per-hex biome array from raion indices and raion_biomes
         # This ensures biome variant in G channel matches territory biome
-        hex_biome_map = {}
-        if hasattr(self, 'hex_to_raion') and self.hex_to_raion:
-            if hasattr(self, 'raion_biomes') and self.raion_biomes:
-                for pos, raion_idx in self.hex_to_raion.items():
-                    if raion_idx > 0 and raion_idx <= len(self.raion_biomes):
-                        # raion_idx is 1-based (0 is ocean)
-                        hex_biome_map[pos] = self.raion_biomes[raion_idx - 1]
-                    else:
-                        # Ocean or invalid - use Arctic (0)
-                        hex_biome_map[pos] = 0
-                print(f"  Created hex_biome_map for {len(hex_biome_map)} hexes")
+        biome_arr = None
+        raion_idx_arr = self._get_raion_idx_arr()
+        if raion_idx_arr is not None:
+            if getattr(self, 'raion_biomes', None) is not None and len(self.raion_biomes):
+                raion_biomes_arr = np.asarray(self.raion_biomes, dtype=np.int8)
+                # raion_idx is 1-based (0 is ocean); ocean or invalid -> Arctic (0)
+                biome_arr = np.zeros((self.height, self.width), dtype=np.int8)
+                valid = (raion_idx_arr > 0) & (raion_idx_arr <= len(raion_biomes_arr))
+                biome_arr[valid] = raion_biomes_arr[raion_idx_arr[valid] - 1]
+                print(f"  Created biome array for {biome_arr.size} hexes")
             else:
                 print("  WARNING: raion_biomes not available, using default biome variant")
         else:
-            print("  WARNING: hex_to_raion not available, using default biome variant")
+            print("  WARNING: raion labels not available, using default biome variant")
 
         # Find the highest and second-highest elevation levels on land
-        land_elevations = [elev for pos, elev in hex_elevations.items() if land_mask.get(pos, False)]
-        unique_elevations = sorted(set(land_elevations), reverse=True)
-        max_elev = unique_elevations[0] if unique_elevations else 12
-        second_max = unique_elevations[1] if len(unique_elevations) > 1 else max_elev - 1
+        unique_elevations = np.unique(elev_arr[land_mask_arr])
+        max_elev = int(unique_elevations[-1]) if unique_elevations.size else 12
+        second_max = int(unique_elevations[-2]) if unique_elevations.size > 1 else max_elev - 1
         print(f"  Max elevation level: {max_elev} (MountainSnow)")
         print(f"  Second max elevation level: {second_max} (Mountain)")
         terrain_mapper.set_elevation_range(max_elev, second_max)
@@ -1242,25 +1508,25 @@ class IncrementalMapBuilder:
         # Get terrain for all hexes using Copernicus land cover
         # Returns terrain map, elevation overrides for water tiles, and mountain hexes
         # lake_terrain_hexes contains Dnipro, reservoirs, porohy, and lakes (NOT regular rivers)
-        terrain_map, elevation_overrides, mountain_hexes = terrain_mapper.create_terrain_map(
-            hex_elevations, land_mask, lake_terrain_hexes, landcover_grid, hex_biome_map
+        terrain_arr, elevation_overrides, mountain_mask = terrain_mapper.create_terrain_map(
+            hex_elevations, land_mask_arr, lake_terrain_hexes, landcover_grid, biome_arr
         )
 
         # Calculate mountain chain connectivity flags (B channel)
-        from terrain_mapper import calculate_mountain_chain_flags
-        mountain_b_channel = calculate_mountain_chain_flags(mountain_hexes, self.width, self.height)
-        print(f"  Mountain chain flags calculated: {len(mountain_b_channel)} hexes")
-
-        # Apply lake elevation overrides (one level lower than minimum bank)
+        mountain_b_channel = calculate_mountain_chain_flags(mountain_mask)
+        print(f"  Mountain chain flags calculated: {np.count_nonzero(mountain_b_channel)} hexes")
+
+        # Elevation levels with water-tile overrides scattered on top, in
+        # precedence order: terrain mapper, then natural lakes, then Dnipro
+        # (lakes and Dnipro sit one level lower than their minimum bank)
+        level = elev_arr.copy()
+        has_override = elevation_overrides != NO_OVERRIDE
+        level[has_override] = elevation_overrides[has_override]
         if lake_elevations:
-            for pos, level in lake_elevations.items():
-                elevation_overrides[pos] = level
+            self._dict_to_grid(lake_elevations, out=level)
             print(f"  Applied {len(lake_elevations)} natural lake elevation overrides")
-
-        # Apply Dnipro elevation overrides (one level lower than minimum bank)
         if dnipro_elevations:
-            for pos, level in dnipro_elevations.items():
-                elevation_overrides[pos] = level
+            self._dict_to_grid(dnipro_elevations, out=level)
             print(f"  Applied {len(dnipro_elevations)} Dnipro elevation overrides")
 
         # Create elevation texture with proper terrain encoding
@@ -1268,60 +1534,30 @@ class IncrementalMapBuilder:
         # G channel: terrain_type * 8 + variant
         # B channel: mountain chain connectivity flags (0 for non-mountains)
         # A channel: 0
-        img = Image.new('RGBA', (self.width, self.height), (0, 0, 0, 0))
-        pixels = img.load()
-
-        for row in range(self.height):
-            for col in range(self.width):
-                pos = (col, row)
-                # Use elevation override for water tiles if available
-                level = elevation_overrides.get(pos, hex_elevations.get(pos, -3))
-                g_value = terrain_map.get(pos, 7)  # Default to CityTerrain variant 7
-
-                # R value: level offset
-                if level < 0:
-                    r_value = max(1, 4 + level)
-                else:
-                    r_value = min(15, 4 + level)
-
-                # B value: mountain chain connectivity (makes 3D mountains render)
-                b_value = mountain_b_channel.get(pos, 0)
 
-                pixels[col, row] = (r_value, g_value, b_value, 0)
+        r_plane = self._elevation_r_channel(level)
+        g_plane = terrain_arr
+        # B value: mountain chain connectivity (makes 3D mountains render)
+        b_plane = mountain_b_channel
 
-        # Encode as base64
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        elevation_b64 = base64.b64encode(buffer.getvalue()).decode('ascii')
-        print(f"\n  Elevation+Terrain texture: {len(elevation_b64)} chars")
-
-        # Update save content
-        content = self._update_texture_bytes(
-            self.current_save_content, 'ElevationTexture', elevation_b64
-        )
-
-        self.current_save_content = content
+        rgba = np.stack([r_plane, g_plane, b_plane, np.zeros_like(r_plane)], axis=-1)
 
+        # Encode as base64, update save content and save in the background
         output_path = self.output_dir / "step7_terrain.hmap"
-        self._save_hmap(content, self.descriptor_content, output_path)
+        self._submit_texture('ElevationTexture', 'Elevation+Terrain texture', _png_array_b64, rgba, output_path)
 
         # Save terrain visualization
-        self._save_terrain_visualization(terrain_map, ukraine_mask)
+        self._submit_visualization(self._save_terrain_visualization, terrain_arr, ukraine_mask)
 
         return output_path
 
-    def _save_terrain_visualization(self, terrain_map: dict, _ukraine_mask: dict = None):
+    def _save_terrain_visualization(self, terrain_arr: np.ndarray, _ukraine_mask: np.ndarray = None):
         """Save a visualization of terrain types."""
 
-        from terrain_mapper import TERRAIN_TYPES
-
         # Create array of terrain indices
         # G encoding: (biome_variant << 4) | terrain_idx
         # So terrain_idx = G & 0x0F (lower 4 bits)
-        arr = np.zeros((self.height, self.width), dtype=np.uint8)
-        for (col, row), g_value in terrain_map.items():
-            terrain_idx = g_value & 0x0F  # Lower 4 bits = terrain index
-            arr[row, col] = terrain_idx
+        arr = terrain_arr & 0x0F  # Lower 4 bits = terrain index
 
         # Terrain colors
         terrain_colors = {
@@ -1346,7 +1582,7 @@ class IncrementalMapBuilder:
         colors = [terrain_colors.get(i, '#FF00FF') for i in range(15)]
         cmap = mcolors.ListedColormap(colors)
 
-        _fig, ax = plt.subplots(figsize=(16, 9))
+        fig, ax = plt.subplots(figsize=(16, 9))
         im = ax.imshow(arr, cmap=cmap, vmin=0, vmax=14, aspect='auto')
         ax.set_title('Ukraine Terrain Types', fontsize=14)
         ax.set_xlabel('Column')
@@ -1359,10 +1595,9 @@ class IncrementalMapBuilder:
         cbar.ax.set_yticklabels(labels, fontsize=8)
         cbar.set_label('Terrain Type')
 
-        viz_dir = Path(__file__).parent / "output" / "visualizations"
-        viz_dir.mkdir(parents=True, exist_ok=True)
-        viz_path = viz_dir / "ukraine_terrain.png"
-        plt.savefig(viz_path, dpi=150, bbox_inches='tight')
+        viz_path = self._viz_dir / "ukraine_terrain.png"
+        fig.tight_layout()
+        plt.savefig(viz_path, dpi=150, pil_kwargs={"compress_level": 1})
         plt.close()
         print(f"  Saved terrain visualization: {viz_path}")
 
@@ -1373,8 +1608,6 @@ class IncrementalMapBuilder:
         print("=" * 60)
         print("  Change: POITexture.Bytes with terrain modifiers and resources")
 
-        from feature_mapper import FeatureMapper
-
         bounds = {
             'min_lon': self.min_lon,
             'max_lon': self.max_lon,
@@ -1389,14 +1622,15 @@ class IncrementalMapBuilder:
         md_path = Path(__file__).parent / "data" / "humankind_ukraine_terrain_modifiers.md"
         mapper.load_from_markdown(md_path)
 
-        # Build ukraine mask from hex_to_raion (land = raion > 0)
-        ukraine_mask = None
-        if hasattr(self, 'hex_to_raion') and self.hex_to_raion:
-            ukraine_mask = {k: v > 0 for k, v in self.hex_to_raion.items()}
-            print(f"  Using Ukraine land mask ({sum(ukraine_mask.values())} land hexes)")
+        # Ukraine land mask from step3 (land = raion > 0)
+        ukraine_mask = self._get_ukraine_mask_arr()
+        if ukraine_mask is not None:
+            print(f"  Using Ukraine land mask ({int(ukraine_mask.sum())} land hexes)")
 
         # Create POI texture
-        poi_texture = mapper.create_poi_texture(ukraine_mask)
+        poi_texture = mapper.create_poi_texture(
+            _MaskView(ukraine_mask) if ukraine_mask is not None else None
+        )
 
         # Print statistics
         stats = mapper.get_feature_stats()
@@ -1405,25 +1639,14 @@ class IncrementalMapBuilder:
             print(f"    {name}: {count}")
 
         # Convert to PIL Image and encode
-        from PIL import Image
         img = Image.fromarray(poi_texture, mode='RGBA')
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        poi_b64 = base64.b64encode(buffer.getvalue()).decode('ascii')
-        print(f"\n  POI texture: {len(poi_b64)} chars")
-
-        # Update save content
-        content = self._update_texture_bytes(
-            self.current_save_content, 'POITexture', poi_b64
-        )
-
-        self.current_save_content = content
 
+        # Encode, update save content and save in the background
         output_path = self.output_dir / "step8_features.hmap"
-        self._save_hmap(content, self.descriptor_content, output_path)
+        self._submit_texture('POITexture', 'POI texture', _png_b64, img, output_path)
 
         # Save feature visualization
-        self._save_feature_visualization(mapper, ukraine_mask)
+        self._submit_visualization(self._save_feature_visualization, mapper, ukraine_mask)
 
         return output_path
 
@@ -1434,8 +1657,6 @@ class IncrementalMapBuilder:
         print("=" * 60)
         print("  Change: NaturalWonderTexture + NaturalWonderNames")
 
-        from natural_wonder_mapper import UKRAINE_WONDERS, NATURAL_WONDER_NAMES
-
         if not hasattr(self, 'current_save_content') or not self.current_save_content:
             raise RuntimeError("Step 9 requires previous step content")
 
@@ -1518,12 +1739,11 @@ class IncrementalMapBuilder:
 
         # Encode wonder texture as PNG and base64
         img = Image.fromarray(wonder_texture, mode='RGBA')
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        wonder_b64 = base64.b64encode(buffer.getvalue()).decode('ascii')
+        wonder_b64 = _png_b64(img)
 
         # Update NaturalWonderTexture in content
-        content = self._update_texture_bytes(content, 'NaturalWonderTexture', wonder_b64)
+        self._set_texture('NaturalWonderTexture', wonder_b64)
+        content = self.current_save_content
 
         # Update NaturalWonderNames section
         wonder_names_xml = f"""<NaturalWonderNames Length="{len(NATURAL_WONDER_NAMES)}">
@@ -1531,14 +1751,15 @@ class IncrementalMapBuilder:
         for name in NATURAL_WONDER_NAMES:
             wonder_names_xml += f"            <String>{name}</String>\n"
         wonder_names_xml += "        </NaturalWonderNames>"
+        wonder_names_xml = wonder_names_xml.encode('utf-8')
 
         # Replace existing NaturalWonderNames
-        pattern = r'<NaturalWonderNames[^>]*>.*?</NaturalWonderNames>'
+        pattern = rb'<NaturalWonderNames[^>]*>.*?</NaturalWonderNames>'
         if re.search(pattern, content, re.DOTALL):
             content = re.sub(pattern, wonder_names_xml, content, flags=re.DOTALL)
         else:
             # Try null pattern
-            null_pattern = r'<NaturalWonderNames\s+Null="true"\s*/>'
+            null_pattern = rb'<NaturalWonderNames\s+Null="true"\s*/>'
             if re.search(null_pattern, content):
                 content = re.sub(null_pattern, wonder_names_xml, content)
             else:
@@ -1554,8 +1775,12 @@ class IncrementalMapBuilder:
 
         return output_path
 
-    def step10_spawn_points(self) -> Path:
-        """Step 10: Add player spawn points at major Ukrainian cities."""
+    def step10_spawn_points(self, final_dest: Path | None = None) -> Path:
+        """Step 10: Add player spawn points at major Ukrainian cities.
+
+        With final_dest, the map is written straight there (atomically) and
+        hardlinked back into output_dir; final_dest is returned.
+        """
         print("\n" + "=" * 60)
         print("STEP 10: Spawn Points (Starting Locations)")
         print("=" * 60)
@@ -1581,29 +1806,19 @@ class IncrementalMapBuilder:
 
         content = self.current_save_content
 
-        # Get bounds from config
-        import yaml
-        config_path = Path(__file__).parent / "config.yaml"
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-        active = config['active_config']
-        bounds = config['bounds'][active]
-
         # Extract elevation texture for terrain validation
         print("\n  Extracting elevation texture for terrain validation...")
         elevation_array = self._extract_elevation_texture(content)
         print(f"    Elevation texture shape: {elevation_array.shape}")
 
+        # Convert all city lat/lon to hex coordinates (clamped to grid bounds)
+        city_cols, city_rows = self._geo_to_pixels(
+            [city['lon'] for city in SPAWN_CITIES], [city['lat'] for city in SPAWN_CITIES]
+        )
+
         spawn_points = []
         print("\n  City spawn points (with terrain validation):")
-        for city in SPAWN_CITIES:
-            # Convert lat/lon to hex coordinates
-            col = int((city['lon'] - bounds['min_lon']) / (bounds['max_lon'] - bounds['min_lon']) * self.width)
-            row = int((bounds['max_lat'] - city['lat']) / (bounds['max_lat'] - bounds['min_lat']) * self.height)
-
-            # Clamp to grid bounds
-            col = max(0, min(self.width - 1, col))
-            row = max(0, min(self.height - 1, row))
+        for city, col, row in zip(SPAWN_CITIES, city_cols.tolist(), city_rows.tolist()):
 
             # Get terrain at original location
             terrain_name, _ = self._get_terrain_at_hex(elevation_array, col, row)
@@ -1640,82 +1855,81 @@ class IncrementalMapBuilder:
         # Flags indicate which player counts this spawn is valid for:
         # Bit 0 (1) = 1 player, Bit 1 (2) = 2 players, etc.
         num_spawns = len(spawn_points)
-        spawn_xml_items = []
+        all_players = (1 << num_spawns) - 1
         for i, sp in enumerate(spawn_points):
-            # Each spawn is valid from (i+1) players up to num_spawns
+            # Each spawn is valid from (i+1) players up to num_spawns (bits i..num_spawns-1)
             # First spawn: valid for 1+ players, Second: valid for 2+ players, etc.
-            flags = 0
-            for player_count in range(i + 1, num_spawns + 1):
-                flags |= (1 << (player_count - 1))
-            spawn_xml_items.append(f"""            <Item>
-                <SpawnPoints>
-                    <Column>{sp['col']}</Column>
-                    <Row>{sp['file_row']}</Row>
-                </SpawnPoints>
-                <Flags>{flags}</Flags>
-            </Item>""")
-
-        spawn_xml = f"""<SpawnPoints Length="{len(spawn_points)}">
-{chr(10).join(spawn_xml_items)}
-            </SpawnPoints>"""
-
-        # Find and replace existing SpawnPoints section
-        import re
-
-        # Try to match <SpawnPoints Null="true" /> first (empty spawns)
-        null_pattern = r'<SpawnPoints\s+Null="true"\s*/>'
-        if re.search(null_pattern, content):
-            content = re.sub(null_pattern, spawn_xml, content)
-            print(f"\n  Replaced null SpawnPoints: {len(spawn_points)} spawn locations")
-        else:
-            # Try to match existing <SpawnPoints Length=...>...</SpawnPoints>
-            spawn_pattern = r'<SpawnPoints Length="[^"]*">.*?</SpawnPoints>'
-            if re.search(spawn_pattern, content, re.DOTALL):
-                content = re.sub(spawn_pattern, spawn_xml, content, flags=re.DOTALL)
-                print(f"\n  Updated SpawnPoints: {len(spawn_points)} spawn locations")
+            sp['flags'] = all_players & ~((1 << i) - 1)
+        spawn_items = "\n".join(map(_SPAWN_ITEM_TMPL.format_map, spawn_points))
+
+        spawn_xml = (
+            f'<SpawnPoints Length="{num_spawns}">\n{spawn_items}\n            </SpawnPoints>'
+        ).encode('utf-8')
+
+        # Find and replace existing SpawnPoints section: either
+        # <SpawnPoints Null="true" /> (empty spawns) or <SpawnPoints Length=...>...</SpawnPoints>
+        span = self._find_spawn_points_span(content)
+        if span is not None:
+            start, end = span
+            was_null = content[end - 2:end] == b'/>'
+            content = content[:start] + spawn_xml + content[end:]
+            if was_null:
+                print(f"\n  Replaced null SpawnPoints: {len(spawn_points)} spawn locations")
             else:
-                print("  WARNING: Could not find SpawnPoints section to replace")
+                print(f"\n  Updated SpawnPoints: {len(spawn_points)} spawn locations")
+        else:
+            print("  WARNING: Could not find SpawnPoints section to replace")
 
         self.current_save_content = content
 
         # Update EmpiresCount in descriptor to match spawn count
         descriptor = self.descriptor_content
-        empires_pattern = r'<EmpiresCount>\d+</EmpiresCount>'
+        empires_pattern = rb'<EmpiresCount>\d+</EmpiresCount>'
         if re.search(empires_pattern, descriptor):
-            descriptor = re.sub(empires_pattern, f'<EmpiresCount>{num_spawns}</EmpiresCount>', descriptor)
+            descriptor = re.sub(empires_pattern, f'<EmpiresCount>{num_spawns}</EmpiresCount>'.encode('ascii'), descriptor)
             print(f"  Updated EmpiresCount to {num_spawns}")
         self.descriptor_content = descriptor
 
         # Reset FailureFlags to 0 (clear any previous validation errors)
-        failure_pattern = r'<FailureFlags>\d+</FailureFlags>'
+        failure_pattern = rb'<FailureFlags>\d+</FailureFlags>'
         if re.search(failure_pattern, content):
-            content = re.sub(failure_pattern, '<FailureFlags>0</FailureFlags>', content)
+            content = re.sub(failure_pattern, b'<FailureFlags>0</FailureFlags>', content)
             print("  Reset FailureFlags to 0")
         self.current_save_content = content
 
         output_path = self.output_dir / "step10_spawn_points.hmap"
-        self._save_hmap(content, descriptor, output_path)
-
-        return output_path
-
-    def _save_wonder_visualization(self, mapper, ukraine_mask: dict = None):
+        if final_dest is None:
+            self._save_hmap(content, descriptor, output_path)
+            return output_path
+
+        # Write once, into the game folder: temp name in the same dir + atomic rename
+        tmp_path = final_dest.with_name(final_dest.name + ".tmp")
+        self._save_hmap(content, descriptor, tmp_path)
+        os.replace(tmp_path, final_dest)
+        print(f"  Moved into place: {final_dest}")
+        # Keep the step listing in output_dir complete
+        output_path.unlink(missing_ok=True)
+        try:
+            os.link(final_dest, output_path)
+        except OSError:
+            shutil.copyfile(final_dest, output_path)
+
+        return final_dest
+
+    def _save_wonder_visualization(self, mapper, ukraine_mask: np.ndarray = None):
         """Save a visualization of natural wonders."""
 
-        from natural_wonder_mapper import UKRAINE_WONDERS
-
         # Create base map (land/ocean)
         arr = np.zeros((self.height, self.width), dtype=np.uint8)
-        if ukraine_mask:
-            for (col, row), is_land in ukraine_mask.items():
-                if is_land:
-                    arr[row, col] = 1
+        if ukraine_mask is not None:
+            arr[ukraine_mask] = 1
 
         # Get wonder placements
         placements = mapper.get_wonder_placements(ukraine_mask)
         for (col, row), wonder_idx in placements.items():
             arr[row, col] = 2 + (wonder_idx % 7)  # Different values for different wonders
 
-        _fig, ax = plt.subplots(figsize=(16, 9))
+        fig, ax = plt.subplots(figsize=(16, 9))
         # Create colormap with distinct colors for each wonder
         cmap = plt.cm.colors.ListedColormap([
             '#4169E1',  # 0: Ocean
@@ -1747,26 +1961,21 @@ class IncrementalMapBuilder:
             )
         ax.legend(handles=legend_elements, loc='upper right', fontsize=8)
 
-        viz_dir = Path(__file__).parent / "output" / "visualizations"
-        viz_dir.mkdir(parents=True, exist_ok=True)
-        viz_path = viz_dir / "ukraine_natural_wonders.png"
-        plt.savefig(viz_path, dpi=150, bbox_inches='tight')
+        viz_path = self._viz_dir / "ukraine_natural_wonders.png"
+        fig.tight_layout()
+        plt.savefig(viz_path, dpi=150, pil_kwargs={"compress_level": 1})
         plt.close()
         print(f"  Saved wonder visualization: {viz_path}")
 
-    def _save_feature_visualization(self, mapper, ukraine_mask: dict = None):
+    def _save_feature_visualization(self, mapper, ukraine_mask: np.ndarray = None):
         """Save a visualization of features and resources."""
 
-        from feature_mapper import NATURAL_MODIFIERS, RESOURCE_DEPOSITS
-
         # Create base map (land/ocean)
         arr = np.zeros((self.height, self.width), dtype=np.uint8)
-        if ukraine_mask:
-            for (col, row), is_land in ukraine_mask.items():
-                if is_land:
-                    arr[row, col] = 1
+        if ukraine_mask is not None:
+            arr[ukraine_mask] = 1
 
-        _fig, ax = plt.subplots(figsize=(18, 10))
+        fig, ax = plt.subplots(figsize=(18, 10))
 
         # Draw land/ocean background
         land_cmap = mcolors.ListedColormap(['#4169E1', '#90EE90'])
@@ -1804,29 +2013,29 @@ class IncrementalMapBuilder:
             'Porcelain': '#F0F8FF',
         }
 
-        # Plot features
+        # Bucket feature hexes by marker: circles for natural, squares for resources
+        points_by_marker = {'o': ([], []), 's': ([], [])}
         for col, row, poi_index in mapper.features:
             # Skip if outside Ukraine
-            if ukraine_mask and not ukraine_mask.get((col, row), False):
+            if ukraine_mask is not None and not ukraine_mask[row, col]:
                 continue
-
-            # Find feature name
-            feature_name = None
-            for name, idx in {**NATURAL_MODIFIERS, **RESOURCE_DEPOSITS}.items():
-                if idx == poi_index:
-                    feature_name = name
-                    break
-
+            feature_name = POI_NAMES.get(poi_index)
             if feature_name:
-                color = feature_colors.get(feature_name, '#FF00FF')
-                # Use different markers for natural vs resources
-                if poi_index <= 24:
-                    marker = 'o'  # Circle for natural
-                    size = 60
-                else:
-                    marker = 's'  # Square for resources
-                    size = 80
-                ax.scatter(col, row, c=color, s=size, marker=marker, edgecolors='black', linewidths=0.5)
+                offsets, colors = points_by_marker['o' if poi_index <= 24 else 's']
+                offsets.append((col, row))
+                colors.append(feature_colors.get(feature_name, '#FF00FF'))
+
+        # Plot features: one PathCollection per marker shape with per-point colors
+        for marker, size in (('o', 60), ('s', 80)):
+            offsets, colors = points_by_marker[marker]
+            if not offsets:
+                continue
+            style = MarkerStyle(marker)
+            ax.add_collection(PathCollection(
+                [style.get_path().transformed(style.get_transform())], sizes=[size],
+                offsets=np.array(offsets), offset_transform=ax.transData,
+                facecolors=colors, edgecolors='black', linewidths=0.5,
+            ))
 
         ax.set_xlim(-1, self.width + 1)
         ax.set_ylim(self.height + 1, -1)
@@ -1835,10 +2044,11 @@ class IncrementalMapBuilder:
         ax.set_ylabel('Row')
 
         # Create legend
+        present_indices = {f[2] for f in mapper.features}
         legend_elements = []
         for name in sorted(feature_colors.keys()):
-            if any(f[2] == {**NATURAL_MODIFIERS, **RESOURCE_DEPOSITS}.get(name) for f in mapper.features):
-                idx = {**NATURAL_MODIFIERS, **RESOURCE_DEPOSITS}.get(name, 0)
+            idx = POI_INDICES.get(name)
+            if idx in present_indices:
                 marker = 'o' if idx <= 24 else 's'
                 legend_elements.append(
                     Line2D([0], [0], marker=marker, color='w', markerfacecolor=feature_colors[name],
@@ -1848,30 +2058,132 @@ class IncrementalMapBuilder:
         if legend_elements:
             ax.legend(handles=legend_elements, loc='upper left', fontsize=8, ncol=2)
 
-        viz_dir = Path(__file__).parent / "output" / "visualizations"
-        viz_dir.mkdir(parents=True, exist_ok=True)
-        viz_path = viz_dir / "ukraine_features.png"
-        plt.savefig(viz_path, dpi=150, bbox_inches='tight')
+        viz_path = self._viz_dir / "ukraine_features.png"
+        fig.tight_layout()
+        plt.savefig(viz_path, dpi=150, pil_kwargs={"compress_level": 1})
         plt.close()
         print(f"  Saved feature visualization: {viz_path}")
 
-    def build_all(self) -> list[Path]:
-        """Build all incremental steps."""
+    def build_all(self, use_cache: bool = False, final_dest: Path | None = None) -> list[Path]:
+        """Build all incremental steps.
+
+        final_dest is passed on to step10_spawn_points when it runs.
+
+        With use_cache, the leading steps whose cache key still matches the
+        last build are skipped: their .hmap is reused and the builder state
+        after the last of them is restored. A key covers the template,
+        config, raions, this module and data_fetchers/, plus the step's
+        _STEP_CACHE_DEPS contents and the path, size and mtime of its
+        _STEP_CACHE_DATA files, chained through the keys of the steps before
+        it. Keys track data files by stat, not content, and the cached state
+        is unpickled, so caching is opt-in: use_cache=False rebuilds every
+        step without pickling its state, only dropping the stale cache
+        entries of the steps it reruns.
+        """
+        steps = [
+            self.step1_baseline, self.step2_land_ocean, self.step3_territories,
+            self.step4_biomes, self.step5_elevation, self.step6_rivers,
+            self.step7_terrain, self.step8_features, self.step9_natural_wonders,
+            self.step10_spawn_points,
+        ]
+        keys = self._step_cache_keys(steps)
+
         paths = []
-        paths.append(self.step1_baseline())
-        paths.append(self.step2_land_ocean())
-        paths.append(self.step3_territories())
-        paths.append(self.step4_biomes())
-        paths.append(self.step5_elevation())
-        paths.append(self.step6_rivers())
-        paths.append(self.step7_terrain())
-        paths.append(self.step8_features())
-        paths.append(self.step9_natural_wonders())
-        paths.append(self.step10_spawn_points())
+        for step, key in zip(steps, keys if use_cache else ()):
+            cached = self._cached_step_output(step.__name__, key)
+            if cached is None:
+                break
+            paths.append(cached)
+        if paths:
+            print(f"\nReusing cached {steps[0].__name__}..{steps[len(paths) - 1].__name__}")
+            self._restore_cached_step(steps[len(paths) - 1].__name__, paths[-1])
+
+        # Cache entries are written only once every queued .hmap write has landed
+        completed = []
+        try:
+            for step, key in zip(steps[len(paths):], keys[len(paths):]):
+                # Drop the old entry first so a failed rerun can't leave it valid
+                (CACHE_DIR / f"{step.__name__}.hash").unlink(missing_ok=True)
+                if step.__name__ == 'step10_spawn_points':
+                    paths.append(step(final_dest))
+                else:
+                    paths.append(step())
+                if use_cache:
+                    state = {k: getattr(self, k) for k in _STEP_STATE if hasattr(self, k)}
+                    completed.append((step.__name__, key, paths[-1], pickle.dumps(state)))
+        finally:
+            self.finalize()
+
+        for name, key, path, state in completed:
+            self._store_cached_step(name, key, path, state)
         return paths
 
+    def _step_cache_keys(self, steps) -> list[str]:
+        """Chained SHA-256 cache key (hex) per step, see build_all."""
+        root = Path(__file__).parent
+        h = hashlib.sha256()
+        h.update(self.save_content)
+        h.update(self.descriptor_content)
+        sources = [Path(__file__), *sorted((root / 'data_fetchers').glob('*.py'))]
+        for path in [root / 'config.yaml', root / self.config['ukraine']['raions_file'], *sources]:
+            h.update(path.read_bytes())
+        h.update(b'skip_visualizations=%d' % self.skip_visualizations)
+
+        keys = []
+        for step in steps:
+            h = hashlib.sha256(h.digest())
+            h.update(step.__name__.encode())
+            for rel in _STEP_CACHE_DEPS.get(step.__name__, ()):
+                h.update((root / rel).read_bytes())
+            for data in _STEP_CACHE_DATA.get(step.__name__, ()):
+                data = root / data
+                files = sorted(data.rglob('*')) if data.is_dir() else [data]
+                for path in files:
+                    if path.is_file():
+                        st = path.stat()
+                        h.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+            keys.append(h.hexdigest())
+        return keys
+
+    def _cached_step_output(self, name: str, key: str) -> Path | None:
+        """Output .hmap recorded for name under key, or None on a cache miss."""
+        try:
+            cached_key, cached_path = (CACHE_DIR / f"{name}.hash").read_text().split("\n", 1)
+        except (OSError, ValueError):
+            return None
+        path = Path(cached_path)
+        if cached_key != key or not path.exists() or not (CACHE_DIR / f"{name}.pkl").exists():
+            return None
+        return path
+
+    def _restore_cached_step(self, name: str, output_path: Path):
+        """Reload save content, descriptor and step state as left by a cached step."""
+        with zipfile.ZipFile(output_path, 'r') as zf:
+            self.descriptor_content = self._strip_bom(zf.read('Descriptor.hmd'))
+            self.current_save_content = self._strip_bom(zf.read('Save.hms'))
+        with open(CACHE_DIR / f"{name}.pkl", 'rb') as f:
+            for attr, value in pickle.load(f).items():
+                setattr(self, attr, value)
+
+    def _store_cached_step(self, name: str, key: str, output_path: Path, state: bytes):
+        """Record output_path and the pickled step state under key."""
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        (CACHE_DIR / f"{name}.pkl").write_bytes(state)
+        (CACHE_DIR / f"{name}.hash").write_text(f"{key}\n{output_path}")
+
 
 def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Build the Ukraine map incrementally')
+    parser.add_argument('--skip-visualizations', action=argparse.BooleanOptionalAction, default=True,
+                        help='Skip per-step PNG visualizations (default: skip; '
+                             'use --no-skip-visualizations to render them)')
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=False,
+                        help='Reuse unchanged leading steps from the last build '
+                             '(default: off; unpickles state from output/.cache)')
+    args = parser.parse_args()
+
     # Increment version
     version = get_next_version()
     version_str = get_version_string(version)
@@ -1888,9 +2200,6 @@ def main():
         print("Please copy Huge_Ukraine_template.hmap from game Maps folder")
         return
 
-    builder = IncrementalMapBuilder(template_path)
-    paths = builder.build_all()
-
     # Game folder for final map
     game_maps = Path("/home/shivers/.steam/debian-installation/steamapps/compatdata/1124300/pfx/drive_c/users/steamuser/Documents/Humankind/Maps")
 
@@ -1900,16 +2209,26 @@ def main():
         print(f"\nRemoving old incremental folder: {old_incremental}")
         shutil.rmtree(old_incremental)
 
-    # Copy only the final map (step10) to game folder with a clean name
-    final_map = paths[-1]  # step10_spawn_points.hmap
+    # Step 10 writes the final map straight into the game folder with a clean name
     dest_name = f"Ukraine_{version_str}.hmap"
     dest_path = game_maps / dest_name
 
-    print("\n" + "=" * 60)
-    print(f"COPYING FINAL MAP TO GAME FOLDER ({version_str})")
-    print("=" * 60)
-    shutil.copy(final_map, dest_path)
-    print(f"  {final_map.name} -> {dest_name}")
+    builder = IncrementalMapBuilder(template_path, skip_visualizations=args.skip_visualizations)
+    paths = builder.build_all(use_cache=args.cache, final_dest=dest_path)
+
+    # A cached step 10 points at an earlier build's file: link/copy it under this version
+    final_map = paths[-1]
+    if final_map != dest_path:
+        print("\n" + "=" * 60)
+        print(f"COPYING FINAL MAP TO GAME FOLDER ({version_str})")
+        print("=" * 60)
+        try:
+            # Same filesystem: hardlink, no bytes copied
+            os.link(final_map, dest_path)
+        except OSError:
+            # Cross-device or dest exists: kernel-side copy (sendfile/copy_file_range)
+            shutil.copyfile(final_map, dest_path)
+        print(f"  {final_map.name} -> {dest_name}")
 
     print("\n" + "=" * 60)
     print(f"BUILD COMPLETE - {version_str}")
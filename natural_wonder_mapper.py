@@ -22,8 +22,9 @@ Ukrainian Features → Humankind Wonders:
 """
 
 import numpy as np
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 
 
@@ -118,6 +119,26 @@ NATURAL_WONDER_NAMES = [
 ]
 
 
+# radius -> (N, 2) int32 (dcol, drow) offsets of the hex circle around (0, 0)
+_OFFSET_CACHE: Dict[int, np.ndarray] = {}
+
+
+def _hex_circle_offsets(radius: int) -> np.ndarray:
+    """Offset template for NaturalWonderMapper._get_hex_circle, built once per radius."""
+    offsets = _OFFSET_CACHE.get(radius)
+    if offsets is None:
+        offsets = np.array(
+            [(dc, dr)
+             for dr in range(-radius, radius + 1)
+             for dc in range(-radius, radius + 1)
+             # Approximate hex distance
+             if abs(dr) + abs(dc) <= radius + (radius // 2)],
+            dtype=np.int32,
+        )
+        _OFFSET_CACHE[radius] = offsets
+    return offsets
+
+
 class NaturalWonderMapper:
     """Maps natural wonders to hex grid."""
 
@@ -153,110 +174,145 @@ class NaturalWonderMapper:
 
         return col, row
 
-    def _get_hex_circle(self, center_col: int, center_row: int, radius: int) -> Set[Tuple[int, int]]:
+    def _geo_to_pixel_batch(self, lons, lats) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized _geo_to_pixel: (cols, rows) int32 arrays for arrays of lon/lat."""
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        cols = ((lons - self.min_lon) / (self.max_lon - self.min_lon) * self.width).astype(np.int32)
+        rows = ((self.max_lat - lats) / (self.max_lat - self.min_lat) * self.height).astype(np.int32)
+        return np.clip(cols, 0, self.width - 1), np.clip(rows, 0, self.height - 1)
+
+    def _get_hex_circle(self, center_col: int, center_row: int, radius: int) -> np.ndarray:
         """
         Get all hexes within a radius of a center hex.
 
         Uses simple rectangular approximation for hex grid.
-        """
-        hexes = set()
 
-        for dr in range(-radius, radius + 1):
-            for dc in range(-radius, radius + 1):
-                # Approximate hex distance
-                if abs(dr) + abs(dc) <= radius + (radius // 2):
-                    nc, nr = center_col + dc, center_row + dr
-                    if 0 <= nc < self.width and 0 <= nr < self.height:
-                        hexes.add((nc, nr))
+        Returns:
+            (N, 2) int32 array of (col, row), each hex once
+        """
+        pts = _hex_circle_offsets(radius) + np.array([center_col, center_row], dtype=np.int32)
+        inside = ((pts[:, 0] >= 0) & (pts[:, 0] < self.width)
+                  & (pts[:, 1] >= 0) & (pts[:, 1] < self.height))
+        return pts[inside]
 
-        return hexes
+    def _is_land(self, land_mask: np.ndarray, col: int, row: int) -> bool:
+        """Bounds-checked land_mask[row, col]; off-grid counts as ocean."""
+        return 0 <= row < self.height and 0 <= col < self.width and bool(land_mask[row, col])
 
-    def get_wonder_placements(
+    def get_wonder_placement_arrays(
         self,
-        land_mask: Optional[Dict[Tuple[int, int], bool]] = None
-    ) -> Dict[Tuple[int, int], int]:
+        land_mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Get wonder placements as {(col, row): wonder_index}.
+        Get wonder placements as parallel arrays.
 
         Args:
-            land_mask: Optional dict of {(col, row): is_land}
+            land_mask: Optional (height, width) bool array, True = land
 
         Returns:
-            Dict mapping hex coordinates to wonder index (1-based)
+            ((N, 2) int32 (col, row) hexes, (N,) uint8 wonder index (1-based)).
+            A hex covered by several wonders appears once per wonder; the
+            later entry wins, as in get_wonder_placements.
         """
-        placements = {}
+        all_hexes = []
+        all_idxs = []
+        # Log lines are written in one go after the loop
+        lines: List[str] = []
+
+        # Wonder centers for all wonders in one array pass
+        center_cols, center_rows = self._geo_to_pixel_batch(
+            [w.lon for w in UKRAINE_WONDERS], [w.lat for w in UKRAINE_WONDERS]
+        )
 
-        for wonder in UKRAINE_WONDERS:
+        for wonder, center_col, center_row in zip(UKRAINE_WONDERS, center_cols.tolist(), center_rows.tolist()):
             # Check if wonder name is in our list
             if wonder.humankind_name not in self.wonder_indices:
-                print(f"  WARNING: Unknown wonder '{wonder.humankind_name}', skipping")
+                lines.append(f"  WARNING: Unknown wonder '{wonder.humankind_name}', skipping")
                 continue
 
             wonder_idx = self.wonder_indices[wonder.humankind_name]
-            center_col, center_row = self._geo_to_pixel(wonder.lon, wonder.lat)
 
             # Check if center is on land
-            if land_mask and not land_mask.get((center_col, center_row), False):
-                print(f"  WARNING: {wonder.ukrainian_name} center is in ocean, adjusting...")
-                # Try to find nearby land hex
-                found = False
-                for dr in range(-3, 4):
-                    for dc in range(-3, 4):
-                        test_pos = (center_col + dc, center_row + dr)
-                        if land_mask.get(test_pos, False):
-                            center_col, center_row = test_pos
-                            found = True
-                            break
-                    if found:
-                        break
-                if not found:
-                    print(f"  ERROR: Could not place {wonder.ukrainian_name}, no land nearby")
+            if land_mask is not None and not self._is_land(land_mask, center_col, center_row):
+                lines.append(f"  WARNING: {wonder.ukrainian_name} center is in ocean, adjusting...")
+                # Snap to the nearest land hex within 3 rows/cols
+                r0, c0 = max(0, center_row - 3), max(0, center_col - 3)
+                ys, xs = np.nonzero(land_mask[r0:center_row + 4, c0:center_col + 4])
+                if len(ys) == 0:
+                    lines.append(f"  ERROR: Could not place {wonder.ukrainian_name}, no land nearby")
                     continue
+                k = np.argmin((ys - (center_row - r0)) ** 2 + (xs - (center_col - c0)) ** 2)
+                center_col, center_row = c0 + int(xs[k]), r0 + int(ys[k])
 
             # Get all hexes for this wonder
             wonder_hexes = self._get_hex_circle(center_col, center_row, wonder.radius)
 
             # Filter to land only
-            if land_mask:
-                wonder_hexes = {h for h in wonder_hexes if land_mask.get(h, False)}
+            if land_mask is not None:
+                wonder_hexes = wonder_hexes[land_mask[wonder_hexes[:, 1], wonder_hexes[:, 0]]]
 
-            if not wonder_hexes:
-                print(f"  WARNING: No valid hexes for {wonder.ukrainian_name}")
+            if len(wonder_hexes) == 0:
+                lines.append(f"  WARNING: No valid hexes for {wonder.ukrainian_name}")
                 continue
 
             # Place wonder
-            for hex_pos in wonder_hexes:
-                placements[hex_pos] = wonder_idx
+            all_hexes.append(wonder_hexes)
+            all_idxs.append(np.full(len(wonder_hexes), wonder_idx, dtype=np.uint8))
 
-            print(f"  {wonder.ukrainian_name} -> {wonder.humankind_name}: {len(wonder_hexes)} hexes at ({center_col}, {center_row})")
+            lines.append(f"  {wonder.ukrainian_name} -> {wonder.humankind_name}: {len(wonder_hexes)} hexes at ({center_col}, {center_row})")
 
-        return placements
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+
+        if not all_hexes:
+            return np.empty((0, 2), dtype=np.int32), np.empty(0, dtype=np.uint8)
+        return np.concatenate(all_hexes), np.concatenate(all_idxs)
+
+    def get_wonder_placements(
+        self,
+        land_mask: Optional[np.ndarray] = None
+    ) -> Dict[Tuple[int, int], int]:
+        """
+        Get wonder placements as {(col, row): wonder_index}.
+
+        Args:
+            land_mask: Optional (height, width) bool array, True = land
+
+        Returns:
+            Dict mapping hex coordinates to wonder index (1-based)
+        """
+        hexes, idxs = self.get_wonder_placement_arrays(land_mask)
+        return dict(zip(map(tuple, hexes.tolist()), idxs.tolist()))
 
     def create_wonder_texture(
         self,
-        land_mask: Optional[Dict[Tuple[int, int], bool]] = None
+        land_mask: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """
         Create natural wonder texture array.
 
         Args:
-            land_mask: Optional dict of {(col, row): is_land}
+            land_mask: Optional (height, width) bool array, True = land
 
         Returns:
             numpy array of shape (height, width, 4) with RGBA values
         """
         # Get placements
-        placements = self.get_wonder_placements(land_mask)
+        hexes, idxs = self.get_wonder_placement_arrays(land_mask)
 
         # Initialize with zeros (no wonders)
         texture = np.zeros((self.height, self.width, 4), dtype=np.uint8)
 
-        # Place wonders
-        for (col, row), wonder_idx in placements.items():
-            texture[row, col, 0] = wonder_idx  # R = wonder index
-            # G, B, A remain 0
+        # Place wonders: R = wonder index; G, B, A remain 0. NumPy leaves the
+        # winner of repeated indices unspecified, so keep each hex's last
+        # entry explicitly (first occurrence in the reversed flat indices)
+        flat = hexes[:, 1] * self.width + hexes[:, 0]
+        _, last = np.unique(flat[::-1], return_index=True)
+        last = len(flat) - 1 - last
+        texture[hexes[last, 1], hexes[last, 0], 0] = idxs[last]
 
-        print(f"  Total wonder hexes: {len(placements)}")
+        print(f"  Total wonder hexes: {np.count_nonzero(texture[:, :, 0])}")
 
         return texture
 
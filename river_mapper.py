@@ -12,12 +12,32 @@ River Classification:
 """
 
 import geopandas as gpd
+import shapely
 from shapely.geometry import box, Point, LineString
-from shapely.ops import unary_union
 import numpy as np
+from scipy.spatial import cKDTree
+import re
 from pathlib import Path
-from typing import Dict, Tuple, Set, Optional, List
-from dataclasses import dataclass
+from typing import Dict, Tuple, Set, Optional, List, Union
+from dataclasses import dataclass, field
+from collections import defaultdict, deque
+
+try:
+    from rasterio.features import rasterize
+    from rasterio.transform import from_bounds
+    RASTERIO_AVAILABLE = True
+except ImportError:
+    RASTERIO_AVAILABLE = False
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+# Land masks: (height, width) bool array, or legacy {(col, row): is_land} dict
+LandMask = Union[Dict[Tuple[int, int], bool], np.ndarray]
 
 
 # Major Ukrainian rivers to include (by importance)
@@ -36,6 +56,19 @@ UKRAINE_RIVERS = [
 ]
 
 
+# Major Ukrainian rivers by OSM name (Ukrainian/English), matched as substrings
+MAJOR_RIVER_PATTERNS = [
+    'Дніпро', 'Дністер', 'Південний Буг', 'Сіверський Донець',
+    'Десна', 'Прип\'ять', 'Буг', 'Прут', 'Дунай', 'Дон',
+    'Інгул', 'Ворскла', 'Псел', 'Сула', 'Рось', 'Тетерів',
+    'Случ', 'Горинь', 'Стир', 'Збруч', 'Серет', 'Оскіл',
+    'Сейм', 'Інгулець', 'Самара', 'Оріль', 'Кальміус',
+    # English names as fallback
+    'Dnieper', 'Dniester', 'Southern Bug', 'Donets',
+]
+_MAJOR_RIVER_RE = re.compile('|'.join(map(re.escape, MAJOR_RIVER_PATTERNS)), re.IGNORECASE)
+
+
 # Major Dnipro reservoirs (bounding boxes: min_lon, min_lat, max_lon, max_lat)
 # These are mapped as Lake terrain, not regular rivers
 DNIPRO_RESERVOIRS = {
@@ -47,8 +80,10 @@ DNIPRO_RESERVOIRS = {
     'Kakhovka': (33.5, 46.65, 35.2, 47.65),      # Kakhovka Reservoir (pre-2023)
 }
 
+_RESERVOIR_BBOXES = np.array(list(DNIPRO_RESERVOIRS.values()), dtype=np.float64)
+
 # Dnipro river names in various data sources
-DNIPRO_NAMES = [
+DNIPRO_NAMES = frozenset([
     # English variants
     'Dnieper', 'Dnipro', 'Dnepr', 'Dniepr',
     # Ukrainian
@@ -59,7 +94,7 @@ DNIPRO_NAMES = [
     'Дняпро',
     # Mixed/bilingual
     'Дняпро / Дніпро', 'Днепр / Дніпро',
-]
+])
 
 # Major natural lakes in Ukraine (bounding boxes: min_lon, min_lat, max_lon, max_lat)
 # These are the 5 biggest lakes, mapped as Lake terrain
@@ -91,18 +126,280 @@ MAJOR_LAKES = {
 POROHY_ELEVATION_THRESHOLD = 30  # meters
 
 
-@dataclass
+@dataclass(eq=False)
 class RiverClassification:
-    """Classification of river hexes into categories."""
-    regular_rivers: Set[Tuple[int, int]]   # Normal river - use river texture
-    lakes: Set[Tuple[int, int]]            # Natural lakes + reservoirs - use Lake terrain
-    dnipro: Set[Tuple[int, int]]           # Dnipro river - consecutive lake chain
+    """Classification of river hexes into categories.
+
+    Each category is an (N, 2) int32 array of (col, row) pairs; as_set()
+    gives a cached set-of-tuples view for membership-heavy consumers.
+    """
+    regular_rivers: np.ndarray   # Normal river - use river texture
+    lakes: np.ndarray            # Natural lakes + reservoirs - use Lake terrain
+    dnipro: np.ndarray           # Dnipro river - consecutive lake chain
+    _sets: Dict[str, Set[Tuple[int, int]]] = field(default_factory=dict, init=False, repr=False)
+
+    def as_set(self, name: str) -> Set[Tuple[int, int]]:
+        """Get category `name` ('regular_rivers', 'lakes' or 'dnipro') as a set of (col, row)."""
+        if name not in self._sets:
+            self._sets[name] = set(map(tuple, getattr(self, name).tolist()))
+        return self._sets[name]
+
+
+def _hexes_to_array(hexes) -> np.ndarray:
+    """Pack an iterable of (col, row) hexes into an (N, 2) int32 array."""
+    return np.array(list(hexes), dtype=np.int32).reshape(-1, 2)
+
+
+# Neighbor offsets (dc, dr) indexed by [row & 1][edge], edge order
+# NE, E, SE, SW, W, NW (matches RiverMapper._get_hex_neighbors)
+_EDGE_OFFSETS = np.array([
+    [[0, -1], [1, 0], [0, 1], [-1, 1], [-1, 0], [-1, -1]],   # Even rows
+    [[1, -1], [1, 0], [1, 1], [0, 1], [-1, 0], [0, -1]],     # Odd rows
+], dtype=np.int8)
+
+
+def _to_axial(col: int, row: int) -> Tuple[int, int]:
+    """Offset (col, row), odd rows shifted east, to axial (q, r)."""
+    return col - (row - (row & 1)) // 2, row
+
+
+def _axial_distance(a: Tuple[int, int], b: Tuple[int, int]) -> int:
+    """Hex distance between two offset (col, row) hexes; 1 means adjacent."""
+    q1, r1 = _to_axial(*a)
+    q2, r2 = _to_axial(*b)
+    dq, dr = q1 - q2, r1 - r2
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+def _flow_direction_kernel(elevation: np.ndarray, cols: np.ndarray, rows: np.ndarray,
+                           center_col: int) -> np.ndarray:
+    """
+    Downstream exit edge for each (cols[i], rows[i]).
+
+    Each hex flows toward its lowest strictly lower neighbor (the first
+    such edge wins ties). With no lower neighbor the geographic heuristic
+    applies: Ukrainian rivers run south toward the Black Sea, so hexes
+    east of center_col exit SW (3) and the rest SE (2).
+    """
+    height, width = elevation.shape
+    edges = np.empty(cols.shape[0], dtype=np.uint8)
+    for i in prange(cols.shape[0]):
+        col = cols[i]
+        row = rows[i]
+        lowest = elevation[row, col]
+        best_edge = -1
+        for edge in range(6):
+            nc = col + _EDGE_OFFSETS[row & 1, edge, 0]
+            nr = row + _EDGE_OFFSETS[row & 1, edge, 1]
+            if 0 <= nc < width and 0 <= nr < height and elevation[nr, nc] < lowest:
+                lowest = elevation[nr, nc]
+                best_edge = edge
+        if best_edge < 0:
+            # No lower neighbor: eastern rivers flow SW, western rivers SE
+            best_edge = 3 if col > center_col else 2
+        edges[i] = best_edge
+    return edges
+
+
+if NUMBA_AVAILABLE:
+    _flow_direction_kernel = njit(cache=True, parallel=True)(_flow_direction_kernel)
+
+
+def _remove_small_components_kernel(grid: np.ndarray, min_size: int) -> np.ndarray:
+    """Copy of bool grid without hex-connected components smaller than min_size."""
+    height, width = grid.shape
+    out = grid.copy()
+    seen = np.zeros((height, width), dtype=np.bool_)
+    # BFS queue; after a component is drained, queue[:tail] holds its members
+    queue = np.empty((height * width, 2), dtype=np.int32)
+    for row in range(height):
+        for col in range(width):
+            if not grid[row, col] or seen[row, col]:
+                continue
+            seen[row, col] = True
+            queue[0, 0] = col
+            queue[0, 1] = row
+            head = 0
+            tail = 1
+            while head < tail:
+                c = queue[head, 0]
+                r = queue[head, 1]
+                head += 1
+                for edge in range(6):
+                    nc = c + _EDGE_OFFSETS[r & 1, edge, 0]
+                    nr = r + _EDGE_OFFSETS[r & 1, edge, 1]
+                    if 0 <= nc < width and 0 <= nr < height and grid[nr, nc] and not seen[nr, nc]:
+                        seen[nr, nc] = True
+                        queue[tail, 0] = nc
+                        queue[tail, 1] = nr
+                        tail += 1
+            if tail < min_size:
+                for k in range(tail):
+                    out[queue[k, 1], queue[k, 0]] = False
+    return out
+
+
+if NUMBA_AVAILABLE:
+    _remove_small_components_kernel = njit(cache=True)(_remove_small_components_kernel)
+
+
+def _hexes_to_grid(hexes, height: int, width: int) -> np.ndarray:
+    """Scatter (col, row) hexes into a (height, width) bool membership grid."""
+    grid = np.zeros((height, width), dtype=bool)
+    if len(hexes):
+        cols, rows = _hexes_to_array(hexes).T
+        grid[rows, cols] = True
+    return grid
+
+
+def _grid_to_array(grid: np.ndarray) -> np.ndarray:
+    """(N, 2) int32 array of (col, row) for the True cells of a bool grid, row-major."""
+    rows, cols = np.nonzero(grid)
+    return np.stack([cols, rows], axis=1).astype(np.int32)
+
+
+def _filter_hexes(hexes, grid: np.ndarray) -> Set[Tuple[int, int]]:
+    """Set of the (col, row) hexes whose cell in a bool grid is True."""
+    if not hexes:
+        return set()
+    arr = _hexes_to_array(hexes)
+    arr = arr[grid[arr[:, 1], arr[:, 0]]]
+    return set(zip(arr[:, 0].tolist(), arr[:, 1].tolist()))
+
+
+def _grid_to_hexes(grid: np.ndarray) -> Set[Tuple[int, int]]:
+    """Set of (col, row) for the True cells of a bool grid."""
+    rows, cols = np.nonzero(grid)
+    return set(zip(cols.tolist(), rows.tolist()))
+
+
+def _bfs_kernel(passable: np.ndarray, target: np.ndarray, neighbors: np.ndarray,
+                start_col: int, start_row: int, max_depth: int):
+    """
+    Hex BFS from (start_col, start_row) through passable cells.
+
+    Stops at the first target cell discovered as a neighbor (targets need
+    not be passable); cells at depth max_depth are not expanded. Returns
+    (last_col, last_row, parents): last is the cell the target was reached
+    from, (-1, -1) if none is reachable. parents[row, col] is the flat
+    index of the cell each visited cell was reached from (-1 unvisited,
+    the start points to itself).
+    """
+    height, width = passable.shape
+    parents = np.full((height, width), -1, dtype=np.int32)
+    depth = np.zeros((height, width), dtype=np.int32)
+    queue = np.empty(height * width, dtype=np.int32)
+    parents[start_row, start_col] = start_row * width + start_col
+    queue[0] = start_row * width + start_col
+    head = 0
+    tail = 1
+    while head < tail:
+        cur = queue[head]
+        head += 1
+        row = cur // width
+        col = cur - row * width
+        if depth[row, col] >= max_depth:
+            continue
+        for edge in range(6):
+            nc = neighbors[row, col, edge, 0]
+            nr = neighbors[row, col, edge, 1]
+            if nc < 0:
+                continue
+            if target[nr, nc]:
+                return col, row, parents
+            if parents[nr, nc] < 0 and passable[nr, nc]:
+                parents[nr, nc] = cur
+                depth[nr, nc] = depth[row, col] + 1
+                queue[tail] = nr * width + nc
+                tail += 1
+    return -1, -1, parents
+
+
+if NUMBA_AVAILABLE:
+    _bfs_kernel = njit(cache=True)(_bfs_kernel)
+
+
+def _trace_segments_kernel(river: np.ndarray, count: np.ndarray, endpoints: np.ndarray,
+                           neighbors: np.ndarray):
+    """
+    Split the river cells of a bool grid into simple paths (see
+    RiverMapper._trace_river_arrays).
+
+    count holds each cell's number of river neighbors and endpoints the
+    flat indices of cells with at most one, in the order they should be
+    tried (last first). Each path starts at a cell with at most one
+    unvisited river neighbor if there is one, else at the first unvisited
+    cell in row-major order, and follows the first unvisited neighbor in
+    edge order. Returns (order, starts): flat indices of every river cell
+    in traversal order, and the offset in order where each path begins.
+    """
+    height, width = river.shape
+    remaining = river.copy()
+    count = count.copy()
+    n = np.count_nonzero(river)
+    order = np.empty(n, dtype=np.int32)
+    starts = np.empty(n, dtype=np.int32)
+    # Endpoint candidates; a cell is pushed again when its count drops to 1
+    stack = np.empty(2 * n + 1, dtype=np.int32)
+    top = endpoints.shape[0]
+    stack[:top] = endpoints
+    scan = 0
+    k = 0
+    n_seg = 0
+    while k < n:
+        start = -1
+        while top > 0:
+            top -= 1
+            if remaining[stack[top] // width, stack[top] % width]:
+                start = stack[top]
+                break
+        if start < 0:
+            while not remaining[scan // width, scan % width]:
+                scan += 1
+            start = scan
+        starts[n_seg] = k
+        n_seg += 1
+        cur = start
+        while cur >= 0:
+            row = cur // width
+            col = cur - row * width
+            remaining[row, col] = False
+            order[k] = cur
+            k += 1
+            cur = -1
+            for edge in range(6):
+                nc = neighbors[row, col, edge, 0]
+                nr = neighbors[row, col, edge, 1]
+                if nc >= 0 and remaining[nr, nc]:
+                    count[nr, nc] -= 1
+                    if count[nr, nc] == 1:
+                        stack[top] = nr * width + nc
+                        top += 1
+                    if cur < 0:
+                        cur = nr * width + nc
+    return order, starts[:n_seg]
+
+
+if NUMBA_AVAILABLE:
+    _trace_segments_kernel = njit(cache=True)(_trace_segments_kernel)
+
+
+def _path_from_parent_grid(parents: np.ndarray, col: int, row: int) -> List[Tuple[int, int]]:
+    """Walk _bfs_kernel parent pointers back from (col, row); returns the path start..node."""
+    width = parents.shape[1]
+    path = [(col, row)]
+    node = row * width + col
+    while parents.flat[node] != node:
+        node = int(parents.flat[node])
+        path.append((node % width, node // width))
+    path.reverse()
+    return path
 
 
 class RiverMapper:
     """Maps rivers to hex grid."""
 
-    def __init__(self, bounds: dict, grid_width: int, grid_height: int):
+    def __init__(self, bounds: dict, grid_width: int, grid_height: int, load_rivers: bool = True):
         """
         Initialize river mapper.
 
@@ -110,6 +407,8 @@ class RiverMapper:
             bounds: {min_lon, max_lon, min_lat, max_lat}
             grid_width: Number of hex columns
             grid_height: Number of hex rows
+            load_rivers: Read the river shapefiles; False gives a mapper
+                         for grid-only helpers such as get_dnipro_bank_elevations
         """
         self.bounds = bounds
         self.width = grid_width
@@ -120,8 +419,30 @@ class RiverMapper:
         self.min_lat = bounds['min_lat']
         self.max_lat = bounds['max_lat']
 
+        # Per-hex lon/lat arrays, built on first use (see _hex_lonlat_grid)
+        self._lonlat_grid = None
+
+        # River and Dnipro grids only depend on the loaded rivers, so they
+        # are traced once (see get_river_hexes_fast, _get_dnipro_hexes)
+        self._river_grid = None
+        self._dnipro_grid = None
+
+        # Dense copy of the last land-mask dict seen (see _land_grid)
+        self._land_grid_src = None
+        self._land_grid_cache = None
+
+        # Neighbor lookups are table reads (see _build_neighbor_tables)
+        self._build_neighbor_tables()
+
         # Load river data
-        self.rivers_gdf = self._load_rivers()
+        self.rivers_gdf = self._load_rivers() if load_rivers else gpd.GeoDataFrame()
+
+        # Dnipro segments (MultiLineStrings flattened), filtered once
+        if not self.rivers_gdf.empty and 'name' in self.rivers_gdf.columns:
+            dnipro_mask = self.rivers_gdf['name'].isin(DNIPRO_NAMES).to_numpy()
+            self._dnipro_geoms = shapely.get_parts(self.rivers_gdf.geometry.values[dnipro_mask])
+        else:
+            self._dnipro_geoms = np.empty(0, dtype=object)
 
     def _load_rivers(self) -> gpd.GeoDataFrame:
         """Load and filter rivers for Ukraine region."""
@@ -130,46 +451,41 @@ class RiverMapper:
         ne_path = Path(__file__).parent / "data" / "rivers" / "ne_10m_rivers_lake_centerlines.shp"
 
         if osm_path.exists():
-            rivers = gpd.read_file(osm_path)
-            print(f"  Loaded {len(rivers)} OSM waterway features")
-
-            # Filter to relevant waterway types
-            # fclass values: river (21k), stream (139k), canal (9k), drain (65k)
-            # At ~15-20km per hex, only include major named rivers
-            if 'fclass' in rivers.columns:
-                rivers = rivers[rivers['fclass'] == 'river']
-
-                # Filter to major Ukrainian rivers by name (Ukrainian/English)
-                major_river_patterns = [
-                    'Дніпро', 'Дністер', 'Південний Буг', 'Сіверський Донець',
-                    'Десна', 'Прип\'ять', 'Буг', 'Прут', 'Дунай', 'Дон',
-                    'Інгул', 'Ворскла', 'Псел', 'Сула', 'Рось', 'Тетерів',
-                    'Случ', 'Горинь', 'Стир', 'Збруч', 'Серет', 'Оскіл',
-                    'Сейм', 'Інгулець', 'Самара', 'Оріль', 'Кальміус',
-                    # English names as fallback
-                    'Dnieper', 'Dniester', 'Southern Bug', 'Donets',
-                ]
-
-                # Keep rivers matching any of the major river names
-                mask = rivers['name'].str.contains('|'.join(major_river_patterns),
-                                                    case=False, na=False, regex=True)
-                rivers = rivers[mask]
-                print(f"  After filtering (major rivers): {len(rivers)} features")
-
-            # Filter to map bounding box with margin
+            # Map bounding box with margin
             ukraine_box = box(
                 self.min_lon - 0.5,
                 self.min_lat - 0.5,
                 self.max_lon + 0.5,
                 self.max_lat + 0.5
             )
-            rivers = rivers[rivers.intersects(ukraine_box)]
-            rivers = rivers.clip(ukraine_box)
+
+            # Filter to relevant waterway types
+            # fclass values: river (21k), stream (139k), canal (9k), drain (65k)
+            # At ~15-20km per hex, only include major named rivers.
+            # The bbox and fclass filters run inside GDAL (spatial index +
+            # attribute filter), so out-of-area features are never parsed.
+            rivers = gpd.read_file(
+                osm_path,
+                bbox=ukraine_box.bounds,
+                columns=['fclass', 'name'],
+                where="fclass = 'river'",
+            )
+            print(f"  Loaded {len(rivers)} OSM river features in bounds")
+
+            # Keep rivers matching any of the major river names
+            mask = np.fromiter(
+                (isinstance(name, str) and _MAJOR_RIVER_RE.search(name) is not None
+                 for name in rivers['name']),
+                dtype=bool, count=len(rivers),
+            )
+            rivers = rivers[mask]
+            print(f"  After filtering (major rivers): {len(rivers)} features")
+
+            rivers = self._clip_to_box(rivers, ukraine_box)
             print(f"  After clipping to bounds: {len(rivers)} features")
 
         elif ne_path.exists():
             print("  Warning: OSM data not found, falling back to Natural Earth")
-            rivers = gpd.read_file(ne_path)
 
             # Filter to Ukraine bounding box with some margin
             ukraine_box = box(
@@ -178,8 +494,8 @@ class RiverMapper:
                 self.max_lon + 1,
                 self.max_lat + 1
             )
-            rivers = rivers[rivers.intersects(ukraine_box)]
-            rivers = rivers.clip(ukraine_box)
+            rivers = gpd.read_file(ne_path, bbox=ukraine_box.bounds)
+            rivers = self._clip_to_box(rivers, ukraine_box)
             print(f"  Loaded {len(rivers)} Natural Earth river segments")
 
         else:
@@ -188,6 +504,13 @@ class RiverMapper:
 
         return rivers
 
+    @staticmethod
+    def _clip_to_box(rivers: gpd.GeoDataFrame, bbox) -> gpd.GeoDataFrame:
+        """Keep rivers intersecting bbox (STRtree query) and clip them to it."""
+        tree = shapely.STRtree(rivers.geometry.values)
+        idx = tree.query(bbox, predicate='intersects')
+        return rivers.iloc[np.sort(idx)].clip(bbox)
+
     def _pixel_to_geo(self, col: int, row: int) -> Tuple[float, float]:
         """Convert pixel coordinates to geographic coordinates."""
         lon = self.min_lon + (col / self.width) * (self.max_lon - self.min_lon)
@@ -200,6 +523,18 @@ class RiverMapper:
         row = int((self.max_lat - lat) / (self.max_lat - self.min_lat) * self.height)
         return col, row
 
+    def _geo_to_pixel_vec(self, lon: np.ndarray, lat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized _geo_to_pixel: (cols, rows) int32 arrays, not bounds-checked."""
+        cols = ((lon - self.min_lon) / (self.max_lon - self.min_lon) * self.width).astype(np.int32)
+        rows = ((self.max_lat - lat) / (self.max_lat - self.min_lat) * self.height).astype(np.int32)
+        return cols, rows
+
+    def _pixel_to_geo_vec(self, cols: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized _pixel_to_geo: (lons, lats) float arrays."""
+        lons = self.min_lon + (cols / self.width) * (self.max_lon - self.min_lon)
+        lats = self.max_lat - (rows / self.height) * (self.max_lat - self.min_lat)
+        return lons, lats
+
     def get_river_hexes(self, buffer_km: float = 5.0) -> Set[Tuple[int, int]]:
         """
         Get set of hex coordinates that contain rivers.
@@ -215,26 +550,24 @@ class RiverMapper:
 
         print(f"  Mapping rivers to hex grid ({self.width}x{self.height})...")
 
-        river_hexes = set()
-
         # Convert buffer from km to degrees (approximate)
         # 1 degree lat ≈ 111 km, 1 degree lon ≈ 111 * cos(lat) km
         avg_lat = (self.min_lat + self.max_lat) / 2
         buffer_deg = buffer_km / 111.0  # Simplified, good enough for this purpose
 
-        # Buffer the rivers slightly to catch adjacent hexes
-        buffered_rivers = self.rivers_gdf.geometry.buffer(buffer_deg / 2)
-        all_rivers = unary_union(buffered_rivers)
-
-        # Check each hex
-        for row in range(self.height):
-            for col in range(self.width):
-                lon, lat = self._pixel_to_geo(col, row)
-                point = Point(lon, lat)
+        # Hex center near a river <=> within buffer_deg/2 of the rivers buffered
+        # by buffer_deg/2: merge the lines first, then buffer once by the sum
+        all_rivers = shapely.union_all(self.rivers_gdf.geometry.values)
+        near_rivers = shapely.buffer(all_rivers, buffer_deg)
+        shapely.prepare(near_rivers)
 
-                # Check if hex center is near a river
-                if all_rivers.contains(point) or all_rivers.distance(point) < buffer_deg / 2:
-                    river_hexes.add((col, row))
+        # Test every hex center in one call
+        lons = self.min_lon + (np.arange(self.width) / self.width) * (self.max_lon - self.min_lon)
+        lats = self.max_lat - (np.arange(self.height) / self.height) * (self.max_lat - self.min_lat)
+        lon_grid, lat_grid = np.meshgrid(lons, lats)
+        inside = shapely.contains_xy(near_rivers, lon_grid.ravel(), lat_grid.ravel())
+        rows, cols = np.divmod(np.flatnonzero(inside), self.width)
+        river_hexes = set(zip(cols.tolist(), rows.tolist()))
 
         print(f"  Found {len(river_hexes)} river hexes")
         return river_hexes
@@ -248,76 +581,118 @@ class RiverMapper:
         """
         if self.rivers_gdf.empty:
             return set()
+        return _grid_to_hexes(self._river_hex_grid())
 
-        print(f"  Mapping rivers to hex grid (fast method)...")
+    def _river_hex_grid(self) -> np.ndarray:
+        """(H, W) bool grid of river hexes (see get_river_hexes_fast), built once."""
+        if self.rivers_gdf.empty:
+            return np.zeros((self.height, self.width), dtype=bool)
 
-        river_hexes = set()
+        if self._river_grid is None:
+            print(f"  Mapping rivers to hex grid (fast method)...")
 
-        # Calculate hex size in degrees for proper sampling
-        # We need to sample at least once per hex to avoid gaps
-        hex_width_deg = (self.max_lon - self.min_lon) / self.width
-        hex_height_deg = (self.max_lat - self.min_lat) / self.height
-        sample_interval = min(hex_width_deg, hex_height_deg) * 0.5  # Sample twice per hex
+            # Trace, filter and gap-fill on one grid; convert to a set only at the end
+            grid = self._trace_lines_to_grid(self.rivers_gdf.geometry.values)
 
-        # For each river segment, walk along it and mark hexes
-        for idx, river in self.rivers_gdf.iterrows():
-            geom = river.geometry
+            print(f"  Found {np.count_nonzero(grid)} river hexes")
 
-            if geom is None or geom.is_empty:
-                continue
+            # Connect nearby river segments (fill gaps up to 2 hexes)
+            self._river_grid = self._connect_river_grid(grid)
 
-            # Handle both LineString and MultiLineString
-            if geom.geom_type == 'LineString':
-                lines = [geom]
-            elif geom.geom_type == 'MultiLineString':
-                lines = list(geom.geoms)
-            else:
-                continue
+        return self._river_grid
 
-            for line in lines:
-                # Sample points along the line
-                length = line.length
-                if length == 0:
-                    continue
-
-                # Sample at hex resolution to ensure no gaps
-                num_samples = max(2, int(length / sample_interval) + 1)
-                prev_col, prev_row = None, None
-
-                for i in range(num_samples + 1):
-                    fraction = i / num_samples
-                    point = line.interpolate(fraction, normalized=True)
-                    col, row = self._geo_to_pixel(point.x, point.y)
-
-                    # Check bounds
-                    if 0 <= col < self.width and 0 <= row < self.height:
-                        river_hexes.add((col, row))
-
-                        # Fill gaps between samples using Bresenham-like interpolation
-                        if prev_col is not None and prev_row is not None:
-                            if abs(col - prev_col) > 1 or abs(row - prev_row) > 1:
-                                # There's a gap, fill it
-                                steps = max(abs(col - prev_col), abs(row - prev_row))
-                                for step in range(1, steps):
-                                    interp_col = prev_col + (col - prev_col) * step // steps
-                                    interp_row = prev_row + (row - prev_row) * step // steps
-                                    if 0 <= interp_col < self.width and 0 <= interp_row < self.height:
-                                        river_hexes.add((interp_col, interp_row))
-
-                        prev_col, prev_row = col, row
+    def _trace_lines_to_grid(self, geometries) -> np.ndarray:
+        """
+        Get the hexes crossed by (Multi)LineString geometries.
 
-        print(f"  Found {len(river_hexes)} river hexes")
+        Uses GDAL's rasterizer (every pixel a line touches) when rasterio is
+        available, otherwise _sample_lines_to_grid.
 
-        # Connect nearby river segments (fill gaps up to 2 hexes)
-        river_hexes = self._connect_nearby_river_hexes(river_hexes)
+        Args:
+            geometries: Array of shapely geometries; other types are ignored
 
-        return river_hexes
+        Returns:
+            (height, width) bool grid of crossed hexes
+        """
+        geoms = np.asarray(geometries, dtype=object)
+        type_ids = shapely.get_type_id(geoms)
+        geoms = geoms[((type_ids == shapely.GeometryType.LINESTRING) |
+                       (type_ids == shapely.GeometryType.MULTILINESTRING)) & ~shapely.is_empty(geoms)]
+        if len(geoms) == 0:
+            return np.zeros((self.height, self.width), dtype=bool)
+        if not RASTERIO_AVAILABLE:
+            return self._sample_lines_to_grid(geoms)
+
+        transform = from_bounds(self.min_lon, self.min_lat, self.max_lon, self.max_lat,
+                                self.width, self.height)
+        raster = rasterize(((geom, 1) for geom in geoms), out_shape=(self.height, self.width),
+                           transform=transform, all_touched=True, dtype='uint8')
+        return raster.astype(bool)
+
+    def _sample_lines_to_grid(self, geoms: np.ndarray) -> np.ndarray:
+        """
+        Fallback for _trace_lines_to_grid without rasterio.
+
+        Every line is sampled twice per hex width (all lines in one
+        vectorized shapely call), and jumps of more than one hex between
+        consecutive in-bounds samples of a line are filled by linear
+        interpolation.
+        """
+        lines = shapely.get_parts(geoms)
+        lengths = shapely.length(lines)
+        lines, lengths = lines[lengths > 0], lengths[lengths > 0]
+        grid = np.zeros((self.height, self.width), dtype=bool)
+        if len(lines) == 0:
+            return grid
+
+        # Sample at hex resolution to ensure no gaps (twice per hex)
+        hex_width_deg = (self.max_lon - self.min_lon) / self.width
+        hex_height_deg = (self.max_lat - self.min_lat) / self.height
+        sample_interval = min(hex_width_deg, hex_height_deg) * 0.5
+        num_samples = np.maximum(2, (lengths / sample_interval).astype(np.int64) + 1)
+
+        # Fractions 0, 1/n, ..., 1 for every line, flattened
+        counts = num_samples + 1
+        line_idx = np.repeat(np.arange(len(lines)), counts)
+        starts = np.cumsum(counts) - counts
+        fracs = (np.arange(counts.sum()) - np.repeat(starts, counts)) / np.repeat(num_samples, counts)
+
+        points = shapely.line_interpolate_point(lines[line_idx], fracs, normalized=True)
+        xy = shapely.get_coordinates(points)
+        cols, rows = self._geo_to_pixel_vec(xy[:, 0], xy[:, 1])
+
+        in_bounds = (cols >= 0) & (cols < self.width) & (rows >= 0) & (rows < self.height)
+        cols, rows, line_idx = cols[in_bounds], rows[in_bounds], line_idx[in_bounds]
+
+        # Fill gaps between consecutive samples of the same line
+        dc, dr = np.diff(cols), np.diff(rows)
+        steps = np.maximum(np.abs(dc), np.abs(dr))
+        gap = (line_idx[1:] == line_idx[:-1]) & (steps > 1)
+        gap_steps = steps[gap]
+        if len(gap_steps):
+            rep = gap_steps - 1
+            step = np.arange(rep.sum()) - np.repeat(np.cumsum(rep) - rep, rep) + 1
+            n = np.repeat(gap_steps, rep)
+            fill_cols = np.repeat(cols[:-1][gap], rep) + np.repeat(dc[gap], rep) * step // n
+            fill_rows = np.repeat(rows[:-1][gap], rep) + np.repeat(dr[gap], rep) * step // n
+            cols = np.concatenate([cols, fill_cols])
+            rows = np.concatenate([rows, fill_rows])
+
+        grid[rows, cols] = True
+        return grid
 
     def _connect_nearby_river_hexes(
         self,
         river_hexes: Set[Tuple[int, int]],
         max_gap: int = 3
     ) -> Set[Tuple[int, int]]:
+        """Set-based wrapper around _connect_river_grid."""
+        if len(river_hexes) < 2:
+            return river_hexes
+        grid = _hexes_to_grid(river_hexes, self.height, self.width)
+        return _grid_to_hexes(self._connect_river_grid(grid, max_gap))
+
+    def _connect_river_grid(self, grid: np.ndarray, max_gap: int = 3) -> np.ndarray:
         """
         Connect nearby river hexes by filling small gaps and removing tiny isolated components.
 
@@ -326,35 +701,41 @@ class RiverMapper:
         components (1-2 hexes) that look like noise.
 
         Args:
-            river_hexes: Set of river hex coordinates
+            grid: (height, width) bool grid of river hexes
             max_gap: Maximum gap distance to fill (in hexes)
 
         Returns:
-            Set of river hexes with gaps filled and noise removed
+            New bool grid with gaps filled and noise removed
         """
-        if len(river_hexes) < 2:
-            return river_hexes
-
-        result = set(river_hexes)
+        count = np.count_nonzero(grid)
+        if count < 2:
+            return grid
 
         # First: remove tiny isolated components (1-2 hexes)
-        result = self._remove_tiny_components(result, min_size=3)
+        result = self._remove_tiny_components(grid, min_size=3)
 
         # Find endpoints (hexes with only 0-1 river neighbors)
-        endpoints = []
-        for col, row in result:
-            neighbors = self._get_hex_neighbors(col, row)
-            river_neighbors = sum(1 for nc, nr, _ in neighbors if (nc, nr) in result)
-            if river_neighbors <= 1:
-                endpoints.append((col, row))
+        endpoints = self._find_endpoints(result)
 
         # Try to connect nearby endpoints (multiple passes)
         for _ in range(3):  # Multiple passes to connect chains
             connected_pairs = set()
             added_this_pass = 0
 
+            # Bucket endpoints on a grid as wide as the connection range, so
+            # every candidate partner lies in the surrounding 3x3 buckets
+            bucket_size = max_gap * 2
+            buckets = defaultdict(list)
+            for i, (col, row) in enumerate(endpoints):
+                buckets[(col // bucket_size, row // bucket_size)].append(i)
+
             for i, ep1 in enumerate(endpoints):
-                for ep2 in endpoints[i+1:]:
+                bc, br = ep1[0] // bucket_size, ep1[1] // bucket_size
+                partners = sorted(
+                    j for dbc in (-1, 0, 1) for dbr in (-1, 0, 1)
+                    for j in buckets.get((bc + dbc, br + dbr), ()) if j > i
+                )
+                for ep2 in (endpoints[j] for j in partners):
                     # Skip if already connected
                     if (ep1, ep2) in connected_pairs or (ep2, ep1) in connected_pairs:
                         continue
@@ -362,11 +743,13 @@ class RiverMapper:
                     # Calculate Manhattan-like distance
                     dist = abs(ep1[0] - ep2[0]) + abs(ep1[1] - ep2[1])
                     if 2 <= dist <= max_gap * 2:  # Within connection range
-                        # Find path between them
-                        path = self._find_short_path(ep1, ep2, max_gap + 1)
+                        # Find path between them, always searching from the
+                        # smaller (col, row) so the filled hexes do not depend
+                        # on endpoint order
+                        path = self._find_short_path(min(ep1, ep2), max(ep1, ep2), max_gap + 1)
                         if path:
-                            for h in path:
-                                result.add(h)
+                            for col, row in path:
+                                result[row, col] = True
                                 added_this_pass += 1
                             connected_pairs.add((ep1, ep2))
 
@@ -374,15 +757,10 @@ class RiverMapper:
                 break
 
             # Recalculate endpoints for next pass
-            endpoints = []
-            for col, row in result:
-                neighbors = self._get_hex_neighbors(col, row)
-                river_neighbors = sum(1 for nc, nr, _ in neighbors if (nc, nr) in result)
-                if river_neighbors <= 1:
-                    endpoints.append((col, row))
-
-        if len(result) != len(river_hexes):
-            diff = len(result) - len(river_hexes)
+            endpoints = self._find_endpoints(result)
+
+        diff = np.count_nonzero(result) - count
+        if diff:
             if diff > 0:
                 print(f"  Connected river gaps: added {diff} hexes")
             else:
@@ -392,33 +770,28 @@ class RiverMapper:
 
     def _remove_tiny_components(
         self,
-        hexes: Set[Tuple[int, int]],
+        grid: np.ndarray,
         min_size: int = 3
-    ) -> Set[Tuple[int, int]]:
-        """Remove connected components smaller than min_size."""
-        from collections import deque
-
-        remaining = set(hexes)
-        valid_hexes = set()
-
-        while remaining:
-            start = remaining.pop()
-            component = {start}
-            queue = deque([start])
-
-            while queue:
-                curr = queue.popleft()
-                for nc, nr, _ in self._get_hex_neighbors(curr[0], curr[1]):
-                    if (nc, nr) in remaining:
-                        remaining.remove((nc, nr))
-                        component.add((nc, nr))
-                        queue.append((nc, nr))
+    ) -> np.ndarray:
+        """Remove connected components smaller than min_size from an (H, W) bool grid."""
+        return _remove_small_components_kernel(grid, min_size)
 
-            # Keep only large enough components
-            if len(component) >= min_size:
-                valid_hexes.update(component)
+    def _find_endpoints(self, grid: np.ndarray) -> List[Tuple[int, int]]:
+        """Get (col, row) of river hexes with at most one river neighbor, row-major.
 
-        return valid_hexes
+        _connect_river_grid canonicalizes each pair before searching, so this
+        order only affects which pair is tried first, not the filled hexes.
+        """
+        # Sum the six shifted neighbor planes; offsets depend on row parity,
+        # so even and odd rows are summed separately. Off-grid counts as empty.
+        height, width = grid.shape
+        padded = np.pad(grid, 1).astype(np.uint8)
+        counts = np.zeros((height, width), dtype=np.uint8)
+        for parity in (0, 1):
+            for dc, dr in _EDGE_OFFSETS[parity].tolist():
+                counts[parity::2] += padded[1 + dr + parity:1 + dr + height:2, 1 + dc:1 + dc + width]
+        rows, cols = np.nonzero(grid & (counts <= 1))
+        return list(zip(cols.tolist(), rows.tolist()))
 
     def _find_short_path(
         self,
@@ -427,29 +800,13 @@ class RiverMapper:
         max_length: int
     ) -> List[Tuple[int, int]]:
         """Find short path between two hexes using BFS, limited by max_length."""
-        from collections import deque
-
         if start == end:
             return []
 
-        queue = deque([(start, [start])])
-        visited = {start}
-
-        while queue:
-            current, path = queue.popleft()
-
-            if len(path) > max_length:
-                continue
-
-            for nc, nr, _ in self._get_hex_neighbors(current[0], current[1]):
-                if (nc, nr) == end:
-                    return path + [end]
-
-                if (nc, nr) not in visited and 0 <= nc < self.width and 0 <= nr < self.height:
-                    visited.add((nc, nr))
-                    queue.append(((nc, nr), path + [(nc, nr)]))
-
-        return []  # No short path found
+        # Paths through hexes at depth max_length would be too long
+        passable = np.ones((self.height, self.width), dtype=bool)
+        path = self._bfs(passable, self._point_grid(end), start, max_length)
+        return path + [end] if path else []  # Empty if no short path found
 
     def _is_in_reservoir(self, lon: float, lat: float) -> bool:
         """Check if a coordinate is within a known reservoir."""
@@ -475,14 +832,17 @@ class RiverMapper:
         Returns:
             Set of (col, row) tuples for reservoir hexes
         """
-        reservoir_hexes = set()
-
-        for col, row in river_hexes:
-            lon, lat = self._pixel_to_geo(col, row)
-            if self._is_in_reservoir(lon, lat):
-                reservoir_hexes.add((col, row))
-
-        return reservoir_hexes
+        return _filter_hexes(river_hexes, self._reservoir_area_grid())
+
+    def _reservoir_area_grid(self) -> np.ndarray:
+        """(H, W) bool grid of hexes whose center lies in a reservoir bbox."""
+        lon, lat = self._hex_lonlat_grid()
+        # (H, W, R) bbox test against all reservoirs at once
+        bbox = _RESERVOIR_BBOXES
+        return (
+            (lon[..., None] >= bbox[:, 0]) & (lon[..., None] <= bbox[:, 2]) &
+            (lat[..., None] >= bbox[:, 1]) & (lat[..., None] <= bbox[:, 3])
+        ).any(axis=-1)
 
     def _get_dnipro_hexes(self) -> Set[Tuple[int, int]]:
         """
@@ -493,75 +853,27 @@ class RiverMapper:
         Returns:
             Set of (col, row) tuples for Dnipro hexes
         """
-        if self.rivers_gdf.empty or 'name' not in self.rivers_gdf.columns:
-            return set()
-
-        dnipro_hexes = set()
-
-        # Filter to Dnipro river segments
-        dnipro_rivers = self.rivers_gdf[
-            self.rivers_gdf['name'].isin(DNIPRO_NAMES)
-        ]
+        return _grid_to_hexes(self._dnipro_hex_grid())
 
-        if dnipro_rivers.empty:
+    def _dnipro_hex_grid(self) -> np.ndarray:
+        """(H, W) bool grid of Dnipro hexes (see _get_dnipro_hexes), built once."""
+        if len(self._dnipro_geoms) == 0:
             print("  Warning: No Dnipro river segments found in data")
-            return set()
+            return np.zeros((self.height, self.width), dtype=bool)
 
-        print(f"  Found {len(dnipro_rivers)} Dnipro river segments")
+        if self._dnipro_grid is None:
+            print(f"  Found {len(self._dnipro_geoms)} Dnipro river segments")
 
-        # Calculate hex size in degrees for proper sampling
-        hex_width_deg = (self.max_lon - self.min_lon) / self.width
-        hex_height_deg = (self.max_lat - self.min_lat) / self.height
-        sample_interval = min(hex_width_deg, hex_height_deg) * 0.5
+            # Trace all Dnipro segments
+            self._dnipro_grid = self._trace_lines_to_grid(self._dnipro_geoms)
 
-        # Trace each Dnipro segment
-        for idx, river in dnipro_rivers.iterrows():
-            geom = river.geometry
-            if geom is None or geom.is_empty:
-                continue
-
-            if geom.geom_type == 'LineString':
-                lines = [geom]
-            elif geom.geom_type == 'MultiLineString':
-                lines = list(geom.geoms)
-            else:
-                continue
-
-            for line in lines:
-                length = line.length
-                if length == 0:
-                    continue
-
-                num_samples = max(2, int(length / sample_interval) + 1)
-                prev_col, prev_row = None, None
-
-                for i in range(num_samples + 1):
-                    fraction = i / num_samples
-                    point = line.interpolate(fraction, normalized=True)
-                    col, row = self._geo_to_pixel(point.x, point.y)
-
-                    if 0 <= col < self.width and 0 <= row < self.height:
-                        dnipro_hexes.add((col, row))
-
-                        # Fill gaps
-                        if prev_col is not None and prev_row is not None:
-                            if abs(col - prev_col) > 1 or abs(row - prev_row) > 1:
-                                steps = max(abs(col - prev_col), abs(row - prev_row))
-                                for step in range(1, steps):
-                                    interp_col = prev_col + (col - prev_col) * step // steps
-                                    interp_row = prev_row + (row - prev_row) * step // steps
-                                    if 0 <= interp_col < self.width and 0 <= interp_row < self.height:
-                                        dnipro_hexes.add((interp_col, interp_row))
-
-                        prev_col, prev_row = col, row
-
-        print(f"  Total Dnipro hexes: {len(dnipro_hexes)}")
-        return dnipro_hexes
+            print(f"  Total Dnipro hexes: {np.count_nonzero(self._dnipro_grid)}")
+        return self._dnipro_grid
 
     def get_dnipro_chain(
         self,
         dnipro_hexes: Set[Tuple[int, int]],
-        land_mask: Optional[Dict[Tuple[int, int], bool]] = None
+        land_mask: Optional[LandMask] = None
     ) -> List[Tuple[int, int]]:
         """
         Order Dnipro hexes as a FULLY CONTIGUOUS chain from north to south.
@@ -571,7 +883,8 @@ class RiverMapper:
 
         Args:
             dnipro_hexes: Set of Dnipro hex coordinates
-            land_mask: Optional dict marking which hexes are land
+            land_mask: Optional (height, width) bool array (or legacy dict)
+                       marking which hexes are land
 
         Returns:
             List of (col, row) tuples ordered from north to south, fully contiguous
@@ -580,8 +893,9 @@ class RiverMapper:
             return []
 
         # Filter to land hexes
-        if land_mask:
-            hexes = {h for h in dnipro_hexes if land_mask.get(h, False)}
+        land = self._normalize_land_mask(land_mask)
+        if land is not None:
+            hexes = _filter_hexes(dnipro_hexes, land)
         else:
             hexes = set(dnipro_hexes)
 
@@ -589,46 +903,58 @@ class RiverMapper:
             return []
 
         # Sort by row (north to south) then by column
-        sorted_hexes = sorted(hexes, key=lambda h: (h[1], h[0]))
+        arr = _hexes_to_array(hexes)
+        arr = arr[np.lexsort((arr[:, 0], arr[:, 1]))]
+        sorted_hexes = list(map(tuple, arr.tolist()))
 
         # Build the chain by always moving to the nearest southward hex
+        points = arr.astype(np.float64)
+        tree = cKDTree(points)
+        used = np.zeros(len(points), dtype=bool)
         chain = []
-        remaining = set(hexes)
         current = sorted_hexes[0]  # Start from northernmost
         chain.append(current)
-        remaining.discard(current)
-
-        while remaining:
-            # Find the nearest remaining hex (prefer southward)
-            best_next = None
-            best_distance = float('inf')
-
-            for candidate in remaining:
-                # Calculate distance with preference for southward movement
-                dx = abs(candidate[0] - current[0])
-                dy = candidate[1] - current[1]  # Positive = southward
-                # Penalize northward movement, reward southward
-                distance = dx + abs(dy) - (dy * 0.1 if dy > 0 else 0)
-                if distance < best_distance:
-                    best_distance = distance
-                    best_next = candidate
-
-            if best_next is None:
-                break
+        chain_set = {current}
+        used[0] = True
+
+        for _ in range(len(points) - 1):
+            # Find the nearest remaining hex (prefer southward). The biased
+            # distance dx + |dy| - 0.1 * max(dy, 0) lies between 0.9x and 1x
+            # the Manhattan distance, so the best candidate is within d / 0.9
+            # of current, d being the Manhattan distance to the nearest unused hex.
+            k = 8
+            while True:
+                dists, idx = tree.query(current, k=min(k, len(points)), p=1)
+                free = ~used[idx]
+                if free.any() or k >= len(points):
+                    break
+                k *= 4
+            radius = dists[free][0] / 0.9
+            candidates = np.sort(tree.query_ball_point(current, radius + 1e-9, p=1))
+            candidates = candidates[~used[candidates]]
+
+            dx = np.abs(points[candidates, 0] - current[0])
+            dy = points[candidates, 1] - current[1]  # Positive = southward
+            # Penalize northward movement, reward southward
+            distance = dx + np.abs(dy) - 0.1 * np.maximum(dy, 0)
+            best = candidates[np.argmin(distance)]
+            used[best] = True
+            best_next = sorted_hexes[best]
 
             # Fill gap between current and best_next if not adjacent
-            gap_hexes = self._fill_contiguous_gap(current, best_next, land_mask, set(chain))
+            gap_hexes = self._fill_contiguous_gap(current, best_next, land, chain_set)
             chain.extend(gap_hexes)
             chain.append(best_next)
-            remaining.discard(best_next)
+            chain_set.update(gap_hexes)
+            chain_set.add(best_next)
             current = best_next
 
         # Extend to sea: find path from southernmost hex to nearest ocean
-        if chain and land_mask:
-            chain = self._extend_to_sea(chain, land_mask)
+        if chain and land is not None:
+            chain = self._extend_to_sea(chain, land)
 
         # Final pass: ensure chain is fully contiguous
-        chain = self._ensure_contiguous(chain, land_mask)
+        chain = self._ensure_contiguous(chain, land)
 
         print(f"  Dnipro chain: {len(chain)} hexes (from row {chain[0][1]} to row {chain[-1][1]})")
         return chain
@@ -637,50 +963,26 @@ class RiverMapper:
         self,
         start: Tuple[int, int],
         end: Tuple[int, int],
-        land_mask: Optional[Dict[Tuple[int, int], bool]],
+        land_mask: Optional[LandMask],
         existing: Set[Tuple[int, int]]
     ) -> List[Tuple[int, int]]:
         """Fill gap between two hexes with a contiguous path using BFS."""
         # Check if already adjacent
-        neighbors = self._get_hex_neighbors(start[0], start[1])
-        if any((nc, nr) == end for nc, nr, _ in neighbors):
+        if _axial_distance(start, end) == 1:
             return []  # Already adjacent
 
         # BFS to find shortest path - consider ALL land hexes
-        from collections import deque
-        queue = deque([(start, [start])])
-        visited = {start}
-
-        while queue:
-            current, path = queue.popleft()
-
-            for nc, nr, _ in self._get_hex_neighbors(current[0], current[1]):
-                if (nc, nr) == end:
-                    # Found path - return intermediate hexes (exclude start and end)
-                    return path[1:]
-
-                if (nc, nr) not in visited and 0 <= nc < self.width and 0 <= nr < self.height:
-                    is_land = land_mask is None or land_mask.get((nc, nr), False)
-                    if is_land:  # Allow any land hex, even if in existing
-                        visited.add((nc, nr))
-                        queue.append(((nc, nr), path + [(nc, nr)]))
+        land = self._land_grid(land_mask)
+        target = self._point_grid(end)
+        path = self._bfs(land, target, start)
+        if path:
+            # Found path - return intermediate hexes (exclude start and end)
+            return path[1:]
 
         # Second pass: allow existing chain hexes as path (for connecting components)
-        queue = deque([(start, [start])])
-        visited = {start}
-
-        while queue:
-            current, path = queue.popleft()
-
-            for nc, nr, _ in self._get_hex_neighbors(current[0], current[1]):
-                if (nc, nr) == end:
-                    return path[1:]
-
-                if (nc, nr) not in visited and 0 <= nc < self.width and 0 <= nr < self.height:
-                    is_land = land_mask is None or land_mask.get((nc, nr), False)
-                    if is_land or (nc, nr) in existing:
-                        visited.add((nc, nr))
-                        queue.append(((nc, nr), path + [(nc, nr)]))
+        path = self._bfs(land | _hexes_to_grid(existing, self.height, self.width), target, start)
+        if path:
+            return path[1:]
 
         # Fallback: direct interpolation
         return self._interpolate_gap(start, end, land_mask)
@@ -688,12 +990,13 @@ class RiverMapper:
     def _extend_to_sea(
         self,
         chain: List[Tuple[int, int]],
-        land_mask: Dict[Tuple[int, int], bool]
+        land_mask: LandMask
     ) -> List[Tuple[int, int]]:
         """Extend chain southward until it reaches ocean."""
         if not chain:
             return chain
 
+        land = self._land_grid(land_mask)
         current = chain[-1]
         extended = list(chain)
         extended_set = set(extended)
@@ -707,8 +1010,7 @@ class RiverMapper:
 
             for nc, nr, _ in neighbors:
                 if 0 <= nc < self.width and 0 <= nr < self.height:
-                    is_land = land_mask.get((nc, nr), False)
-                    if not is_land:
+                    if not land[nr, nc]:
                         ocean_neighbor = (nc, nr)
                     elif (nc, nr) not in extended_set:
                         # Score: prefer south (higher row), slight preference for center
@@ -729,10 +1031,10 @@ class RiverMapper:
                 current = best_next
             else:
                 # Try BFS to find path to any coastal hex
-                coastal_hex = self._find_nearest_coastal_hex(current, land_mask, extended_set)
+                coastal_hex = self._find_nearest_coastal_hex(current, land, extended_set)
                 if coastal_hex:
                     # Find path to coastal hex
-                    path = self._bfs_path(current, coastal_hex, land_mask)
+                    path = self._bfs_path(current, coastal_hex, land)
                     if path:
                         for h in path[1:]:  # Skip current
                             if h not in extended_set:
@@ -749,63 +1051,113 @@ class RiverMapper:
     def _find_nearest_coastal_hex(
         self,
         start: Tuple[int, int],
-        land_mask: Dict[Tuple[int, int], bool],
+        land_mask: LandMask,
         exclude: Set[Tuple[int, int]]
     ) -> Optional[Tuple[int, int]]:
         """Find nearest land hex that is adjacent to ocean."""
-        from collections import deque
-        queue = deque([start])
-        visited = {start}
-
-        while queue:
-            current = queue.popleft()
-            col, row = current
-
-            # Check if this hex is coastal (land adjacent to ocean)
-            if land_mask.get(current, False):
-                for nc, nr, _ in self._get_hex_neighbors(col, row):
-                    if 0 <= nc < self.width and 0 <= nr < self.height:
-                        if not land_mask.get((nc, nr), False):
-                            return current  # Found coastal hex
-
-            # Explore neighbors
-            for nc, nr, _ in self._get_hex_neighbors(col, row):
-                if (nc, nr) not in visited and 0 <= nc < self.width and 0 <= nr < self.height:
-                    if land_mask.get((nc, nr), False):
-                        visited.add((nc, nr))
-                        queue.append((nc, nr))
-
-        return None
+        land = self._land_grid(land_mask)
+
+        # Coastal = land with an on-grid ocean neighbor
+        ncols, nrows = self._neighbors[..., 0], self._neighbors[..., 1]
+        ocean_neighbor = (ncols >= 0) & ~land[nrows, ncols]
+        coastal = land & ocean_neighbor.any(axis=-1)
+
+        if coastal[start[1], start[0]]:
+            return start
+
+        # Coastal hexes are land, so the first one discovered is the nearest
+        last_col, last_row, _ = _bfs_kernel(land, coastal, self._neighbors,
+                                            start[0], start[1], self.width * self.height)
+        if last_col < 0:
+            return None
+        for nc, nr, _ in self._get_hex_neighbors(last_col, last_row):
+            if coastal[nr, nc]:
+                return (nc, nr)
 
     def _bfs_path(
         self,
         start: Tuple[int, int],
         end: Tuple[int, int],
-        land_mask: Dict[Tuple[int, int], bool]
+        land_mask: LandMask
     ) -> List[Tuple[int, int]]:
         """Find shortest path between two hexes on land."""
-        from collections import deque
-        queue = deque([(start, [start])])
-        visited = {start}
+        if start == end:
+            return [start]
+        land = self._land_grid(land_mask)
+        if not land[end[1], end[0]]:
+            return []
+
+        path = self._bfs(land, self._point_grid(end), start)
+        return path + [end] if path else []
+
+    def _hex_lonlat_grid(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(H, W) arrays of every hex's lon and lat (see _pixel_to_geo), built once."""
+        if self._lonlat_grid is None:
+            cols, rows = np.meshgrid(np.arange(self.width), np.arange(self.height))
+            self._lonlat_grid = self._pixel_to_geo_vec(cols, rows)
+        return self._lonlat_grid
+
+    def _bfs(
+        self,
+        passable: np.ndarray,
+        target: np.ndarray,
+        start: Tuple[int, int],
+        max_depth: Optional[int] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Shortest path from start through passable hexes to a target (see _bfs_kernel).
 
-        while queue:
-            current, path = queue.popleft()
+        Returns:
+            Hexes start..last, last being adjacent to the reached target
+            (which is not included); empty if no target is reachable
+        """
+        if max_depth is None:
+            max_depth = self.width * self.height
+        last_col, last_row, parents = _bfs_kernel(passable, target, self._neighbors,
+                                                  start[0], start[1], max_depth)
+        if last_col < 0:
+            return []
+        return _path_from_parent_grid(parents, last_col, last_row)
 
-            if current == end:
-                return path
+    def _point_grid(self, hex_pos: Tuple[int, int]) -> np.ndarray:
+        """(H, W) bool grid with only hex_pos set."""
+        grid = np.zeros((self.height, self.width), dtype=bool)
+        grid[hex_pos[1], hex_pos[0]] = True
+        return grid
 
-            for nc, nr, _ in self._get_hex_neighbors(current[0], current[1]):
-                if (nc, nr) not in visited and 0 <= nc < self.width and 0 <= nr < self.height:
-                    if land_mask.get((nc, nr), False):
-                        visited.add((nc, nr))
-                        queue.append(((nc, nr), path + [(nc, nr)]))
+    def _normalize_land_mask(self, land_mask: Optional[LandMask]) -> Optional[np.ndarray]:
+        """
+        (H, W) bool grid of a land mask, or None if there is no mask.
 
-        return []
+        Arrays are used as-is; legacy {(col, row): is_land} dicts are
+        converted once (cached by identity). An empty dict counts as no mask.
+        """
+        if land_mask is None:
+            return None
+        if isinstance(land_mask, np.ndarray):
+            return land_mask.astype(bool, copy=False)
+        if hasattr(land_mask, 'arr'):
+            # Array-backed view (e.g. the builder's _MaskView)
+            return np.asarray(land_mask.arr, dtype=bool)
+        if not land_mask:
+            return None
+        if land_mask is not self._land_grid_src:
+            self._land_grid_src = land_mask
+            self._land_grid_cache = _hexes_to_grid(
+                [h for h, is_land in land_mask.items() if is_land], self.height, self.width)
+        return self._land_grid_cache
+
+    def _land_grid(self, land_mask: Optional[LandMask]) -> np.ndarray:
+        """(H, W) bool grid of a land mask (see _normalize_land_mask); all land if None."""
+        land = self._normalize_land_mask(land_mask)
+        if land is None:
+            return np.ones((self.height, self.width), dtype=bool)
+        return land
 
     def _ensure_contiguous(
         self,
         chain: List[Tuple[int, int]],
-        land_mask: Optional[Dict[Tuple[int, int], bool]]
+        land_mask: Optional[LandMask]
     ) -> List[Tuple[int, int]]:
         """Ensure every hex in chain is adjacent to the next."""
         if len(chain) <= 1:
@@ -819,8 +1171,7 @@ class RiverMapper:
             curr = chain[i]
 
             # Check if adjacent
-            neighbors = self._get_hex_neighbors(prev[0], prev[1])
-            if any((nc, nr) == curr for nc, nr, _ in neighbors):
+            if _axial_distance(prev, curr) == 1:
                 result.append(curr)
             else:
                 # Need to fill gap
@@ -834,31 +1185,32 @@ class RiverMapper:
         self,
         start: Tuple[int, int],
         end: Tuple[int, int],
-        land_mask: Optional[Dict[Tuple[int, int], bool]] = None
+        land_mask: Optional[LandMask] = None
     ) -> List[Tuple[int, int]]:
         """Interpolate hexes between two points to fill gaps."""
-        gap_hexes = []
         sc, sr = start
         ec, er = end
 
         # Bresenham-like interpolation
         steps = max(abs(ec - sc), abs(er - sr))
         if steps <= 1:
-            return gap_hexes
+            return []
 
-        for step in range(1, steps):
-            col = sc + (ec - sc) * step // steps
-            row = sr + (er - sr) * step // steps
-            if land_mask is None or land_mask.get((col, row), False):
-                gap_hexes.append((col, row))
+        step = np.arange(1, steps)
+        cols = sc + (ec - sc) * step // steps
+        rows = sr + (er - sr) * step // steps
+        land = self._normalize_land_mask(land_mask)
+        if land is not None:
+            on_land = land[rows, cols]
+            cols, rows = cols[on_land], rows[on_land]
 
-        return gap_hexes
+        return list(zip(cols.tolist(), rows.tolist()))
 
     def get_dnipro_bank_elevations(
         self,
         dnipro_hexes: Set[Tuple[int, int]],
-        hex_elevations: Dict[Tuple[int, int], int],
-        land_mask: Optional[Dict[Tuple[int, int], bool]] = None
+        hex_elevations: Union[Dict[Tuple[int, int], int], np.ndarray],
+        land_mask: Optional[LandMask] = None
     ) -> Dict[Tuple[int, int], int]:
         """
         Calculate the target elevation for each Dnipro hex.
@@ -868,45 +1220,47 @@ class RiverMapper:
 
         Args:
             dnipro_hexes: Set of Dnipro hex coordinates
-            hex_elevations: Dict mapping (col, row) -> elevation level (game units -3 to 12)
-            land_mask: Optional dict marking which hexes are land
+            hex_elevations: (height, width) array or dict mapping (col, row) ->
+                            elevation level (game units -3 to 12)
+            land_mask: Optional (height, width) bool array (or legacy dict)
+                       marking which hexes are land
 
         Returns:
             Dict mapping (col, row) -> target elevation level
         """
-        dnipro_elevations = {}
-
-        for col, row in dnipro_hexes:
-            # Get neighbors on each bank
-            eastern, western = self._get_hex_neighbors_by_side(col, row)
-
-            # Collect bank elevations (non-river land neighbors)
-            bank_levels = []
-
-            for neighbors in [eastern, western]:
-                for nc, nr in neighbors:
-                    if (nc, nr) not in dnipro_hexes:  # Not part of Dnipro
-                        if land_mask is None or land_mask.get((nc, nr), False):
-                            level = hex_elevations.get((nc, nr), -3)
-                            if level >= 0:  # Valid land elevation
-                                bank_levels.append(level)
-
-            if bank_levels:
-                # Find minimum bank elevation level
-                min_bank_level = min(bank_levels)
-
-                # Dnipro is one level lower than the bank
-                dnipro_level = max(-1, min_bank_level - 1)
-                dnipro_elevations[(col, row)] = dnipro_level
-            else:
-                # Default to shallow water level if no banks found
-                dnipro_elevations[(col, row)] = -1
+        if not dnipro_hexes:
+            return {}
 
-        return dnipro_elevations
+        if isinstance(hex_elevations, np.ndarray):
+            levels = hex_elevations
+        else:
+            levels = np.full((self.height, self.width), -3, dtype=np.int32)
+            if hex_elevations:
+                cols, rows = _hexes_to_array(hex_elevations.keys()).T
+                levels[rows, cols] = np.fromiter(hex_elevations.values(), dtype=np.int32,
+                                                 count=len(hex_elevations))
+
+        hexes = _hexes_to_array(dnipro_hexes)
+        dnipro = _hexes_to_grid(hexes, self.height, self.width)
+        land = self._land_grid(land_mask)
+
+        # Bank elevations: non-Dnipro land neighbors on either side
+        # (all six edges) with a valid land elevation
+        ncols, nrows = self._neighbors[..., 0], self._neighbors[..., 1]
+        bank = levels[nrows, ncols].astype(np.int32)
+        valid = (ncols >= 0) & ~dnipro[nrows, ncols] & land[nrows, ncols] & (bank >= 0)
+        min_bank_level = np.where(valid, bank, np.iinfo(np.int32).max).min(axis=-1)
+
+        # Dnipro is one level lower than the minimum bank; default to
+        # shallow water level if no banks found
+        dnipro_level = np.where(valid.any(axis=-1), np.maximum(-1, min_bank_level - 1), -1)
+
+        cols, rows = hexes.T
+        return dict(zip(map(tuple, hexes.tolist()), dnipro_level[rows, cols].tolist()))
 
     def _get_lake_hexes(
         self,
-        land_mask: Optional[Dict[Tuple[int, int], bool]] = None
+        land_mask: Optional[LandMask] = None
     ) -> Set[Tuple[int, int]]:
         """
         Get all hexes that fall within major lake bounds.
@@ -915,34 +1269,46 @@ class RiverMapper:
         detected by scanning all hexes within their bounding boxes.
 
         Args:
-            land_mask: Optional dict marking which hexes are land
+            land_mask: Optional (height, width) bool array (or legacy dict)
+                       marking which hexes are land
 
         Returns:
             Set of (col, row) tuples for lake hexes
         """
-        lake_hexes = set()
+        return _grid_to_hexes(self._lake_grid(land_mask))
+
+    def _lake_grid(self, land_mask: Optional[LandMask] = None) -> np.ndarray:
+        """(H, W) bool grid of lake hexes (see _get_lake_hexes)."""
+        lakes = np.zeros((self.height, self.width), dtype=bool)
+        lon, lat = self._hex_lonlat_grid()
+        # Only consider land hexes if mask provided
+        land = self._land_grid(land_mask)
 
         for name, (min_lon, min_lat, max_lon, max_lat) in MAJOR_LAKES.items():
-            lake_count = 0
-            for row in range(self.height):
-                for col in range(self.width):
-                    # Only consider land hexes if mask provided
-                    if land_mask and not land_mask.get((col, row), False):
-                        continue
+            # Only scan the pixel window around the lake bbox (one hex of
+            # slack for truncation; the exact test runs inside it)
+            c0, r0 = self._geo_to_pixel(min_lon, max_lat)
+            c1, r1 = self._geo_to_pixel(max_lon, min_lat)
+            c0, r0 = max(c0, 0), max(r0, 0)
+            c1, r1 = min(c1 + 1, self.width - 1), min(r1 + 1, self.height - 1)
+            if c0 > c1 or r0 > r1:
+                continue
+            window = np.s_[r0:r1 + 1, c0:c1 + 1]
 
-                    lon, lat = self._pixel_to_geo(col, row)
-                    if min_lon <= lon <= max_lon and min_lat <= lat <= max_lat:
-                        lake_hexes.add((col, row))
-                        lake_count += 1
+            wlon, wlat = lon[window], lat[window]
+            inside = ((wlon >= min_lon) & (wlon <= max_lon) &
+                      (wlat >= min_lat) & (wlat <= max_lat) & land[window])
+            lakes[window] |= inside
+            lake_count = np.count_nonzero(inside)
 
             if lake_count > 0:
                 print(f"    Lake {name}: {lake_count} hexes")
 
-        return lake_hexes
+        return lakes
 
     def _get_hex_neighbors_by_side(
         self, col: int, row: int
-    ) -> Tuple[list, list]:
+    ) -> Tuple[tuple, tuple]:
         """
         Get eastern (left bank) and western (right bank) neighbors of a hex.
 
@@ -953,39 +1319,15 @@ class RiverMapper:
             col, row: Hex coordinates
 
         Returns:
-            Tuple of (eastern_neighbors, western_neighbors) - each is list of (col, row)
+            Tuple of (eastern_neighbors, western_neighbors) - each is a tuple of (col, row)
         """
-        eastern = []
-        western = []
-
-        if row % 2 == 0:  # Even row
-            # Eastern neighbors: NE, E, SE
-            eastern_offsets = [(0, -1), (1, 0), (0, 1)]
-            # Western neighbors: NW, W, SW
-            western_offsets = [(-1, -1), (-1, 0), (-1, 1)]
-        else:  # Odd row
-            # Eastern neighbors: NE, E, SE
-            eastern_offsets = [(1, -1), (1, 0), (1, 1)]
-            # Western neighbors: NW, W, SW
-            western_offsets = [(0, -1), (-1, 0), (0, 1)]
-
-        for dc, dr in eastern_offsets:
-            nc, nr = col + dc, row + dr
-            if 0 <= nc < self.width and 0 <= nr < self.height:
-                eastern.append((nc, nr))
-
-        for dc, dr in western_offsets:
-            nc, nr = col + dc, row + dr
-            if 0 <= nc < self.width and 0 <= nr < self.height:
-                western.append((nc, nr))
-
-        return eastern, western
+        return self._side_table[row][col]
 
     def _detect_porohy(
         self,
         river_hexes: Set[Tuple[int, int]],
         elevation_grid: np.ndarray,
-        land_mask: Optional[Dict[Tuple[int, int], bool]] = None
+        land_mask: Optional[LandMask] = None
     ) -> Set[Tuple[int, int]]:
         """
         Detect porohy (rapids) where one bank is significantly steeper.
@@ -996,54 +1338,45 @@ class RiverMapper:
         Args:
             river_hexes: Set of river hex coordinates
             elevation_grid: 2D array of elevation in meters (height x width)
-            land_mask: Optional dict marking which hexes are land
+            land_mask: Optional (height, width) bool array (or legacy dict)
+                       marking which hexes are land
 
         Returns:
             Set of (col, row) tuples for porohy hexes
         """
-        porohy_hexes = set()
-
-        for col, row in river_hexes:
-            # Skip if not on land (we only care about rivers on land)
-            if land_mask and not land_mask.get((col, row), False):
-                continue
-
-            # Get neighboring land hexes on each side
-            eastern, western = self._get_hex_neighbors_by_side(col, row)
-
-            # Get elevations for land neighbors on each side
-            east_elevations = []
-            west_elevations = []
-
-            for nc, nr in eastern:
-                if (nc, nr) not in river_hexes:  # Only consider non-river hexes
-                    if land_mask is None or land_mask.get((nc, nr), False):
-                        elev = elevation_grid[nr, nc]
-                        if elev > -9000:  # Valid elevation
-                            east_elevations.append(elev)
-
-            for nc, nr in western:
-                if (nc, nr) not in river_hexes:
-                    if land_mask is None or land_mask.get((nc, nr), False):
-                        elev = elevation_grid[nr, nc]
-                        if elev > -9000:
-                            west_elevations.append(elev)
-
-            # Check for significant elevation difference
-            if east_elevations and west_elevations:
-                east_avg = sum(east_elevations) / len(east_elevations)
-                west_avg = sum(west_elevations) / len(west_elevations)
-                diff = abs(east_avg - west_avg)
-
-                if diff >= POROHY_ELEVATION_THRESHOLD:
-                    porohy_hexes.add((col, row))
+        if not river_hexes:
+            return set()
 
-        return porohy_hexes
+        river = _hexes_to_grid(river_hexes, self.height, self.width)
+        # Skip if not on land (we only care about rivers on land)
+        land = self._land_grid(land_mask)
+        center = river & land
+
+        # Gather all six neighbors per hex; edges 0-2 are the eastern bank
+        # (NE, E, SE), 3-5 the western bank (SW, W, NW). Off-grid (-1)
+        # indices wrap around and are masked out.
+        ncols, nrows = self._neighbors[..., 0], self._neighbors[..., 1]
+        elev = elevation_grid[nrows, ncols].astype(np.float64)
+        # Only consider non-river land hexes with a valid elevation
+        valid = (ncols >= 0) & ~river[nrows, ncols] & land[nrows, ncols] & (elev > -9000)
+        elev = np.where(valid, elev, 0.0)
+
+        east_n = valid[..., :3].sum(axis=-1)
+        west_n = valid[..., 3:].sum(axis=-1)
+        east_avg = np.divide(elev[..., :3].sum(axis=-1), east_n,
+                             out=np.zeros(east_n.shape), where=east_n > 0)
+        west_avg = np.divide(elev[..., 3:].sum(axis=-1), west_n,
+                             out=np.zeros(west_n.shape), where=west_n > 0)
+
+        # Check for significant elevation difference
+        porohy = (center & (east_n > 0) & (west_n > 0) &
+                  (np.abs(east_avg - west_avg) >= POROHY_ELEVATION_THRESHOLD))
+        return _grid_to_hexes(porohy)
 
     def classify_rivers(
         self,
         elevation_grid: Optional[np.ndarray] = None,
-        land_mask: Optional[Dict[Tuple[int, int], bool]] = None
+        land_mask: Optional[LandMask] = None
     ) -> RiverClassification:
         """
         Classify river hexes into categories: regular rivers, lakes, and Dnipro.
@@ -1054,59 +1387,56 @@ class RiverMapper:
 
         Args:
             elevation_grid: 2D array of elevation in meters (height x width).
-            land_mask: Optional dict marking which hexes are land
+            land_mask: Optional (height, width) bool array (or legacy dict)
+                       marking which hexes are land
 
         Returns:
             RiverClassification with categorized river/water hexes
         """
-        # Get all river hexes
-        all_river_hexes = self.get_river_hexes_fast()
+        # Convert once; every category below is an (H, W) bool grid, so
+        # filtering and combining are whole-array ops (no per-hex sets)
+        land = self._normalize_land_mask(land_mask)
+        on_land = self._land_grid(land)
 
-        # Filter to land only if mask provided
-        if land_mask:
-            all_river_hexes = {h for h in all_river_hexes if land_mask.get(h, False)}
+        # Get all river hexes, filtered to land
+        rivers = self._river_hex_grid() & on_land
 
         # Identify Dnipro hexes (rendered as consecutive lake chain)
         print("  Detecting Dnipro river...")
-        dnipro_hexes_raw = self._get_dnipro_hexes()
-        if land_mask:
-            dnipro_hexes_raw = {h for h in dnipro_hexes_raw if land_mask.get(h, False)}
-        print(f"  Dnipro hexes (on land): {len(dnipro_hexes_raw)}")
+        dnipro_raw = self._dnipro_hex_grid() & on_land
+        print(f"  Dnipro hexes (on land): {np.count_nonzero(dnipro_raw)}")
 
         # Create consecutive chain from north to south
-        dnipro_chain = self.get_dnipro_chain(dnipro_hexes_raw, land_mask)
-        # Convert chain back to set for classification, but store chain for later use
-        dnipro_hexes = set(dnipro_chain)
+        dnipro_chain = self.get_dnipro_chain(_grid_to_hexes(dnipro_raw), land)
+        dnipro = _hexes_to_grid(dnipro_chain, self.height, self.width)
         self.dnipro_chain = dnipro_chain  # Store for later use
 
         # Identify natural lakes
         print("  Detecting major natural lakes...")
-        natural_lake_hexes = self._get_lake_hexes(land_mask)
-        print(f"  Natural lake hexes: {len(natural_lake_hexes)}")
+        natural_lakes = self._lake_grid(land)
+        print(f"  Natural lake hexes: {np.count_nonzero(natural_lakes)}")
 
         # Identify reservoirs (non-Dnipro) - treated as lakes
         print("  Detecting reservoirs...")
-        reservoir_hexes = self._get_reservoir_hexes(all_river_hexes)
-        reservoir_hexes = reservoir_hexes - dnipro_hexes  # Exclude Dnipro
-        print(f"  Reservoir hexes (non-Dnipro): {len(reservoir_hexes)}")
+        reservoirs = rivers & self._reservoir_area_grid() & ~dnipro  # Exclude Dnipro
+        print(f"  Reservoir hexes (non-Dnipro): {np.count_nonzero(reservoirs)}")
 
         # Combine natural lakes and reservoirs
-        lake_hexes = natural_lake_hexes | reservoir_hexes
         # Exclude Dnipro from lakes (Dnipro has its own handling)
-        lake_hexes = lake_hexes - dnipro_hexes
-        print(f"  Total lake hexes (lakes + reservoirs): {len(lake_hexes)}")
+        lakes = (natural_lakes | reservoirs) & ~dnipro
+        print(f"  Total lake hexes (lakes + reservoirs): {np.count_nonzero(lakes)}")
 
         # Regular rivers are ALL rivers except Dnipro and lakes/reservoirs
-        regular_rivers = all_river_hexes - lake_hexes - dnipro_hexes
-        print(f"  Regular river hexes: {len(regular_rivers)}")
+        regular_rivers = rivers & ~lakes & ~dnipro
+        print(f"  Regular river hexes: {np.count_nonzero(regular_rivers)}")
 
         return RiverClassification(
-            regular_rivers=regular_rivers,
-            lakes=lake_hexes,
-            dnipro=dnipro_hexes
+            regular_rivers=_grid_to_array(regular_rivers),
+            lakes=_grid_to_array(lakes),
+            dnipro=_grid_to_array(dnipro)
         )
 
-    def _get_hex_neighbors(self, col: int, row: int) -> List[Tuple[int, int, int]]:
+    def _get_hex_neighbors(self, col: int, row: int) -> Tuple[Tuple[int, int, int], ...]:
         """
         Get all 6 neighbors of a hex with their edge directions.
 
@@ -1119,40 +1449,42 @@ class RiverMapper:
         - 5: NW (north-west)
 
         Returns:
-            List of (col, row, edge_direction) for each neighbor
+            Precomputed tuple of (col, row, edge_direction) for each on-grid neighbor
         """
-        neighbors = []
-
-        if row % 2 == 0:  # Even row
-            offsets = [
-                (0, -1, 0),   # NE
-                (1, 0, 1),    # E
-                (0, 1, 2),    # SE
-                (-1, 1, 3),   # SW
-                (-1, 0, 4),   # W
-                (-1, -1, 5),  # NW
-            ]
-        else:  # Odd row
-            offsets = [
-                (1, -1, 0),   # NE
-                (1, 0, 1),    # E
-                (1, 1, 2),    # SE
-                (0, 1, 3),    # SW
-                (-1, 0, 4),   # W
-                (0, -1, 5),   # NW
-            ]
-
-        for dc, dr, edge in offsets:
-            nc, nr = col + dc, row + dr
-            if 0 <= nc < self.width and 0 <= nr < self.height:
-                neighbors.append((nc, nr, edge))
-
-        return neighbors
+        return self._neighbor_table[row][col]
+
+    def _build_neighbor_tables(self):
+        """Precompute every hex's neighbors (see _get_hex_neighbors).
+
+        self._neighbors is an (H, W, 6, 2) int16 array of (col, row) per
+        edge, -1 where the neighbor is off-grid; self._neighbor_table holds
+        the same as nested tuples for the Python BFS loops, and
+        self._side_table the per-bank split for _get_hex_neighbors_by_side.
+        """
+        cols = np.arange(self.width)
+        rows = np.arange(self.height)
+        offsets = _EDGE_OFFSETS[rows & 1]                       # (H, 6, 2)
+        ncols = cols[None, :, None] + offsets[:, None, :, 0]    # (H, W, 6)
+        nrows = np.broadcast_to(rows[:, None, None] + offsets[:, None, :, 1], ncols.shape)
+        valid = (ncols >= 0) & (ncols < self.width) & (nrows >= 0) & (nrows < self.height)
+        self._neighbors = np.where(valid[..., None], np.stack([ncols, nrows], axis=-1), -1).astype(np.int16)
+        self._neighbor_table = [
+            [tuple((nc, nr, edge) for edge, (nc, nr) in enumerate(cell) if nc >= 0) for cell in row]
+            for row in self._neighbors.tolist()
+        ]
+        # (eastern, western) per cell for _get_hex_neighbors_by_side:
+        # eastern = NE, E, SE; western = NW, W, SW
+        self._side_table = [
+            [(tuple((nc, nr) for nc, nr in (cell[0], cell[1], cell[2]) if nc >= 0),
+              tuple((nc, nr) for nc, nr in (cell[5], cell[4], cell[3]) if nc >= 0))
+             for cell in row]
+            for row in self._neighbors.tolist()
+        ]
 
     def _trace_river_segments(
         self,
         river_hexes: Set[Tuple[int, int]],
-        elevation_map: Optional[Dict[Tuple[int, int], int]] = None
+        elevation_map: Optional[Union[Dict[Tuple[int, int], int], np.ndarray]] = None
     ) -> List[List[Tuple[int, int, int]]]:
         """
         Trace connected river hexes into ordered segments with proper flow directions.
@@ -1165,227 +1497,171 @@ class RiverMapper:
         NOT the edge connecting to the next hex in the segment. Rivers should
         visually flow from high to low elevation (toward the sea).
 
+        List form of _trace_river_arrays, for callers that want segments.
+
         Args:
             river_hexes: Set of (col, row) hex coordinates with rivers
-            elevation_map: Optional {(col, row): level} for determining flow direction
+            elevation_map: Optional elevations (array or {(col, row): level})
+                           for determining flow direction
 
         Returns:
             List of river segments, each segment is a list of (col, row, exit_edge)
         """
-        if not river_hexes:
-            return []
-
-        remaining = set(river_hexes)
-        segments = []
-
-        # Build adjacency graph for river hexes
-        adjacency = {hex_pos: [] for hex_pos in river_hexes}
-        for col, row in river_hexes:
-            neighbors = self._get_hex_neighbors(col, row)
-            for nc, nr, edge in neighbors:
-                if (nc, nr) in river_hexes:
-                    adjacency[(col, row)].append((nc, nr, edge))
-
-        while remaining:
-            # Start from an endpoint (hex with only 1 neighbor) if possible
-            # This creates more natural river flows
-            start = None
-            for hex_pos in remaining:
-                neighbor_count = sum(1 for n, _, _ in adjacency[hex_pos] if n in remaining)
-                if neighbor_count <= 1:
-                    start = hex_pos
-                    break
-            if start is None:
-                start = next(iter(remaining))
-
-            remaining.discard(start)
-            segment = []
-            current = start
-            visited_in_segment = {start}
-
-            # Follow the river path
-            while True:
-                # Find next unvisited river hex neighbor
-                next_hex = None
+        cols, rows, exit_edges, _, positions = self._trace_river_arrays(
+            river_hexes, self._elevation_array(elevation_map))
+        hexes = list(zip(cols.tolist(), rows.tolist(), exit_edges.tolist()))
+        bounds = np.flatnonzero(positions == 0).tolist() + [len(hexes)]
+        return [hexes[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
 
-                for nc, nr, edge in adjacency[current]:
-                    if (nc, nr) in remaining:
-                        next_hex = (nc, nr)
-                        break
+    def _trace_river_arrays(
+        self,
+        river_hexes: Set[Tuple[int, int]],
+        elevation: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Trace river hexes into merged segments as flat per-hex arrays.
 
-                # Calculate downstream flow direction for this hex
-                exit_edge = self._calculate_flow_direction(
-                    current[0], current[1], elevation_map
-                )
+        The river grid is walked into paths starting from endpoints (hexes
+        with at most one unvisited river neighbor) where possible, as this
+        creates more natural river flows; paths whose ends touch are then
+        merged into longer rivers (see _merge_traced_paths). Exit edges
+        come from _flow_direction_kernel, except that a path end merged
+        into a following path exits toward it.
 
-                # Add current hex to segment
-                segment.append((current[0], current[1], exit_edge))
+        Args:
+            river_hexes: Set of (col, row) hex coordinates with rivers
+            elevation: (height, width) elevation array for flow direction
 
-                if next_hex is None:
-                    break
+        Returns:
+            (cols, rows, exit_edges, seg_ids, positions), one entry per river
+            hex in segment order
+        """
+        if not river_hexes:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty, empty
 
-                # Move to next hex
-                remaining.discard(next_hex)
-                visited_in_segment.add(next_hex)
-                current = next_hex
+        river = _hexes_to_grid(river_hexes, self.height, self.width)
+        ncols, nrows = self._neighbors[..., 0], self._neighbors[..., 1]
+        count = ((ncols >= 0) & river[nrows, ncols]).sum(axis=-1).astype(np.int8)
+        endpoints = np.flatnonzero(river & (count <= 1))[::-1].astype(np.int32)
+        order, starts = _trace_segments_kernel(river, count, endpoints, self._neighbors)
+        rows, cols = np.divmod(order.astype(np.int64), self.width)
 
-            if segment:
-                segments.append(segment)
+        # Calculate downstream flow direction for each hex
+        exit_edges = _flow_direction_kernel(elevation, cols, rows, self.width // 2).astype(np.int64)
 
         # Merge small segments into larger ones if they connect
         # This reduces fragmentation
-        merged_segments = self._merge_connected_segments(segments, adjacency)
-
-        return merged_segments
-
-    def _calculate_flow_direction(
+        chains, end_edges = self._merge_traced_paths(river, cols, rows, starts)
+        for k, edge in end_edges.items():
+            exit_edges[k] = edge
+
+        ends = np.append(starts[1:], len(order))
+        runs = [(starts[i], ends[i]) for chain in chains for i in chain]
+        idx = np.concatenate([np.arange(a, b) for a, b in runs])
+        chain_lens = np.array([sum(ends[i] - starts[i] for i in chain) for chain in chains])
+        seg_ids = np.repeat(np.arange(len(chains)), chain_lens)
+        positions = np.arange(len(idx)) - np.repeat(np.cumsum(chain_lens) - chain_lens, chain_lens)
+        return cols[idx], rows[idx], exit_edges[idx], seg_ids, positions
+
+    def _merge_traced_paths(
         self,
-        col: int,
-        row: int,
-        elevation_map: Optional[Dict[Tuple[int, int], int]] = None
-    ) -> int:
+        river: np.ndarray,
+        cols: np.ndarray,
+        rows: np.ndarray,
+        starts: np.ndarray
+    ) -> Tuple[List[List[int]], Dict[int, int]]:
         """
-        Calculate the downstream flow direction for a river hex.
-
-        The flow direction is determined by:
-        1. If elevation data available: direction toward lowest neighbor
-        2. Otherwise: use geographic heuristic (rivers flow south toward Black Sea)
+        Merge connected paths into longer rivers.
 
-        Ukrainian rivers generally flow:
-        - South (toward Black Sea): Dnipro, Southern Bug, Dnister
-        - Southeast: Rivers in eastern Ukraine
-        - Southwest: Rivers near Danube delta
-
-        Args:
-            col, row: Hex coordinates
-            elevation_map: Optional elevation data
+        Path i is the run starts[i]:starts[i + 1] of the traversal arrays.
+        Each unused path is extended by repeatedly prepending a path that
+        ends next to its start, then appending one that starts next to its
+        end (first river neighbor in edge order).
 
         Returns:
-            Edge direction (0-5) representing downstream flow
+            (chains, end_edges): path indices of each merged river in order,
+            and {hex index: edge} for path ends that now flow into the next path
         """
-        neighbors = self._get_hex_neighbors(col, row)
-
-        # If we have elevation data, flow toward lowest neighbor
-        if elevation_map:
-            my_elev = elevation_map.get((col, row), 0)
-            lowest_elev = my_elev
-            best_edge = None
-
-            for nc, nr, edge in neighbors:
-                neighbor_elev = elevation_map.get((nc, nr), 0)
-                if neighbor_elev < lowest_elev:
-                    lowest_elev = neighbor_elev
-                    best_edge = edge
-
-            if best_edge is not None:
-                return best_edge
-
-        # Fallback: geographic heuristic for Ukraine
-        # Most rivers flow generally south toward the Black Sea
-        # Prefer SE (2) and SW (3) as they represent southward flow
-        # Use latitude (row) to bias direction:
-        # - Northern rivers: prefer SE (2) - flowing toward center
-        # - Southern rivers: prefer SW (3) - flowing toward sea
-        # - Eastern rivers: prefer SW (3)
-        # - Western rivers: prefer SE (2)
-
-        # Simple heuristic based on position
-        center_col = self.width // 2
-        center_row = self.height // 2
-
-        if col > center_col:
-            # Eastern side - rivers flow SW
-            return 3  # SW
-        else:
-            # Western side - rivers flow SE
-            return 2  # SE
-
-    def _merge_connected_segments(
-        self,
-        segments: List[List[Tuple[int, int, int]]],
-        adjacency: dict
-    ) -> List[List[Tuple[int, int, int]]]:
-        """Merge connected segments into longer rivers."""
-        if len(segments) <= 1:
-            return segments
-
-        # Build segment endpoint index
-        segment_by_start = {}
-        segment_by_end = {}
-        for i, seg in enumerate(segments):
-            if seg:
-                start_pos = (seg[0][0], seg[0][1])
-                end_pos = (seg[-1][0], seg[-1][1])
-                segment_by_start[start_pos] = i
-                segment_by_end[end_pos] = i
-
-        merged = []
-        used = set()
-
-        for i, seg in enumerate(segments):
-            if i in used:
+        n_paths = len(starts)
+        ends = np.append(starts[1:], len(cols)) - 1
+        first = list(zip(cols[starts].tolist(), rows[starts].tolist()))
+        last = list(zip(cols[ends].tolist(), rows[ends].tolist()))
+        ends = ends.tolist()
+
+        # Build path endpoint index
+        path_by_start = {pos: i for i, pos in enumerate(first)}
+        path_by_end = {pos: i for i, pos in enumerate(last)}
+
+        def river_neighbors(pos):
+            return [(nc, nr, edge) for nc, nr, edge in self._neighbor_table[pos[1]][pos[0]]
+                    if river[nr, nc]]
+
+        chains = []
+        end_edges = {}
+        used = bytearray(n_paths)
+
+        for i in range(n_paths):
+            if used[i]:
                 continue
+            chain = deque([i])
+            used[i] = 1
 
-            # Try to extend this segment by connecting to others
-            current_seg = list(seg)
-            used.add(i)
-
-            # Try to prepend segments
+            # Try to prepend paths: one that ends adjacent to our start
             while True:
-                if not current_seg:
-                    break
-                start_pos = (current_seg[0][0], current_seg[0][1])
-                # Find a segment that ends adjacent to our start
-                found = False
-                for col, row in [(start_pos[0], start_pos[1])]:
-                    for nc, nr, edge in adjacency.get((col, row), []):
-                        if (nc, nr) in segment_by_end:
-                            other_idx = segment_by_end[(nc, nr)]
-                            if other_idx not in used:
-                                # Prepend the other segment
-                                other_seg = segments[other_idx]
-                                # Update last hex's exit edge to connect
-                                if other_seg:
-                                    other_seg[-1] = (other_seg[-1][0], other_seg[-1][1], edge)
-                                current_seg = list(other_seg) + current_seg
-                                used.add(other_idx)
-                                found = True
-                                break
-                    if found:
+                for nc, nr, edge in river_neighbors(first[chain[0]]):
+                    other = path_by_end.get((nc, nr))
+                    if other is not None and not used[other]:
+                        # Update its last hex's exit edge to connect
+                        end_edges[ends[other]] = edge
+                        chain.appendleft(other)
+                        used[other] = 1
                         break
-                if not found:
+                else:
                     break
 
-            # Try to append segments
+            # Try to append paths: one that starts adjacent to our end
             while True:
-                if not current_seg:
-                    break
-                end_pos = (current_seg[-1][0], current_seg[-1][1])
-                # Find a segment that starts adjacent to our end
-                found = False
-                for nc, nr, edge in adjacency.get(end_pos, []):
-                    if (nc, nr) in segment_by_start:
-                        other_idx = segment_by_start[(nc, nr)]
-                        if other_idx not in used:
-                            # Update our exit edge to connect
-                            current_seg[-1] = (end_pos[0], end_pos[1], edge)
-                            # Append the other segment
-                            current_seg = current_seg + list(segments[other_idx])
-                            used.add(other_idx)
-                            found = True
-                            break
-                if not found:
+                for nc, nr, edge in river_neighbors(last[chain[-1]]):
+                    other = path_by_start.get((nc, nr))
+                    if other is not None and not used[other]:
+                        # Update our exit edge to connect
+                        end_edges[ends[chain[-1]]] = edge
+                        chain.append(other)
+                        used[other] = 1
+                        break
+                else:
                     break
 
-            merged.append(current_seg)
+            chains.append(list(chain))
 
-        return merged
+        return chains, end_edges
+
+    def _elevation_array(
+        self,
+        elevation_map: Optional[Union[Dict[Tuple[int, int], int], np.ndarray]]
+    ) -> np.ndarray:
+        """
+        (height, width) elevation array for _flow_direction_kernel.
+
+        A dict is scattered with missing hexes at 0; without elevations
+        every hex is level, so the kernel falls back to the geographic
+        heuristic.
+        """
+        if isinstance(elevation_map, np.ndarray):
+            return elevation_map
+        elevation = np.zeros((self.height, self.width), dtype=np.float64)
+        if elevation_map:
+            cols, rows = _hexes_to_array(elevation_map.keys()).T
+            elevation[rows, cols] = np.fromiter(elevation_map.values(), dtype=np.float64,
+                                                count=len(elevation_map))
+        return elevation
 
     def create_river_texture(
         self,
-        ukraine_mask: Optional[Dict[Tuple[int, int], bool]] = None,
-        river_hexes: Optional[Set[Tuple[int, int]]] = None,
-        elevation_map: Optional[Dict[Tuple[int, int], int]] = None
+        ukraine_mask: Optional[Union[Dict[Tuple[int, int], bool], np.ndarray]] = None,
+        river_hexes: Optional[Union[Set[Tuple[int, int]], np.ndarray]] = None,
+        elevation_map: Optional[Union[Dict[Tuple[int, int], int], np.ndarray]] = None
     ) -> np.ndarray:
         """
         Create river texture array for the map.
@@ -1403,10 +1679,12 @@ class RiverMapper:
         visually flow from high to low elevation.
 
         Args:
-            ukraine_mask: Optional land mask to only place rivers on land
-            river_hexes: Optional set of river hexes to mark. If not provided,
-                        uses get_river_hexes_fast() to get all rivers.
-            elevation_map: Optional {(col, row): level} for calculating flow direction
+            ukraine_mask: Optional land mask ((height, width) bool array or
+                          dict) to only place rivers on land
+            river_hexes: Optional set (or (N, 2) array) of river hexes to mark.
+                        If not provided, uses get_river_hexes_fast() to get all rivers.
+            elevation_map: Optional (height, width) elevation array or
+                          {(col, row): level} dict for calculating flow direction
 
         Returns:
             RGBA array (height, width, 4)
@@ -1416,7 +1694,14 @@ class RiverMapper:
             river_hexes = self.get_river_hexes_fast()
 
         # Filter to land hexes if mask provided
-        if ukraine_mask is not None:
+        if isinstance(river_hexes, np.ndarray):
+            if isinstance(ukraine_mask, np.ndarray):
+                river_hexes = river_hexes[ukraine_mask[river_hexes[:, 1], river_hexes[:, 0]]]
+                ukraine_mask = None
+            river_hexes = set(map(tuple, river_hexes.tolist()))
+        if isinstance(ukraine_mask, np.ndarray):
+            river_hexes = {(c, r) for c, r in river_hexes if ukraine_mask[r, c]}
+        elif ukraine_mask is not None:
             river_hexes = {h for h in river_hexes if ukraine_mask.get(h, False)}
 
         # Create texture - default is "no river" (255, 255, 6, 0)
@@ -1426,26 +1711,27 @@ class RiverMapper:
         texture[:, :, 2] = 6    # B
         texture[:, :, 3] = 0    # A
 
-        # Trace river hexes into connected segments with proper flow direction
-        segments = self._trace_river_segments(river_hexes, elevation_map)
-
-        print(f"  Traced {len(segments)} river segments")
-
-        # Encode each segment
-        for segment_id, segment in enumerate(segments):
-            if segment_id > 254:  # R channel limit (255 reserved for no-river)
-                print(f"  Warning: More than 255 river segments, skipping excess")
-                break
-
-            for position, (col, row, exit_edge) in enumerate(segment):
-                if position > 255:  # G channel limit
-                    print(f"  Warning: River segment {segment_id} has more than 256 hexes")
-                    break
-
-                texture[row, col, 0] = segment_id       # R = segment ID
-                texture[row, col, 1] = position         # G = position in segment
-                texture[row, col, 2] = exit_edge        # B = exit edge (0-5)
-                texture[row, col, 3] = 0                # A = 0
+        # Trace river hexes into connected segments with proper flow
+        # direction, straight into flat per-hex arrays
+        cols, rows, exit_edges, seg_ids, positions = self._trace_river_arrays(
+            river_hexes, self._elevation_array(elevation_map))
+        n_segments = int(seg_ids[-1]) + 1 if len(seg_ids) else 0
+
+        print(f"  Traced {n_segments} river segments")
+
+        # R channel limit (255 reserved for no-river)
+        if n_segments > 255:
+            print(f"  Warning: More than 255 river segments, skipping excess")
+        seg_lens = np.bincount(seg_ids[seg_ids < 255])
+        for segment_id in np.flatnonzero(seg_lens > 256).tolist():  # G channel limit
+            print(f"  Warning: River segment {segment_id} has more than 256 hexes")
+        keep = (seg_ids < 255) & (positions < 256)
+        rows, cols = rows[keep], cols[keep]
+
+        texture[rows, cols, 0] = seg_ids[keep]       # R = segment ID
+        texture[rows, cols, 1] = positions[keep]     # G = position in segment
+        texture[rows, cols, 2] = exit_edges[keep]    # B = exit edge (0-5)
+        texture[rows, cols, 3] = 0                   # A = 0
 
         return texture
 
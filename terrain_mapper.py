@@ -15,7 +15,7 @@ TerrainTypeNames in Save.hms. This order may vary between maps!
 
 import numpy as np
 from pathlib import Path
-from typing import Dict, Tuple, Set, Optional
+from typing import Dict, Tuple, Set, Optional, Union
 import yaml
 
 
@@ -83,6 +83,31 @@ COPERNICUS_TO_TERRAIN = {
 #
 # For Ukraine map, we'll use variant 7 as the default (temperate).
 
+# Sentinel in the int8 elevation override array for hexes without an override
+NO_OVERRIDE = -128
+
+
+# Neighbor offsets (dc, dr) indexed by [row & 1][direction], direction order
+# NW, NE, W, E, SW, SE (matches get_hex_neighbor_directions and B channel bits)
+_NEIGH_OFF = np.array([
+    [[-1, -1], [0, -1], [-1, 0], [1, 0], [-1, 1], [0, 1]],   # Even rows
+    [[0, -1], [1, -1], [-1, 0], [1, 0], [0, 1], [1, 1]],     # Odd rows
+], dtype=np.int8)
+_DIRS = np.arange(6, dtype=np.int8)
+
+# Direction indices of the eastern neighbors (NE, E, SE) in _NEIGH_OFF
+_EAST_DIRS = np.array([1, 3, 5])
+
+
+def _neighbor_coords(col: int, row: int, width: int, height: int, dirs=_DIRS):
+    """(directions, cols, rows) arrays of the on-grid neighbors along dirs."""
+    # Widen before adding: col/row can exceed the int8 range
+    offs = _NEIGH_OFF[row & 1, dirs].astype(np.intp)
+    nc = offs[:, 0] + col
+    nr = offs[:, 1] + row
+    m = (nc >= 0) & (nc < width) & (nr >= 0) & (nr < height)
+    return dirs[m], nc[m], nr[m]
+
 
 def get_hex_neighbors(col: int, row: int, width: int, height: int) -> list:
     """
@@ -95,27 +120,8 @@ def get_hex_neighbors(col: int, row: int, width: int, height: int) -> list:
     - For even rows: NW(-1,-1), NE(0,-1), W(-1,0), E(+1,0), SW(-1,+1), SE(0,+1)
     - For odd rows:  NW(0,-1), NE(+1,-1), W(-1,0), E(+1,0), SW(0,+1), SE(+1,+1)
     """
-    neighbors = []
-
-    if row % 2 == 0:  # Even row
-        offsets = [
-            (-1, -1), (0, -1),   # NW, NE
-            (-1, 0), (1, 0),     # W, E
-            (-1, 1), (0, 1),     # SW, SE
-        ]
-    else:  # Odd row
-        offsets = [
-            (0, -1), (1, -1),    # NW, NE
-            (-1, 0), (1, 0),     # W, E
-            (0, 1), (1, 1),      # SW, SE
-        ]
-
-    for dc, dr in offsets:
-        nc, nr = col + dc, row + dr
-        if 0 <= nc < width and 0 <= nr < height:
-            neighbors.append((nc, nr))
-
-    return neighbors
+    _, nc, nr = _neighbor_coords(col, row, width, height)
+    return list(zip(nc.tolist(), nr.tolist()))
 
 
 def get_hex_neighbor_directions(col: int, row: int, width: int, height: int) -> list:
@@ -133,40 +139,11 @@ def get_hex_neighbor_directions(col: int, row: int, width: int, height: int) ->
     - Bit 4 (16): SW
     - Bit 5 (32): SE
     """
-    neighbors = []
-
-    if row % 2 == 0:  # Even row
-        offsets = [
-            (0, -1, -1),   # NW
-            (1, 0, -1),    # NE
-            (2, -1, 0),    # W
-            (3, 1, 0),     # E
-            (4, -1, 1),    # SW
-            (5, 0, 1),     # SE
-        ]
-    else:  # Odd row
-        offsets = [
-            (0, 0, -1),    # NW
-            (1, 1, -1),    # NE
-            (2, -1, 0),    # W
-            (3, 1, 0),     # E
-            (4, 0, 1),     # SW
-            (5, 1, 1),     # SE
-        ]
-
-    for direction, dc, dr in offsets:
-        nc, nr = col + dc, row + dr
-        if 0 <= nc < width and 0 <= nr < height:
-            neighbors.append((direction, nc, nr))
-
-    return neighbors
-
-
-def calculate_mountain_chain_flags(
-    mountain_hexes: Set[Tuple[int, int]],
-    width: int,
-    height: int
-) -> Dict[Tuple[int, int], int]:
+    dirs, nc, nr = _neighbor_coords(col, row, width, height)
+    return list(zip(dirs.tolist(), nc.tolist(), nr.tolist()))
+
+
+def calculate_mountain_chain_flags(mountain_mask: np.ndarray) -> np.ndarray:
     """
     Calculate B channel values for mountain chain connectivity.
 
@@ -185,31 +162,31 @@ def calculate_mountain_chain_flags(
     B=63 means connected in all 6 directions
 
     Args:
-        mountain_hexes: Set of (col, row) tuples that are Mountain or MountainSnow terrain
-        width: Grid width
-        height: Grid height
+        mountain_mask: (height, width) bool array, True for Mountain or
+                       MountainSnow terrain
 
     Returns:
-        Dict mapping (col, row) -> B channel value for each mountain hex
+        (height, width) uint8 array of B channel values (0 for non-mountain hexes)
     """
-    b_channel = {}
-
-    for col, row in mountain_hexes:
-        flags = 0
-        neighbors = get_hex_neighbor_directions(col, row, width, height)
+    height, width = mountain_mask.shape
+    b_arr = np.zeros((height, width), dtype=np.uint8)
+    if not mountain_mask.any():
+        return b_arr
 
-        for direction, nc, nr in neighbors:
-            if (nc, nr) in mountain_hexes:
-                flags |= (1 << direction)
+    # OR in one shifted neighbor plane per direction; offsets depend on row
+    # parity, so even and odd rows are handled separately. Off-grid counts
+    # as non-mountain.
+    padded = np.pad(mountain_mask.astype(np.uint8), 1)
+    for parity in (0, 1):
+        for direction, (dc, dr) in enumerate(_NEIGH_OFF[parity].tolist()):
+            neighbor = padded[1 + dr + parity:1 + dr + height:2, 1 + dc:1 + dc + width]
+            b_arr[parity::2] |= neighbor << direction
 
-        # Ensure isolated mountains still render - set minimum connectivity
-        # If a hex has no mountain neighbors, set B=63 to force rendering
-        if flags == 0:
-            flags = 63  # All directions - makes isolated peaks render
+    b_arr[~mountain_mask] = 0
+    # Isolated mountains (no mountain neighbors) get B=63 so they still render
+    b_arr[mountain_mask & (b_arr == 0)] = 63
 
-        b_channel[(col, row)] = flags
-
-    return b_channel
+    return b_arr
 
 
 def get_east_neighbors(col: int, row: int, width: int, height: int) -> list:
@@ -219,27 +196,8 @@ def get_east_neighbors(col: int, row: int, width: int, height: int) -> list:
     For rivers flowing south (like Dnipro), the "left bank" is on the east side.
     Returns list of (col, row) tuples for valid eastern neighbors.
     """
-    neighbors = []
-
-    if row % 2 == 0:  # Even row
-        offsets = [
-            (0, -1),   # NE
-            (1, 0),    # E
-            (0, 1),    # SE
-        ]
-    else:  # Odd row
-        offsets = [
-            (1, -1),   # NE
-            (1, 0),    # E
-            (1, 1),    # SE
-        ]
-
-    for dc, dr in offsets:
-        nc, nr = col + dc, row + dr
-        if 0 <= nc < width and 0 <= nr < height:
-            neighbors.append((nc, nr))
-
-    return neighbors
+    _, nc, nr = _neighbor_coords(col, row, width, height, _EAST_DIRS)
+    return list(zip(nc.tolist(), nr.tolist()))
 
 
 def encode_terrain(terrain_idx: int, biome_variant: int = 7) -> int:
@@ -311,8 +269,35 @@ class TerrainMapper:
             self.terrain_types = TERRAIN_TYPES.copy()
             print(f"  Using default terrain order: {len(self.terrain_types)} types")
 
+        self._build_landcover_luts()
+
         print(f"  Water elevations: ocean={self.ocean_elevation}, coastal={self.coastal_elevation}, lake={self.lake_elevation}")
 
+    def _build_landcover_luts(self):
+        """
+        Build 256-entry lookup tables over Copernicus classes.
+
+        self._lc_lut maps a class to the terrain index used for land hexes
+        below hill level (Prairie for unknown classes); self._lc_is_forest
+        marks the closed-forest classes (RockyForest on hills).
+        """
+        self._lc_lut = np.full(256, self.terrain_types['Prairie'], dtype=np.uint8)
+        for landcover, terrain_name in COPERNICUS_TO_TERRAIN.items():
+            # Override: if Copernicus says water but raion says land,
+            # use default land terrain (this catches reservoirs, rivers, wetlands)
+            if terrain_name in ('Ocean', 'Lake', 'CoastalWater'):
+                terrain_name = 'Prairie'
+            # Don't use Mountain/MountainSnow from landcover for low elevation
+            # (high elevation is handled by the elevation rules)
+            elif terrain_name == 'Mountain':
+                terrain_name = 'RockyField'
+            elif terrain_name == 'MountainSnow':
+                terrain_name = 'Mountain'
+            self._lc_lut[landcover] = self.terrain_types[terrain_name]
+
+        self._lc_is_forest = np.zeros(256, dtype=bool)
+        self._lc_is_forest[[111, 112, 113, 114, 115, 116]] = True
+
     def _pixel_to_geo(self, col: int, row: int) -> Tuple[float, float]:
         """Convert pixel coordinates to geographic coordinates."""
         lon = self.min_lon + (col / self.width) * (self.max_lon - self.min_lon)
@@ -392,37 +377,32 @@ class TerrainMapper:
         # RockyField for moderately high elevation (level 5-6, hills/high hills)
         if elevation >= 5:
             # Check if Copernicus says forest - use RockyForest instead
-            if landcover is not None and landcover in (111, 112, 113, 114, 115, 116):
+            if landcover is not None and 0 <= landcover < 256 and self._lc_is_forest[landcover]:
                 return encode_terrain(self.terrain_types['RockyForest'], biome_variant), None
             return encode_terrain(self.terrain_types['RockyField'], biome_variant), None
 
         # === LANDCOVER-BASED TERRAIN (for lower elevations) ===
-        if landcover is not None and landcover in COPERNICUS_TO_TERRAIN:
-            terrain_name = COPERNICUS_TO_TERRAIN[landcover]
-
-            # Override: if Copernicus says water but raion says land,
-            # use default land terrain (this catches reservoirs, rivers, wetlands)
-            if terrain_name in ('Ocean', 'Lake', 'CoastalWater'):
-                return encode_terrain(self.terrain_types['Prairie'], biome_variant), None
-
-            # Don't use Mountain/MountainSnow from landcover for low elevation
-            # (already handled above for high elevation)
-            if terrain_name == 'Mountain' and elevation < 7:
-                return encode_terrain(self.terrain_types['RockyField'], biome_variant), None
-            if terrain_name == 'MountainSnow' and elevation < 10:
-                return encode_terrain(self.terrain_types['Mountain'], biome_variant), None
-
-            return encode_terrain(self.terrain_types[terrain_name], biome_variant), None
+        if landcover is not None:
+            return encode_terrain(self._landcover_terrain(landcover), biome_variant), None
 
         # Fallback: default land (Prairie)
         return encode_terrain(self.terrain_types['Prairie'], biome_variant), None
 
+    def _landcover_terrain(self, landcover: int) -> int:
+        """
+        Terrain index for a land hex below hill level (elevation < 5) from its
+        Copernicus land cover class; Prairie for unknown classes.
+        """
+        if 0 <= landcover < 256:
+            return int(self._lc_lut[landcover])
+        return self.terrain_types['Prairie']
+
     def _get_river_elevation_from_bank(
         self,
         col: int,
         row: int,
         elevation_map: Dict[Tuple[int, int], int],
-        land_mask: Dict[Tuple[int, int], bool],
+        land_mask: Union[Dict[Tuple[int, int], bool], np.ndarray],
         river_hexes: Set[Tuple[int, int]],
     ) -> int:
         """
@@ -433,7 +413,7 @@ class TerrainMapper:
         Args:
             col, row: River hex coordinates
             elevation_map: {(col, row): level} elevation per hex
-            land_mask: {(col, row): is_land} land/ocean per hex
+            land_mask: (height, width) bool array or {(col, row): is_land} dict
             river_hexes: Set of river hex coordinates
 
         Returns:
@@ -441,11 +421,13 @@ class TerrainMapper:
         """
         all_neighbors = get_hex_neighbors(col, row, self.width, self.height)
 
+        is_array = isinstance(land_mask, np.ndarray)
         land_elevations = []
         for nc, nr in all_neighbors:
             neighbor_pos = (nc, nr)
+            is_land = land_mask[nr, nc] if is_array else land_mask.get(neighbor_pos, False)
             # Check if neighbor is land (not river, not ocean)
-            if land_mask.get(neighbor_pos, False) and neighbor_pos not in river_hexes:
+            if is_land and neighbor_pos not in river_hexes:
                 land_elevations.append(elevation_map.get(neighbor_pos, self.lake_elevation))
 
         if land_elevations:
@@ -457,81 +439,128 @@ class TerrainMapper:
     def create_terrain_map(
         self,
         elevation_map: Dict[Tuple[int, int], int],
-        land_mask: Dict[Tuple[int, int], bool],
-        river_hexes: Optional[Set[Tuple[int, int]]] = None,
+        land_mask: Union[Dict[Tuple[int, int], bool], np.ndarray],
+        river_hexes: Optional[Union[Set[Tuple[int, int]], np.ndarray]] = None,
         landcover_grid: Optional[np.ndarray] = None,
-        hex_biome_map: Optional[Dict[Tuple[int, int], int]] = None,
-    ) -> Tuple[Dict[Tuple[int, int], int], Dict[Tuple[int, int], int], Set[Tuple[int, int]]]:
+        biome_arr: Optional[np.ndarray] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Create terrain map for all hexes.
 
         Args:
             elevation_map: {(col, row): level} elevation per hex
-            land_mask: {(col, row): is_land} land/ocean per hex
-            river_hexes: Optional set of (col, row) for river hexes
+            land_mask: (height, width) bool array, or legacy {(col, row): is_land} dict
+            river_hexes: Optional set (or (N, 2) array) of (col, row) for river hexes
             landcover_grid: Optional numpy array (height x width) of Copernicus land cover classes
-            hex_biome_map: Optional {(col, row): biome} map for biome variant encoding
+            biome_arr: Optional (height x width) array of territory biome per hex
+                       for biome variant encoding
 
         Returns:
-            Tuple of:
-            - terrain_map: {(col, row): g_value} terrain encoding per hex
-            - elevation_overrides: {(col, row): level} elevation overrides for water tiles
-            - mountain_hexes: set of (col, row) for Mountain/MountainSnow terrain (for B channel)
+            Tuple of (height, width) arrays:
+            - terrain_arr: uint8 G channel value (terrain encoding) per hex
+            - elevation_overrides: int8 elevation override for water tiles,
+              NO_OVERRIDE elsewhere
+            - mountain_mask: bool, True for Mountain/MountainSnow terrain (for B channel)
         """
         if river_hexes is None:
             river_hexes = set()
+        elif isinstance(river_hexes, np.ndarray):
+            river_hexes = set(map(tuple, river_hexes.tolist()))
+
+        # Rules are applied to whole (height, width) grids at once, in the
+        # same priority order as get_terrain_for_hex
+        shape = (self.height, self.width)
+        elev = np.zeros(shape, dtype=np.int16)
+        if elevation_map:
+            cols, rows = np.array(list(elevation_map.keys()), dtype=np.intp).T
+            elev[rows, cols] = np.fromiter(elevation_map.values(), dtype=np.int16,
+                                           count=len(elevation_map))
+        if isinstance(land_mask, np.ndarray):
+            land = land_mask.astype(bool, copy=False)
+        else:
+            land = np.zeros(shape, dtype=bool)
+            for (col, row), is_land in land_mask.items():
+                if is_land:
+                    land[row, col] = True
+        river = np.zeros(shape, dtype=bool)
+        if river_hexes:
+            cols, rows = np.array(list(river_hexes), dtype=np.intp).T
+            river[rows, cols] = True
+
+        # Use territory biome as variant, or default to 7 (Temperate)
+        if biome_arr is not None:
+            biome_variant = biome_arr.astype(np.int64)
+        else:
+            biome_variant = np.full(shape, 7, dtype=np.int64)
 
-        terrain_map = {}
-        elevation_overrides = {}
-        terrain_counts = {}
-        mountain_hexes = set()  # Track Mountain and MountainSnow terrain
-
-        # First pass: assign terrain types to all hexes
-        for row in range(self.height):
-            for col in range(self.width):
-                pos = (col, row)
-                elevation = elevation_map.get(pos, 0)
-                is_land = land_mask.get(pos, False)
-                is_river = pos in river_hexes
-
-                # Get land cover from grid if available
-                landcover = None
-                if landcover_grid is not None:
-                    landcover = int(landcover_grid[row, col])
-
-                # Get biome for this hex
-                biome = None
-                if hex_biome_map is not None:
-                    biome = hex_biome_map.get(pos)
-
-                g_value, elev_override = self.get_terrain_for_hex(
-                    col, row, elevation, is_land, is_river, landcover, biome
-                )
-                terrain_map[pos] = g_value
-
-                # Store elevation override if provided (for non-river water tiles)
-                # River tiles get special handling below
-                if elev_override is not None and not is_river:
-                    elevation_overrides[pos] = elev_override
-
-                # Count terrain types and track mountains
-                terrain_idx = g_value & 0x0F
-                terrain_counts[terrain_idx] = terrain_counts.get(terrain_idx, 0) + 1
-
-                # Track mountain hexes (Mountain=5, MountainSnow=6 in default order)
-                mountain_idx = self.terrain_types.get('Mountain', 5)
-                mountain_snow_idx = self.terrain_types.get('MountainSnow', 6)
-                if terrain_idx in (mountain_idx, mountain_snow_idx):
-                    mountain_hexes.add(pos)
+        terrain = np.zeros(shape, dtype=np.int64)
+        override = np.full(shape, np.iinfo(np.int64).min, dtype=np.int64)  # min = no override
+        pending = np.ones(shape, dtype=bool)  # Hexes not yet assigned by a higher-priority rule
+
+        def assign(mask, terrain_name, elev_override=None):
+            mask &= pending
+            if mask.any():
+                terrain[mask] = self.terrain_types[terrain_name]
+                if elev_override is not None:
+                    override[mask] = elev_override
+                pending[mask] = False
+            return mask
+
+        # Water terrain (not land according to raion boundaries)
+        assign(~land & (elev <= -2), 'Ocean', self.ocean_elevation)
+        assign(~land & (elev > -2), 'CoastalWater', self.coastal_elevation)
+
+        # Rivers on land - Lake terrain
+        assign(river.copy(), 'Lake', self.lake_elevation)
+
+        # Elevation-based terrain (mountains MUST be Mountain terrain);
+        # snow-capped peaks use the Arctic variant (0)
+        snow = elev >= 10
+        if hasattr(self, 'max_elevation'):
+            snow |= elev == self.max_elevation
+        biome_variant[assign(snow, 'MountainSnow')] = 0
+        assign(elev >= 7, 'Mountain')
+        hills = elev >= 5
+        if landcover_grid is not None:
+            # Index the 256-entry class LUTs once for the whole grid; classes
+            # outside 0-255 are unknown (Prairie, not forest)
+            lc = landcover_grid.astype(np.intp)
+            in_lut = (lc >= 0) & (lc < 256)
+            lc[~in_lut] = 0
+            assign(hills & in_lut & self._lc_is_forest[lc], 'RockyForest')
+        assign(hills, 'RockyField')
+
+        # Landcover-based terrain for the remaining (lower) land hexes
+        if landcover_grid is not None:
+            lc_terrain = np.where(in_lut, self._lc_lut[lc], self.terrain_types['Prairie'])
+            terrain[pending] = lc_terrain[pending]
+        elif pending.any():
+            terrain[pending] = self.terrain_types['Prairie']
+
+        terrain_arr = ((biome_variant << 4) | (terrain & 0x0F)).astype(np.uint8)
+
+        # Elevation overrides for non-river water tiles; river tiles get
+        # special handling below
+        has_override = (override != np.iinfo(np.int64).min) & ~river
+        elevation_overrides = np.where(has_override, override, NO_OVERRIDE).astype(np.int8)
+
+        # Count terrain types and track mountains
+        terrain_idx = terrain_arr & 0x0F
+        terrain_counts = {idx: int(n) for idx, n in enumerate(np.bincount(terrain_idx.ravel())) if n}
+
+        # Track mountain hexes (Mountain=5, MountainSnow=6 in default order)
+        mountain_idx = self.terrain_types.get('Mountain', 5)
+        mountain_snow_idx = self.terrain_types.get('MountainSnow', 6)
+        mountain_mask = np.isin(terrain_idx, (mountain_idx, mountain_snow_idx))
 
         # Second pass: set river elevations based on adjacent land (left bank)
         river_bank_elevations = 0
         for pos in river_hexes:
             col, row = pos
             bank_elevation = self._get_river_elevation_from_bank(
-                col, row, elevation_map, land_mask, river_hexes
+                col, row, elevation_map, land, river_hexes
             )
-            elevation_overrides[pos] = bank_elevation
+            elevation_overrides[row, col] = bank_elevation
             river_bank_elevations += 1
 
         # Print terrain distribution
@@ -542,11 +571,11 @@ class TerrainMapper:
             count = terrain_counts[idx]
             print(f"    {name}: {count} hexes")
 
-        print(f"  Elevation overrides: {len(elevation_overrides)} water hexes")
+        print(f"  Elevation overrides: {np.count_nonzero(elevation_overrides != NO_OVERRIDE)} water hexes")
         print(f"    - River hexes with bank elevation: {river_bank_elevations}")
-        print(f"  Mountain hexes: {len(mountain_hexes)} (for B channel connectivity)")
+        print(f"  Mountain hexes: {np.count_nonzero(mountain_mask)} (for B channel connectivity)")
 
-        return terrain_map, elevation_overrides, mountain_hexes
+        return terrain_arr, elevation_overrides, mountain_mask
 
 
 def main():
@@ -0,0 +1,85 @@
+"""
+Tests for in-memory Save.hms texture swapping.
+
+Phase 5: Template-Based Incremental Map Generation
+Task 5.1: Replace texture blobs in the template save without corrupting it
+"""
+
+import re
+
+import pytest
+
+from incremental_map_builder import _SaveSegments
+
+
+SAVE_CONTENT = (
+    b'\xef\xbb\xbf<Document>\n'
+    b'  <Width>8</Width>\n'
+    b'  <ElevationTexture.Bytes Length="8">QUJDREVG</ElevationTexture.Bytes>\n'
+    b'  <ZonesTexture.Bytes Length="0"></ZonesTexture.Bytes>\n'
+    b'  <RiverTexture.Bytes Length="4">AAAA</RiverTexture.Bytes>\n'
+    b'  <Empty.Bytes Length="2">xx</Empty.Bytes>\n'
+    b'</Document>\n'
+)
+
+
+def plain_sub(content: bytes, texture_name: str, new_base64: bytes) -> bytes:
+    """Reference swap: a single regex pass over the whole save."""
+    pattern = rb'(<' + re.escape(texture_name.encode('ascii')) + rb'\.Bytes Length=")(\d+)(">)([^<]*)(</)'
+    length = str(len(new_base64)).encode('ascii')
+    return re.sub(
+        pattern,
+        lambda m: m.group(1) + length + m.group(3) + new_base64 + m.group(5),
+        content,
+    )
+
+
+class TestPhase5Task1SaveSegments:
+    """Task 5.1: Texture swaps on the segmented save match a plain re.sub."""
+
+    def test_unchanged_round_trip(self):
+        """Splitting and re-joining the save reproduces it byte for byte."""
+        assert _SaveSegments(SAVE_CONTENT).join() == SAVE_CONTENT
+
+    def test_only_texture_blobs_are_segmented(self):
+        """Only *Texture.Bytes elements become blobs, in document order."""
+        segments = _SaveSegments(SAVE_CONTENT)
+        assert segments.names == ['ElevationTexture', 'ZonesTexture', 'RiverTexture']
+        assert len(segments.texts) == len(segments.names) + 1
+
+    @pytest.mark.parametrize('name, new_base64', [
+        ('ElevationTexture', b'ZZZZYYYYXXXX'),
+        ('ZonesTexture', b'AQIDBA=='),
+        ('RiverTexture', b''),
+    ])
+    def test_swap_matches_re_sub(self, name, new_base64):
+        """A single texture swap equals the regex substitution byte for byte."""
+        segments = _SaveSegments(SAVE_CONTENT)
+        segments.set_texture(name, new_base64)
+        assert segments.join() == plain_sub(SAVE_CONTENT, name, new_base64)
+
+    def test_repeated_swaps_match_re_sub(self):
+        """Swapping several textures (and one twice) keeps matching re.sub."""
+        swaps = [
+            ('RiverTexture', b'Ym9vbQ=='),
+            ('ElevationTexture', b'AAECAwQF'),
+            ('RiverTexture', b'c2Vjb25kIHN3YXA='),
+        ]
+        segments = _SaveSegments(SAVE_CONTENT)
+        expected = SAVE_CONTENT
+        for name, new_base64 in swaps:
+            segments.set_texture(name, new_base64)
+            expected = plain_sub(expected, name, new_base64)
+        assert segments.join() == expected
+
+    def test_missing_texture_is_noop(self):
+        """Swapping a texture the save lacks leaves it unchanged, like re.sub."""
+        segments = _SaveSegments(SAVE_CONTENT)
+        segments.set_texture('LandmarkTexture', b'QUJD')
+        assert segments.join() == SAVE_CONTENT == plain_sub(SAVE_CONTENT, 'LandmarkTexture', b'QUJD')
+
+    def test_chunks_stream_the_joined_content(self):
+        """chunks() yields exactly the bytes join() returns."""
+        segments = _SaveSegments(SAVE_CONTENT)
+        segments.set_texture('ZonesTexture', b'QQ==')
+        assert b''.join(segments.chunks()) == segments.join()
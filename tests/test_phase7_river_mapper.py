@@ -0,0 +1,155 @@
+"""
+Tests for river hex mapping on the production grid.
+
+Phase 7: Terrain & Features
+Task 7.6: Add major rivers (Dnipro reservoirs, bank elevations, gap filling)
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+import geopandas as gpd
+import yaml
+
+from river_mapper import RiverMapper, DNIPRO_RESERVOIRS
+
+
+CONFIG_PATH = Path(__file__).parent.parent / "config.yaml"
+
+
+@pytest.fixture
+def bounds():
+    """Active map bounds from config.yaml."""
+    with open(CONFIG_PATH, 'r') as f:
+        config = yaml.safe_load(f)
+    return config['bounds'][config['active_config']]
+
+
+@pytest.fixture
+def no_rivers(monkeypatch):
+    """Skip loading river shapefiles; these tests only need the grid geometry."""
+    monkeypatch.setattr(RiverMapper, '_load_rivers', lambda self: gpd.GeoDataFrame())
+
+
+class TestPhase7Task6Reservoirs:
+    """Task 7.6: Dnipro reservoir areas on the hex grid."""
+
+    @pytest.mark.parametrize('width, height, expected', [
+        (150, 88, 305),
+        (120, 70, 213),
+    ])
+    def test_reservoir_hex_count(self, no_rivers, bounds, width, height, expected):
+        """Reservoir bboxes cover a fixed number of hex centers (edges inclusive)."""
+        mapper = RiverMapper(bounds, width, height)
+        assert mapper._reservoir_area_grid().sum() == expected
+
+    def test_reservoir_grid_matches_scalar_check(self, no_rivers, bounds):
+        """The vectorized reservoir grid agrees with _is_in_reservoir per hex."""
+        mapper = RiverMapper(bounds, 150, 88)
+        grid = mapper._reservoir_area_grid()
+        for row in range(mapper.height):
+            for col in range(mapper.width):
+                assert grid[row, col] == mapper._is_in_reservoir(*mapper._pixel_to_geo(col, row))
+
+    def test_kyiv_reservoir_eastern_column(self, no_rivers, bounds):
+        """Hex centers on the Kyiv reservoir's max_lon edge are inside it."""
+        mapper = RiverMapper(bounds, 150, 88)
+        min_lon, min_lat, max_lon, max_lat = DNIPRO_RESERVOIRS['Kyiv']
+        lon, lat = mapper._hex_lonlat_grid()
+        edge = np.isclose(lon, max_lon) & (lat >= min_lat) & (lat <= max_lat)
+        assert edge.any()
+        assert mapper._reservoir_area_grid()[edge].all()
+
+
+class TestPhase7Task6DniproBanks:
+    """Task 7.6: Dnipro hexes sit one level below their lowest bank."""
+
+    WIDTH = 10
+    HEIGHT = 8
+
+    @pytest.fixture
+    def mapper(self, no_rivers, bounds):
+        return RiverMapper(bounds, self.WIDTH, self.HEIGHT)
+
+    def elevation_levels(self):
+        """int8 levels like HexElevationMapper.get_hex_elevations_arr()."""
+        levels = np.full((self.HEIGHT, self.WIDTH), 6, dtype=np.int8)
+        levels[:, 4] = 3          # western bank
+        levels[:, 6] = 9          # eastern bank
+        levels[0, :] = -3         # ocean row, not a valid bank
+        return levels
+
+    def test_int8_array_input(self, mapper):
+        """An int8 elevation array is accepted and gives min bank - 1."""
+        dnipro = {(5, row) for row in range(2, 6)}
+        result = mapper.get_dnipro_bank_elevations(dnipro, self.elevation_levels())
+        assert result == {h: 2 for h in dnipro}
+
+    def test_array_matches_dict_input(self, mapper):
+        """The int8 array and the legacy {(col, row): level} dict agree."""
+        levels = self.elevation_levels()
+        as_dict = {(col, row): int(levels[row, col])
+                   for row in range(self.HEIGHT) for col in range(self.WIDTH)}
+        land = np.ones((self.HEIGHT, self.WIDTH), dtype=bool)
+        land[:, 8:] = False
+        dnipro = {(5, row) for row in range(0, self.HEIGHT)} | {(6, 3), (7, 3)}
+
+        from_array = mapper.get_dnipro_bank_elevations(dnipro, levels, land)
+        from_dict = mapper.get_dnipro_bank_elevations(dnipro, as_dict, land)
+        assert from_array == from_dict
+
+    def test_no_valid_banks_defaults_to_shallow_water(self, mapper):
+        """Without a land bank the Dnipro falls back to level -1."""
+        levels = np.full((self.HEIGHT, self.WIDTH), -3, dtype=np.int8)
+        result = mapper.get_dnipro_bank_elevations({(5, 4)}, levels)
+        assert result == {(5, 4): -1}
+
+
+class TestPhase7Task6GapFilling:
+    """Task 7.6: Small gaps between river endpoints are filled."""
+
+    WIDTH = 40
+    HEIGHT = 30
+
+    @pytest.fixture
+    def mapper(self, no_rivers, bounds):
+        return RiverMapper(bounds, self.WIDTH, self.HEIGHT)
+
+    def random_river_grid(self, seed):
+        """Scattered short river fragments with small gaps between them."""
+        rng = np.random.default_rng(seed)
+        grid = np.zeros((self.HEIGHT, self.WIDTH), dtype=bool)
+        for _ in range(40):
+            col, row = rng.integers(0, self.WIDTH - 5), rng.integers(0, self.HEIGHT)
+            grid[row, col:col + rng.integers(3, 6)] = True
+        return grid
+
+    def test_straight_gap_is_filled(self, mapper):
+        """Two river fragments three hexes apart are joined along the row."""
+        grid = np.zeros((self.HEIGHT, self.WIDTH), dtype=bool)
+        grid[4, 1:5] = True
+        grid[4, 8:12] = True
+        result = mapper._connect_river_grid(grid)
+
+        expected = grid.copy()
+        expected[4, 5:8] = True
+        np.testing.assert_array_equal(result, expected)
+
+    def test_tiny_components_are_removed(self, mapper):
+        """Isolated one- and two-hex fragments are dropped as noise."""
+        grid = np.zeros((self.HEIGHT, self.WIDTH), dtype=bool)
+        grid[10, 20] = True
+        grid[20, 5:7] = True
+        assert not mapper._connect_river_grid(grid).any()
+
+    @pytest.mark.parametrize('seed', range(5))
+    def test_result_independent_of_endpoint_order(self, mapper, monkeypatch, seed):
+        """Gap filling gives the same hexes whatever order endpoints come in."""
+        grid = self.random_river_grid(seed)
+        expected = mapper._connect_river_grid(grid)
+
+        find_endpoints = RiverMapper._find_endpoints
+        monkeypatch.setattr(RiverMapper, '_find_endpoints',
+                            lambda self, g: find_endpoints(self, g)[::-1])
+        np.testing.assert_array_equal(mapper._connect_river_grid(grid), expected)
@@ -0,0 +1,127 @@
+"""
+Tests for river texture encoding.
+
+Phase 7: Terrain & Features
+Task 7.6: Add major rivers (segment / position / exit-edge texture channels)
+"""
+
+import numpy as np
+import pytest
+import geopandas as gpd
+
+from river_mapper import RiverMapper, _axial_distance
+
+
+WIDTH = 12
+HEIGHT = 8
+BOUNDS = {'min_lon': 22.0, 'max_lon': 40.0, 'min_lat': 44.0, 'max_lat': 52.5}
+
+NO_RIVER = (255, 255, 6, 0)
+EDGE_E = 1
+EDGE_SE = 2
+EDGE_SW = 3
+
+
+@pytest.fixture
+def mapper(monkeypatch):
+    """RiverMapper on a small synthetic grid, without loading river shapefiles."""
+    monkeypatch.setattr(RiverMapper, '_load_rivers', lambda self: gpd.GeoDataFrame())
+    return RiverMapper(BOUNDS, WIDTH, HEIGHT)
+
+
+def east_sloping_elevation():
+    """Elevation that drops by one per column, so every hex drains east."""
+    return np.tile(np.arange(WIDTH, 0, -1, dtype=np.float64), (HEIGHT, 1))
+
+
+def assert_valid_segments(river_hexes, cols, rows, exit_edges, seg_ids, positions):
+    """Every river hex appears once, positions count 0..n-1 along adjacent hexes."""
+    hexes = list(zip(cols.tolist(), rows.tolist()))
+    assert sorted(hexes) == sorted(river_hexes)
+    assert ((exit_edges >= 0) & (exit_edges <= 5)).all()
+    for seg in np.unique(seg_ids).tolist():
+        idx = np.flatnonzero(seg_ids == seg)
+        assert positions[idx].tolist() == list(range(len(idx)))
+        path = [hexes[i] for i in idx]
+        for a, b in zip(path, path[1:]):
+            assert _axial_distance(a, b) == 1, f"segment {seg}: {a} -> {b} not adjacent"
+
+
+class TestPhase7Task6RiverEncoding:
+    """Task 7.6: River hexes are traced into (segment, position, exit edge)."""
+
+    def test_straight_river_single_segment(self, mapper):
+        """A straight west-east river is one segment flowing east."""
+        river = {(col, 2) for col in range(1, 6)}
+        cols, rows, exit_edges, seg_ids, positions = mapper._trace_river_arrays(
+            river, east_sloping_elevation())
+
+        assert cols.tolist() == [1, 2, 3, 4, 5]
+        assert rows.tolist() == [2] * 5
+        assert seg_ids.tolist() == [0] * 5
+        assert positions.tolist() == [0, 1, 2, 3, 4]
+        assert exit_edges.tolist() == [EDGE_E] * 5
+
+    def test_flat_river_uses_geographic_fallback(self, mapper):
+        """Without a lower neighbor, western hexes exit SE and eastern ones SW."""
+        river = {(col, 4) for col in range(3, 9)}
+        cols, _, exit_edges, _, _ = mapper._trace_river_arrays(
+            river, np.zeros((HEIGHT, WIDTH)))
+
+        expected = [EDGE_SW if col > WIDTH // 2 else EDGE_SE for col in cols.tolist()]
+        assert exit_edges.tolist() == expected
+
+    def test_winding_and_disjoint_rivers(self, mapper):
+        """A winding river and a separate one become valid, distinct segments."""
+        winding = {(2, 0), (2, 1), (3, 2), (3, 3), (4, 4), (5, 4), (5, 5)}
+        separate = {(10, 1), (10, 2), (10, 3)}
+        river = winding | separate
+        arrays = mapper._trace_river_arrays(river, east_sloping_elevation())
+
+        assert_valid_segments(river, *arrays)
+        _, _, _, seg_ids, _ = arrays
+        assert len(np.unique(seg_ids)) == 2
+
+    def test_texture_channels(self, mapper):
+        """River cells hold (segment, position, exit edge, 0); others are no-river."""
+        river = {(col, 2) for col in range(1, 6)} | {(9, 5), (9, 6)}
+        elevation = east_sloping_elevation()
+        texture = mapper.create_river_texture(river_hexes=river, elevation_map=elevation)
+
+        assert texture.shape == (HEIGHT, WIDTH, 4)
+        assert texture.dtype == np.uint8
+        cols, rows, exit_edges, seg_ids, positions = mapper._trace_river_arrays(river, elevation)
+        expected = np.stack([seg_ids, positions, exit_edges, np.zeros_like(seg_ids)], axis=1)
+        np.testing.assert_array_equal(texture[rows, cols], expected)
+
+        mask = np.ones((HEIGHT, WIDTH), dtype=bool)
+        mask[rows, cols] = False
+        assert (texture[mask] == NO_RIVER).all()
+
+    def test_texture_respects_land_mask(self, mapper):
+        """Hexes outside the land mask stay no-river."""
+        river = {(col, 2) for col in range(1, 6)}
+        land = np.ones((HEIGHT, WIDTH), dtype=bool)
+        land[:, 4:] = False
+        texture = mapper.create_river_texture(
+            ukraine_mask=land, river_hexes=river, elevation_map=east_sloping_elevation())
+
+        assert texture[2, 1:4, 1].tolist() == [0, 1, 2]
+        assert (texture[2, 4:6] == NO_RIVER).all()
+
+    def test_segment_limit(self, monkeypatch):
+        """Only the first 255 segments are written (R = 255 means no river)."""
+        monkeypatch.setattr(RiverMapper, '_load_rivers', lambda self: gpd.GeoDataFrame())
+        width, height = 40, 32
+        mapper = RiverMapper(BOUNDS, width, height)
+        # Isolated single-hex rivers, two apart in both directions
+        river = {(col, row) for col in range(0, width, 2) for row in range(0, height, 2)}
+        assert len(river) > 255
+
+        texture = mapper.create_river_texture(
+            river_hexes=river, elevation_map=np.zeros((height, width)))
+
+        marked = texture[..., 0] != 255
+        assert marked.sum() == 255
+        assert sorted(texture[marked, 0].tolist()) == list(range(255))
+        assert (texture[marked, 1] == 0).all()
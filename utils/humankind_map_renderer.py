@@ -91,7 +91,8 @@ def render_map_simple(
                     pixels[x * scale + sx, y * scale + sy] = color
 
     if output_path:
-        img.save(output_path)
+        # Previews only: favour write speed over file size
+        img.save(output_path, compress_level=1)
 
     return img
 
@@ -214,7 +215,8 @@ def render_map_hex(
                             draw.line([p1, p2], fill=border_color, width=1)
 
     if output_path:
-        img.save(output_path)
+        # Previews only: favour write speed over file size
+        img.save(output_path, compress_level=1)
 
     return img
 
@@ -3,17 +3,91 @@ Parse and render all Humankind maps in humankind_maps directory.
 
 Outputs:
 - parsed_maps/ - Compact .npz files
-- rendered_maps/ - PNG renderings (simple, hex, and biome views)
+- rendered_maps/ - PNG renderings (biome and territory views; hex view with --hex)
 """
 
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+import argparse
+import os
 import sys
 
 from humankind_map_parser import load_map, save_compact_map
 from humankind_map_renderer import render_map_simple, render_map_hex
 
 
+def _process_one(map_path: Path, maps_dir: Path, parsed_dir: Path, rendered_dir: Path,
+                 render_hex: bool = False) -> str:
+    """Parse, save and render one map; returns its log block (run in a worker process).
+
+    The bordered hex view is by far the slowest render, so it is opt-in and
+    runs last.
+    """
+    # Generate a clean name for outputs
+    relative_path = map_path.relative_to(maps_dir)
+    map_name = relative_path.parent.name if relative_path.parent.name else relative_path.stem
+    map_name = map_name.replace(" ", "_").replace(".", "_")
+
+    log = [f"Processing: {relative_path}", f"  Map name: {map_name}"]
+
+    try:
+        # Parse map
+        log.append(f"  Parsing...")
+        map_data = load_map(map_path)
+
+        log.append(f"  Size: {map_data.width}x{map_data.height} ({map_data.width * map_data.height} hexes)")
+        log.append(f"  Territories: {map_data.territory_count} ({map_data.land_territory_count} land, {map_data.ocean_territory_count} ocean)")
+
+        # Save compact format on a thread (.npz compression and file I/O
+        # release the GIL) while the renders below run
+        compact_path = parsed_dir / f"{map_name}.npz"
+        with ThreadPoolExecutor(max_workers=1) as io_pool:
+            save_future = io_pool.submit(save_compact_map, map_data, compact_path)
+
+            # Render simple view (colored by biome)
+            simple_path = rendered_dir / f"{map_name}_biome.png"
+            render_map_simple(map_data, simple_path, color_by="biome", scale=4)
+            render_log = [f"  ✓ Rendered biome view: {simple_path}"]
+
+            # Render simple territory view
+            territory_path = rendered_dir / f"{map_name}_territory.png"
+            render_map_simple(map_data, territory_path, color_by="territory", scale=4)
+            render_log.append(f"  ✓ Rendered territory view: {territory_path}")
+
+            # Render hex view (colored by territory)
+            if render_hex:
+                hex_path = rendered_dir / f"{map_name}_territory_hex.png"
+                hex_size = max(4, min(12, 800 // max(map_data.width, map_data.height)))
+                render_map_hex(map_data, hex_path, color_by="territory", hex_size=hex_size, show_borders=True)
+                render_log.append(f"  ✓ Rendered hex view: {hex_path}")
+
+            save_future.result()
+        log.append(f"  ✓ Saved parsed: {compact_path}")
+        log.extend(render_log)
+
+        # Print hex count statistics
+        hex_counts = map_data.get_hex_counts()
+        land_hex_counts = {tid: count for tid, count in hex_counts.items()
+                         if not map_data.territories[tid].is_ocean}
+
+        if land_hex_counts:
+            avg_land_hexes = sum(land_hex_counts.values()) / len(land_hex_counts)
+            min_land_hexes = min(land_hex_counts.values())
+            max_land_hexes = max(land_hex_counts.values())
+            log.append(f"  Land territory hexes: avg={avg_land_hexes:.1f}, min={min_land_hexes}, max={max_land_hexes}")
+
+    except Exception as e:
+        log.append(f"  ✗ ERROR: {e}")
+
+    return "\n".join(log)
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Parse and render all Humankind maps')
+    parser.add_argument('--hex', action='store_true',
+                        help='Also render the (slow) bordered hex territory view')
+    args = parser.parse_args()
+
     # Setup directories
     maps_dir = Path("humankind_maps")
     parsed_dir = Path("parsed_maps")
@@ -34,59 +108,13 @@ def main():
 
     print("\n" + "="*60)
 
-    # Process each map
-    for i, map_path in enumerate(all_maps, 1):
-        # Generate a clean name for outputs
-        relative_path = map_path.relative_to(maps_dir)
-        map_name = relative_path.parent.name if relative_path.parent.name else relative_path.stem
-        map_name = map_name.replace(" ", "_").replace(".", "_")
-
-        print(f"\n[{i}/{len(all_maps)}] Processing: {relative_path}")
-        print(f"  Map name: {map_name}")
-
-        try:
-            # Parse map
-            print(f"  Parsing...")
-            map_data = load_map(map_path)
-
-            print(f"  Size: {map_data.width}x{map_data.height} ({map_data.width * map_data.height} hexes)")
-            print(f"  Territories: {map_data.territory_count} ({map_data.land_territory_count} land, {map_data.ocean_territory_count} ocean)")
-
-            # Save compact format
-            compact_path = parsed_dir / f"{map_name}.npz"
-            save_compact_map(map_data, compact_path)
-            print(f"  ✓ Saved parsed: {compact_path}")
-
-            # Render simple view (colored by biome)
-            simple_path = rendered_dir / f"{map_name}_biome.png"
-            render_map_simple(map_data, simple_path, color_by="biome", scale=4)
-            print(f"  ✓ Rendered biome view: {simple_path}")
-
-            # Render hex view (colored by territory)
-            hex_path = rendered_dir / f"{map_name}_territory_hex.png"
-            hex_size = max(4, min(12, 800 // max(map_data.width, map_data.height)))
-            render_map_hex(map_data, hex_path, color_by="territory", hex_size=hex_size, show_borders=True)
-            print(f"  ✓ Rendered hex view: {hex_path}")
-
-            # Render simple territory view
-            territory_path = rendered_dir / f"{map_name}_territory.png"
-            render_map_simple(map_data, territory_path, color_by="territory", scale=4)
-            print(f"  ✓ Rendered territory view: {territory_path}")
-
-            # Print hex count statistics
-            hex_counts = map_data.get_hex_counts()
-            land_hex_counts = {tid: count for tid, count in hex_counts.items()
-                             if not map_data.territories[tid].is_ocean}
-
-            if land_hex_counts:
-                avg_land_hexes = sum(land_hex_counts.values()) / len(land_hex_counts)
-                min_land_hexes = min(land_hex_counts.values())
-                max_land_hexes = max(land_hex_counts.values())
-                print(f"  Land territory hexes: avg={avg_land_hexes:.1f}, min={min_land_hexes}, max={max_land_hexes}")
-
-        except Exception as e:
-            print(f"  ✗ ERROR: {e}")
-            continue
+    # Maps are independent: parse and render them in parallel, print logs in order
+    n = len(all_maps)
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        results = ex.map(_process_one, all_maps, [maps_dir] * n, [parsed_dir] * n, [rendered_dir] * n,
+                         [args.hex] * n)
+        for i, result in enumerate(results, 1):
+            print(f"\n[{i}/{n}] {result}")
 
     print("\n" + "="*60)
     print(f"\nDone! Processed {len(all_maps)} maps")